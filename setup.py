@@ -37,6 +37,9 @@ setup(
     entry_points={
         'console_scripts': [
             'screen-translator=main:main',
+            'screen-translator-batch=batch_translate:main',
+            'screen-translator-video=video_translate:main',
+            'screen-translator-replay=replay_session:main',
         ],
     },
     keywords=[
@@ -49,6 +52,3 @@ setup(
         "Documentation": "https://github.com/yourusername/screen-translator/wiki",
     },
 )
-        ],
-    },
-)
\ No newline at end of file
@@ -0,0 +1,351 @@
+"""
+Batch CLI for Screen Translator
+OCR และแปลภาพหน้าจอที่เก็บไว้จำนวนมากแบบออฟไลน์ (ไม่ต้องเปิด GUI)
+
+- เตรียมภาพ (โหลด/ย่อขนาด/เข้ารหัส PNG) ด้วย process pool
+- ส่งคำขอไปยัง Ollama พร้อมกันได้ไม่เกินจำนวนที่กำหนด
+- ใช้ cache ของผล OCR และผลการแปลร่วมกับแอป GUI
+- เขียนผลลัพธ์เป็น JSONL ทีละบรรทัด และทำต่อจากเดิมได้เมื่อถูกขัดจังหวะ
+
+ตัวอย่าง:
+    python batch_translate.py screenshots/ -o results.jsonl
+    python batch_translate.py "archive/**/*.png" --workers 8 --concurrency 4
+"""
+
+import argparse
+import base64
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from io import BytesIO
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import OLLAMA_CONFIG, TRANSLATION_CONFIG, CACHE_CONFIG, BATCH_CONFIG
+
+
+def collect_images(inputs, extensions=None):
+    """รวบรวมไฟล์ภาพจากโฟลเดอร์ ไฟล์ หรือ glob pattern
+
+    Args:
+        inputs (list): รายการโฟลเดอร์/ไฟล์/pattern
+        extensions (list): นามสกุลไฟล์ที่รับ
+
+    Returns:
+        list: path ของภาพทั้งหมด (เรียงตามชื่อ ไม่ซ้ำ)
+    """
+    extensions = tuple(ext.lower() for ext in (extensions or BATCH_CONFIG['extensions']))
+    paths = set()
+
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                for name in files:
+                    if name.lower().endswith(extensions):
+                        paths.add(os.path.abspath(os.path.join(root, name)))
+        elif os.path.isfile(item):
+            paths.add(os.path.abspath(item))
+        else:
+            for match in glob.glob(item, recursive=True):
+                if os.path.isfile(match) and match.lower().endswith(extensions):
+                    paths.add(os.path.abspath(match))
+
+    return sorted(paths)
+
+
+def load_completed(output_path):
+    """อ่านไฟล์ผลลัพธ์เดิมเพื่อหาภาพที่ทำสำเร็จแล้ว (สำหรับ resume)"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # บรรทัดสุดท้ายอาจเขียนไม่ครบตอนถูกขัดจังหวะ
+            if record.get('status') == 'ok':
+                completed.add(record.get('path'))
+    return completed
+
+
+def prepare_image(path):
+    """เตรียมภาพใน worker process: โหลด ย่อขนาด สร้าง key และเข้ารหัส PNG base64"""
+    from PIL import Image
+    from translation.cache import image_key
+    from translation.generation import ocr_budget
+
+    try:
+        with Image.open(path) as image:
+            image = image.convert('RGB')
+            max_width, max_height = BATCH_CONFIG['max_image_size']
+            if image.width > max_width or image.height > max_height:
+                ratio = min(max_width / image.width, max_height / image.height)
+                image = image.resize((int(image.width * ratio), int(image.height * ratio)),
+                                     Image.Resampling.LANCZOS)
+
+            buffered = BytesIO()
+            image.save(buffered, format="PNG")
+            return {
+                'path': path,
+                'key': image_key(image),
+                'image_b64': base64.b64encode(buffered.getvalue()).decode(),
+                'num_predict': ocr_budget([image]),
+                'size': image.size,
+            }
+    except Exception as e:
+        return {'path': path, 'error': f"prepare failed: {e}"}
+
+
+def percentile(values, pct):
+    """ค่า percentile แบบ nearest-rank"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class BatchRunner:
+    """ตัวจัดการงาน batch: process pool สำหรับเตรียมภาพ + thread pool สำหรับคำขอ Ollama"""
+
+    def __init__(self, ocr, translator, output_path, workers=None, concurrency=2,
+                 target_language='th', translate=True, quality_gate=None):
+        """
+        Args:
+            ocr (OCR): OCR engine (ต้องมี extract_text_from_base64)
+            translator (Translator): translator (None หรือ translate=False = OCR อย่างเดียว)
+            output_path (str): ไฟล์ JSONL สำหรับผลลัพธ์
+            workers (int): จำนวน process สำหรับเตรียมภาพ
+            concurrency (int): จำนวนคำขอ Ollama พร้อมกันสูงสุด
+            target_language (str): ภาษาเป้าหมาย
+            translate (bool): แปลหลัง OCR หรือไม่
+            quality_gate (QualityGate): ตัวกรองข้อความ OCR ก่อนแปล (None = gate กลาง)
+        """
+        self.ocr = ocr
+        self.translator = translator
+        self.output_path = output_path
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = max(1, concurrency)
+        self.target_language = target_language
+        self.translate = translate and translator is not None
+        if quality_gate is None:
+            from translation.quality import get_quality_gate
+            quality_gate = get_quality_gate()
+        self.quality_gate = quality_gate
+
+        self.latencies = []
+        self.counts = {'ok': 0, 'errors': 0, 'empty': 0, 'rejected': 0}
+
+    def _process(self, prepared):
+        """OCR และแปลภาพหนึ่งภาพ (ทำงานใน thread pool)"""
+        started = time.perf_counter()
+        record = {'path': prepared['path']}
+        try:
+            text = self.ocr.extract_text_from_base64(prepared['image_b64'], prepared['key'],
+                                                 prepared.get('num_predict'))
+            record['text'] = text
+
+            quality = self.quality_gate.check(text) if text.strip() else None
+            if quality is not None and not quality['accepted']:
+                record['rejected'] = quality['reason']
+            elif self.translate and text.strip():
+                result = self.translator.translate(text, self.target_language)
+                record['translated_text'] = result.get('translated_text', '')
+                record['detected_language'] = result.get('detected_language', 'unknown')
+                record['service'] = result.get('service', getattr(self.translator, 'service', ''))
+                if 'error' in result:
+                    record['error'] = result['error']
+
+            record['status'] = 'error' if 'error' in record else 'ok'
+        except Exception as e:
+            record['status'] = 'error'
+            record['error'] = str(e)
+
+        record['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return record
+
+    def _write(self, output, record):
+        """เขียนผลลัพธ์หนึ่งบรรทัดทันที เพื่อให้ resume ได้ถ้าถูกขัดจังหวะ"""
+        record.setdefault('timestamp', time.strftime('%Y-%m-%dT%H:%M:%S'))
+        output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        output.flush()
+
+        if record['status'] == 'ok':
+            self.counts['ok'] += 1
+            if not record.get('text', '').strip():
+                self.counts['empty'] += 1
+            elif 'rejected' in record:
+                self.counts['rejected'] += 1
+        else:
+            self.counts['errors'] += 1
+        if 'latency_ms' in record:
+            self.latencies.append(record['latency_ms'])
+
+    def run(self, paths, skipped=0, progress=True):
+        """ประมวลผลภาพทั้งหมดและคืนรายงาน throughput"""
+        started = time.perf_counter()
+        # จำกัดจำนวนงานที่ค้างอยู่ เพื่อไม่ให้ภาพที่เตรียมแล้วกองอยู่ในหน่วยความจำ
+        max_in_flight = self.workers + self.concurrency * 2
+        pending_paths = iter(paths)
+        prepare_futures, request_futures = set(), set()
+        done_count = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.output_path)), exist_ok=True)
+        with open(self.output_path, 'a', encoding='utf-8') as output, \
+                ProcessPoolExecutor(max_workers=self.workers) as process_pool, \
+                ThreadPoolExecutor(max_workers=self.concurrency) as request_pool:
+            exhausted = False
+            while True:
+                while not exhausted and len(prepare_futures) + len(request_futures) < max_in_flight:
+                    path = next(pending_paths, None)
+                    if path is None:
+                        exhausted = True
+                        break
+                    prepare_futures.add(process_pool.submit(prepare_image, path))
+
+                if not prepare_futures and not request_futures:
+                    break
+
+                done, _ = wait(prepare_futures | request_futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in prepare_futures:
+                        prepare_futures.discard(future)
+                        prepared = future.result()
+                        if 'error' in prepared:
+                            self._write(output, {'path': prepared['path'], 'status': 'error',
+                                                 'error': prepared['error']})
+                            done_count += 1
+                        else:
+                            request_futures.add(request_pool.submit(self._process, prepared))
+                    else:
+                        request_futures.discard(future)
+                        self._write(output, future.result())
+                        done_count += 1
+                        if progress and done_count % 10 == 0:
+                            print(f"🔄 ประมวลผลแล้ว {done_count}/{len(paths)} ภาพ")
+
+        return self.report(len(paths), skipped, time.perf_counter() - started)
+
+    def report(self, total, skipped, elapsed):
+        """สรุปผล throughput และ latency"""
+        report = {
+            'total': total,
+            'skipped': skipped,
+            'ok': self.counts['ok'],
+            'errors': self.counts['errors'],
+            'empty': self.counts['empty'],
+            'rejected': self.counts['rejected'],
+            'elapsed_s': round(elapsed, 2),
+            'images_per_s': round(total / elapsed, 2) if elapsed > 0 else 0.0,
+            'latency_ms': {
+                'p50': percentile(self.latencies, 50),
+                'p95': percentile(self.latencies, 95),
+                'max': max(self.latencies) if self.latencies else 0.0,
+            },
+        }
+        if getattr(self.ocr, 'cache', None) is not None:
+            report['ocr_cache'] = self.ocr.cache.stats()
+        if self.translate and getattr(self.translator, 'cache', None) is not None:
+            report['translation_cache'] = self.translator.cache.stats()
+        return report
+
+
+def print_report(report):
+    """แสดงรายงาน throughput"""
+    print("=" * 60)
+    print("📊 สรุปผล batch")
+    print(f"   ภาพทั้งหมด: {report['total']} (ข้ามเพราะทำแล้ว {report['skipped']})")
+    print(f"   สำเร็จ: {report['ok']} | ผิดพลาด: {report['errors']} | ไม่มีข้อความ: {report['empty']} "
+          f"| คัดทิ้งก่อนแปล: {report['rejected']}")
+    print(f"   เวลา: {report['elapsed_s']}s | {report['images_per_s']} ภาพ/วินาที")
+    latency = report['latency_ms']
+    print(f"   latency: p50={latency['p50']}ms p95={latency['p95']}ms max={latency['max']}ms")
+    for name in ('ocr_cache', 'translation_cache'):
+        if name in report:
+            stats = report[name]
+            print(f"   {name}: hit {stats['hits']} / miss {stats['misses']} ({stats['hit_rate']:.0%})")
+    print("=" * 60)
+
+
+def build_parser():
+    """สร้าง argument parser"""
+    parser = argparse.ArgumentParser(description="OCR และแปลภาพหน้าจอจำนวนมากแบบออฟไลน์")
+    parser.add_argument('inputs', nargs='+', help="โฟลเดอร์ ไฟล์ภาพ หรือ glob pattern")
+    parser.add_argument('-o', '--output', default='results.jsonl', help="ไฟล์ผลลัพธ์ JSONL")
+    parser.add_argument('--workers', type=int, default=BATCH_CONFIG['workers'],
+                        help="จำนวน process สำหรับเตรียมภาพ")
+    parser.add_argument('--concurrency', type=int, default=BATCH_CONFIG['concurrency'],
+                        help="จำนวนคำขอ Ollama พร้อมกันสูงสุด")
+    parser.add_argument('--vision-model', default=OLLAMA_CONFIG['vision_model'])
+    parser.add_argument('--translation-model', default=OLLAMA_CONFIG['translation_model'])
+    parser.add_argument('--service', default='ollama', choices=['ollama', 'google'])
+    parser.add_argument('--target', default=TRANSLATION_CONFIG['target_language'], help="ภาษาเป้าหมาย")
+    parser.add_argument('--no-translate', action='store_true', help="OCR อย่างเดียว")
+    parser.add_argument('--no-resume', action='store_true', help="ทำใหม่ทั้งหมดแม้มีผลลัพธ์เดิม")
+    parser.add_argument('--no-cache', action='store_true', help="ไม่ใช้ cache ของ OCR/การแปล")
+    parser.add_argument('--cache-dir', default=None, help="โฟลเดอร์ cache (ค่าเริ่มต้น = โฟลเดอร์ข้อมูลแอป)")
+    return parser
+
+
+def main(argv=None):
+    """Entry point ของ batch CLI"""
+    args = build_parser().parse_args(argv)
+    from utils.helpers import setup_logging
+    setup_logging()
+
+    from translation.cache import Cache, get_shared_cache
+    from translation.ocr import OCR
+    from translation.translator import Translator
+
+    paths = collect_images(args.inputs)
+    if not paths:
+        print("❌ ไม่พบไฟล์ภาพ")
+        return 1
+
+    skipped = 0
+    if not args.no_resume:
+        completed = load_completed(args.output)
+        remaining = [path for path in paths if path not in completed]
+        skipped = len(paths) - len(remaining)
+        paths = remaining
+        if skipped:
+            print(f"⏭️ ข้าม {skipped} ภาพที่ทำแล้ว")
+    elif os.path.exists(args.output):
+        os.remove(args.output)
+
+    ocr_cache = translation_cache = None
+    if not args.no_cache:
+        if args.cache_dir:
+            ocr_cache = Cache(os.path.join(args.cache_dir, CACHE_CONFIG['ocr_cache_file']))
+            translation_cache = Cache(os.path.join(args.cache_dir, CACHE_CONFIG['translation_cache_file']))
+        else:
+            ocr_cache = get_shared_cache(CACHE_CONFIG['ocr_cache_file'])
+            translation_cache = get_shared_cache(CACHE_CONFIG['translation_cache_file'])
+
+    ocr = OCR(vision_model=args.vision_model, cache=ocr_cache)
+    translator = None
+    if not args.no_translate:
+        translator = Translator(service=args.service, ollama_model=args.translation_model,
+                                cache=translation_cache)
+
+    print(f"🚀 เริ่ม batch: {len(paths)} ภาพ (workers={args.workers or os.cpu_count()}, "
+          f"concurrency={args.concurrency})")
+    runner = BatchRunner(ocr, translator, args.output, workers=args.workers,
+                         concurrency=args.concurrency, target_language=args.target,
+                         translate=not args.no_translate)
+    try:
+        report = runner.run(paths, skipped=skipped)
+    except KeyboardInterrupt:
+        print("\n🛑 ถูกขัดจังหวะ - รันคำสั่งเดิมอีกครั้งเพื่อทำต่อ")
+        return 130
+
+    print_report(report)
+    return 0 if report['errors'] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,7 +18,21 @@ UI_CONFIG = {
     'min_selection_size': (50, 50),
     'selection_color': (255, 0, 0),  # สีแดง
     'background_opacity': 25,  # ลดความเข้มของพื้นหลัง
-    'selection_background': (255, 255, 255, 25)  # สีขาวโปร่งใสอ่อน
+    'selection_background': (255, 255, 255, 25),  # สีขาวโปร่งใสอ่อน
+    'selection_signal_interval_ms': 50  # ส่งสัญญาณตำแหน่งระหว่างลาก/ปรับขนาดไม่ถี่กว่านี้ (รวมหลาย mouse move เป็นครั้งเดียว)
+}
+
+# overlay คำแปลบนหน้าจอ (คลิกทะลุได้)
+OVERLAY_CONFIG = {
+    'enabled': False,  # แสดงคำแปลทับพื้นที่ตรวจจับ (เปิด/ปิดได้จากหน้าต่างหลัก)
+    'placement': 'over',  # 'over' = ทับพื้นที่, 'below' = ใต้พื้นที่ (ระบบที่ตัด overlay ออกจากภาพที่จับไม่ได้ใช้ 'below' เสมอ)
+    'font_family': 'Segoe UI',
+    'font_size': 13,
+    'padding': 6,  # ระยะขอบรอบข้อความ (px)
+    'gap': 4,  # ระยะห่างจากพื้นที่เมื่อ placement = 'below' (px)
+    'text_color': (255, 255, 255, 255),
+    'background': (0, 0, 0, 200),
+    'exclude_from_capture': True,  # Windows 10 2004+: ไม่ให้ overlay ติดไปในภาพที่จับ (OCR จะไม่อ่านคำแปลของตัวเอง)
 }
 
 # การตั้งค่าการจับภาพ
@@ -29,7 +43,55 @@ CAPTURE_CONFIG = {
         'sharpening': True
     },
     'save_debug_images': False,  # สำหรับ debug
-    'debug_folder': 'debug_images'
+    'debug_folder': 'debug_images',
+    'record_session': False,  # บันทึก session (ภาพ + ผลลัพธ์) สำหรับเล่นซ้ำ
+    'session_folder': 'sessions'  # โฟลเดอร์ไฟล์ session (ในโฟลเดอร์ข้อมูลของแอป)
+}
+
+# การตั้งค่า scheduler สำหรับหลายพื้นที่ตรวจจับ
+SCHEDULER_CONFIG = {
+    'change_threshold': 4.0,  # ค่าความต่างเฉลี่ยต่อ pixel (0-255) ที่ถือว่าภาพเปลี่ยน
+    'fingerprint_size': (32, 32),  # ขนาดภาพย่อสำหรับเปรียบเทียบ
+    'max_dispatch_per_tick': 4,  # จำนวนพื้นที่สูงสุดที่ส่ง OCR ต่อรอบ
+    'aging_per_second': 1.0,  # คะแนนที่เพิ่มให้พื้นที่ที่รอนาน เพื่อไม่ให้ถูกทิ้ง
+    'idle_tick_ms': 1000,  # ระยะเวลารอเมื่อไม่มีพื้นที่
+    'paused_tick_ms': 100,  # ระยะเวลารอระหว่างหยุดจับภาพชั่วคราว (เช่น ขณะลากพื้นที่)
+    'max_regions': 8
+}
+
+# รอให้พื้นที่นิ่งก่อนส่ง OCR (ข้อความที่ค่อย ๆ ปรากฏ/พิมพ์ทีละตัว/เคลื่อนไหว ไม่ถูกอ่านระหว่างทาง)
+STABILITY_CONFIG = {
+    'enabled': True,
+    'settle_ticks': 2,  # จำนวนภาพที่จับซ้ำแล้วไม่เปลี่ยนติดต่อกันขั้นต่ำ (0 = ใช้เวลาอย่างเดียว)
+    'settle_ms': 250,  # ระยะเวลาที่ภาพต้องนิ่งขั้นต่ำ (0 = ใช้จำนวนภาพอย่างเดียว)
+    'max_wait_ms': 2000,  # รอนานสุดนับจากภาพแรกที่เปลี่ยน - เนื้อหาที่เปลี่ยนตลอดเวลาจะถูกส่งเมื่อครบเวลานี้
+    'settle_interval_ms': 150,  # ระยะจับภาพซ้ำระหว่างรอภาพนิ่ง (แทน interval ปกติของพื้นที่)
+    'threshold': 0.5,  # ค่าความต่างเฉลี่ยต่อ pixel (0-255) สูงสุดที่ยังถือว่านิ่ง (เคอร์เซอร์กะพริบต่ำกว่านี้)
+    'history': 8,  # จำนวน fingerprint ล่าสุดที่เก็บไว้ต่อพื้นที่
+}
+
+# การตั้งค่า cache ของผล OCR และผลการแปล (ไฟล์อยู่ในโฟลเดอร์ข้อมูลแอป)
+CACHE_CONFIG = {
+    'enable_ocr_cache': False,  # เปิดใช้ใน GUI ได้ - batch CLI เปิดเสมอ
+    'ocr_cache_file': 'ocr_cache.sqlite3',
+    'translation_cache_file': 'translation_cache.sqlite3',
+    'memory_entries': 1024  # จำนวนรายการสูงสุดในหน่วยความจำ
+}
+
+# การตั้งค่า batch CLI สำหรับแปลภาพจำนวนมาก
+BATCH_CONFIG = {
+    'workers': None,  # จำนวน process สำหรับเตรียมภาพ (None = จำนวน CPU)
+    'concurrency': 2,  # จำนวนคำขอ Ollama พร้อมกันสูงสุด
+    'extensions': ['.png', '.jpg', '.jpeg', '.bmp', '.webp'],
+    'max_image_size': (1920, 1080)
+}
+
+# การตั้งค่าการแปลไฟล์วิดีโอ / ลำดับภาพ
+VIDEO_CONFIG = {
+    'sample_interval_ms': 500,  # สุ่มเฟรมทุก ๆ กี่ milliseconds ของวิดีโอ
+    'prefetch_frames': 8,  # จำนวนเฟรมที่ decode ล่วงหน้าใน background thread
+    'sequence_fps': 2.0,  # fps ของลำดับภาพ (ใช้คำนวณเวลาใน subtitle)
+    'min_cue_ms': 500  # ความยาวขั้นต่ำของ subtitle แต่ละช่วง
 }
 
 # การตั้งค่า Ollama Models
@@ -39,10 +101,149 @@ OLLAMA_CONFIG = {
     'vision_model': 'gemma3:4b',  # Model สำหรับ AI Vision (OCR)
     'translation_model': 'gemma3:4b',  # Model สำหรับการแปล
     'custom_prompt': '',  # Custom prompt สำหรับการแปล (เปล่า = ใช้ default)
+    'api_mode': 'chat',  # 'chat' = คำสั่งแปลเป็น system message คงที่ (Ollama ใช้ prompt cache ซ้ำ), 'generate' = prompt เดียวแบบเดิม
+    'system_prompt': """You are an English-to-Thai translator. For each English text you receive, first improve its readability and naturalness as a native English speaker would, paying attention to sentence structure, vocabulary, and common expressions. Then provide a comprehensive and accurate Thai translation.
+
+Respond ONLY with the final Thai translation sentence. Do not include any English, explanations, or extra formatting.""",
+    'inventory_ttl': 300,  # อายุของรายการ models ใน cache (วินาที)
+    'inventory_file': 'ollama_models.json',  # ไฟล์เก็บรายการ models (ในโฟลเดอร์ข้อมูลของแอป)
+    # Ollama หลายเครื่อง (ว่าง = ใช้ host/port ด้านบนเครื่องเดียว) ตัวอย่าง:
+    # {'host': '192.168.1.20', 'port': 11434, 'weight': 2, 'roles': ['vision'], 'models': ['gemma3:12b']}
+    'nodes': [],
+    'node_eject_after': 2,  # จำนวนครั้งที่ node ล้มเหลวติดกันก่อนถูกพัก
+    'node_eject_s': 10,  # เวลาพัก node ครั้งแรก (เพิ่มเท่าตัวเมื่อถูกพักซ้ำ)
     'default_prompt': """For the following English text, please go through each sentence and paragraph to enhance its readability and naturalness, making it sound like it was originally written by a native English speaker. Pay attention to sentence structure, vocabulary, and common expressions. Once the English version is optimized, please provide a comprehensive and accurate Thai translation.
 
 English text:
 {text}
 
 Respond ONLY with the final Thai translation sentence. Do not include any English, explanations, or extra formatting."""
-}
\ No newline at end of file
+}
+
+# การตรวจสถานะ Ollama ใน background (ถอยระยะเวลาตรวจเมื่อเชื่อมต่อไม่ได้)
+HEALTH_CONFIG = {
+    'enabled': True,  # ตรวจสถานะ Ollama ใน background
+    'interval_s': 10,  # ระยะเวลาตรวจเมื่อเชื่อมต่อได้ (วินาที)
+    'min_backoff_s': 1,  # ระยะรอครั้งแรกหลังเชื่อมต่อไม่ได้ (เพิ่มเท่าตัวทุกครั้ง)
+    'max_backoff_s': 60,  # ระยะรอสูงสุดเมื่อเชื่อมต่อไม่ได้
+    'timeout_s': 3,  # timeout ของแต่ละการตรวจ
+}
+
+# circuit breaker ของ service แปลภาษา และ service สำรองเมื่อ service หลักใช้งานไม่ได้
+BREAKER_CONFIG = {
+    'enabled': True,  # ใช้ circuit breaker และ service สำรอง
+    'failover_service': 'google',  # service สำรองเมื่อ service หลักใช้งานไม่ได้ ('' = ไม่มี)
+    'failure_threshold': 3,  # จำนวนครั้งที่ล้มเหลว/ช้าติดกันก่อนตัดวงจร
+    'slow_call_ms': 10000,  # คำแปลที่ช้ากว่านี้นับเป็นความล้มเหลว
+    'reset_timeout_s': 30,  # เวลาก่อนลองเรียก service ที่ถูกตัดวงจรอีกครั้ง
+}
+
+# ส่งคำขอแปลซ้ำไป backend รองเมื่อ backend หลักตอบช้า (hedged request)
+HEDGE_CONFIG = {
+    'enabled': False,  # ส่งคำขอแปลซ้ำไป backend รองเมื่อ backend หลักตอบช้า
+    'secondary': 'google',  # backend รอง: 'google' หรือ 'ollama_secondary'
+    'secondary_ollama': {'host': 'localhost', 'port': 11435, 'model': ''},  # Ollama เครื่องอื่น ('' = model เดียวกัน)
+    'percentile': 95,  # ส่งซ้ำเมื่อรอนานกว่า percentile นี้ของเวลาตอบล่าสุด
+    'min_delay_ms': 200,  # เวลารอขั้นต่ำก่อนส่งซ้ำ
+    'initial_delay_ms': 3000,  # เวลารอก่อนส่งซ้ำเมื่อยังมีข้อมูลเวลาตอบไม่พอ
+    'min_samples': 20,  # จำนวนเวลาตอบขั้นต่ำก่อนใช้ percentile
+    'window_size': 200,  # จำนวนเวลาตอบล่าสุดที่เก็บต่อ backend
+}
+
+# การกำหนดจำนวน token (num_predict / num_ctx) ของคำขอไปยัง Ollama
+GENERATION_CONFIG = {
+    'translation_ratio': 2.5,  # token คำแปลไทยต่อ token ต้นฉบับอังกฤษ (ไทยใช้ token มากกว่า)
+    'translation_margin': 32,  # token เผื่อ
+    'translation_min': 32,  # num_predict ต่ำสุดของการแปล
+    'translation_max': 1024,  # num_predict สูงสุดของการแปล (รวมตอนขอใหม่)
+    'translation_stop': ['\n\nNote', '\n\nExplanation', '\nEnglish text:'],  # หยุดเมื่อ model เริ่มอธิบายเพิ่ม
+    'ocr_analysis_width': 320,  # ย่อภาพให้กว้างไม่เกินนี้ก่อนนับความหนาแน่นของตัวอักษร
+    'ocr_edge_threshold': 64,  # ค่าความสว่างขั้นต่ำของพิกเซลขอบ (หลัง FIND_EDGES)
+    'ocr_edge_px_per_token': 140,  # พิกเซลขอบต่อ token (~35-40 ต่อตัวอักษรที่ขนาด 16px, ~4 ตัวอักษร/token)
+    'ocr_ratio': 1.2,  # ตัวคูณเผื่อของ OCR
+    'ocr_margin': 24,  # token เผื่อต่อภาพ
+    'ocr_min': 32,  # num_predict ต่ำสุดต่อภาพ
+    'ocr_max': 1024,  # num_predict สูงสุดต่อภาพ
+    'ocr_default': 256,  # num_predict เมื่อไม่มีภาพให้วิเคราะห์ (มีแค่ base64)
+    'ocr_stop': ['\n\nNote:', '\n\nExplanation:'],
+    'image_tokens': 576,  # token ที่ภาพหนึ่งภาพใช้ใน context (โดยประมาณ)
+    'num_ctx_min': 4096,  # num_ctx ต่ำสุด - ค่าคงที่ป้องกัน Ollama โหลด model ใหม่ทุกคำขอ
+    'num_ctx_max': 32768,
+    'truncation_retries': 1,  # จำนวนครั้งที่ขอใหม่ด้วย budget เท่าตัวเมื่อคำตอบถูกตัด
+}
+
+# การแบ่งข้อความยาวเป็นส่วน ๆ แล้วแปลพร้อมกัน
+CHUNK_CONFIG = {
+    'enabled': True,  # แบ่งข้อความยาวเป็นส่วน ๆ แล้วแปลพร้อมกัน
+    'max_tokens': 256,  # token สูงสุดของต้นฉบับต่อส่วน (ข้อความยาวกว่านี้ถูกแบ่ง)
+    'parallelism': 3,  # จำนวนส่วนที่แปลพร้อมกัน (Ollama เครื่องเดียวต้องตั้ง OLLAMA_NUM_PARALLEL ให้รองรับ)
+    'retries': 1,  # จำนวนครั้งที่แปลส่วนที่ล้มเหลวใหม่
+}
+
+# translation memory - ใช้คำแปลเดิมซ้ำกับข้อความที่คล้ายกัน
+TRANSLATION_MEMORY_CONFIG = {
+    'enabled': True,  # ใช้คำแปลเดิมซ้ำกับข้อความที่ต่างกันแค่ตัวเลข/ชื่อ/ตัวอักษรที่ OCR อ่านผิด
+    'threshold': 0.8,  # Dice similarity ขั้นต่ำของ trigram
+    'max_substitutions': 3,  # จำนวนคำที่แทนที่ได้สูงสุดต่อข้อความ
+    'max_candidates': 16,  # จำนวน candidate สูงสุดที่ตรวจความคล้ายจริงต่อการค้นหา
+    'max_postings': 2000,  # จำนวน posting สูงสุดที่อ่านต่อการค้นหา (จำกัดเวลาเมื่อมีหลายแสนรายการ)
+    'max_entries': 500000,  # จำนวนรายการสูงสุด
+    'memory_file': '',  # ไฟล์ JSONL เก็บถาวร (ในโฟลเดอร์ข้อมูลของแอป, '' = ในหน่วยความจำอย่างเดียว)
+}
+
+# การคัดข้อความ OCR ที่เป็นขยะ/คำตอบปฏิเสธของ model ก่อนส่งแปล
+QUALITY_CONFIG = {
+    'enabled': True,  # คัดข้อความ OCR ที่เป็นขยะทิ้งก่อนส่งแปล
+    'min_score': 0.5,  # คะแนนต่ำสุดที่ผ่าน (0..1)
+    'min_letters': 2,  # จำนวนตัวอักษรขั้นต่ำ (ตัวเลข/สัญลักษณ์ล้วนไม่ต้องแปล)
+    'min_letter_ratio': 0.5,  # สัดส่วนตัวอักษรต่ออักขระทั้งหมดที่ได้คะแนนเต็ม
+    'max_symbol_ratio': 0.4,  # สัดส่วนสัญลักษณ์สูงสุดที่ได้คะแนนเต็ม
+    'max_char_run': 6,  # ตัวอักษรเดียวกันติดกันเท่านี้ตัวขึ้นไป = ขยะ ("||||||", "......")
+    'repeat_min_words': 6,  # ตรวจคำซ้ำเมื่อมีคำอย่างน้อยเท่านี้
+    'max_word_repeat': 0.5,  # สัดส่วนสูงสุดของคำที่ซ้ำมากที่สุด
+    'compression_min_chars': 120,  # ตรวจการวนซ้ำด้วยอัตราบีบอัดเมื่อข้อความยาวอย่างน้อยเท่านี้
+    'min_compression_ratio': 0.25,  # อัตราบีบอัด zlib ที่ต่ำกว่านี้ = รูปแบบวนซ้ำ
+    'dictionary_min_words': 4,  # ตรวจพจนานุกรมอังกฤษเมื่อมีคำละตินอย่างน้อยเท่านี้
+    'min_dictionary_hit_rate': 0.5,  # สัดส่วนคำที่เป็นคำอังกฤษ/อ่านออกเสียงได้ที่ได้คะแนนเต็ม
+    'refusal_max_chars': 160,  # ตรวจคำตอบปฏิเสธของ model เฉพาะข้อความที่สั้นกว่านี้ (ความยาวคำตอบสั้น ๆ)
+}
+
+# การตรวจการเลื่อน (scroll) ในพื้นที่ตรวจจับ
+SCROLL_CONFIG = {
+    'enabled': True,  # ตรวจการเลื่อน (scroll) ในพื้นที่ แล้ว OCR/แปลเฉพาะแถบที่เลื่อนเข้ามาใหม่
+    'min_matched_rows': 4,  # จำนวนแถว pixel ที่ตรงกันขั้นต่ำที่ยืนยันระยะเลื่อน
+    'max_mismatch_ratio': 0.02,  # สัดส่วนแถวที่ไม่ตรงกันในส่วนที่ซ้อนกันที่ยังถือว่าเป็นการเลื่อนล้วน
+    'min_shift_px': 8,  # เลื่อนน้อยกว่านี้ยังไม่อ่าน (แถบใหม่เตี้ยเกินกว่าจะเป็นบรรทัด) - สะสมจนกว่าจะพอ
+    'max_shift_ratio': 0.6,  # เลื่อนเกินสัดส่วนนี้ของความสูงพื้นที่ = อ่านใหม่ทั้งพื้นที่
+    'strip_margin_px': 24,  # ขยายแถบใหม่ไปหาแถวว่างได้ไม่เกินนี้ เพื่อไม่ตัดกลางบรรทัด
+    'blank_row_range': 12,  # แถวที่ค่าสว่างต่างกันไม่เกินนี้ถือเป็นแถวว่างระหว่างบรรทัด
+}
+
+# การตรวจจับภาษาของข้อความต้นฉบับ
+LANGUAGE_DETECTION_CONFIG = {
+    'min_letters': 12,  # ข้อความที่มีตัวอักษรน้อยกว่านี้ได้ความมั่นใจลดลง
+    'english_word_ratio': 0.15,  # สัดส่วนคำอังกฤษที่พบบ่อยขั้นต่ำ - ต่ำกว่านี้ถือว่าข้อความละตินไม่ชัดเจน
+    'remote_cache_entries': 2048,  # จำนวนผลการตรวจจับระยะไกลที่เก็บไว้
+}
+
+# การตั้งค่า log (ไฟล์ JSONL, ระดับแยกตาม module, จำกัดข้อความซ้ำ)
+LOGGING_CONFIG = {
+    'log_file': 'screen_translator.jsonl',  # ไฟล์ log แบบ JSONL (ในโฟลเดอร์ข้อมูลของแอป)
+    'level': 'INFO',  # ระดับของ root logger
+    'levels': {  # ระดับแยกตาม module (เช่น 'translation.ocr': 'DEBUG' เพื่อดูรายละเอียดของ OCR)
+        'urllib3': 'WARNING',
+        'utils.tracing': 'WARNING',  # DEBUG = บันทึกเวลาของทุก span (stage, duration_ms)
+    },
+    'console': True,  # แสดงข้อความบน console ด้วย
+    'rate_limit_burst': 5,  # ข้อความเดียวกันผ่านได้กี่ครั้งต่อช่วง
+    'rate_limit_interval_s': 10.0,  # ความยาวช่วงของการจำกัดข้อความซ้ำ
+    'rate_limit_exempt': ['utils.tracing'],  # logger ที่ไม่จำกัด (event เวลาของทุก span)
+}
+
+# การตั้งค่าการจับเวลาแต่ละขั้นตอน (performance panel)
+TRACING_CONFIG = {
+    'enabled': True,  # ปิดได้เพื่อตัด overhead ทั้งหมด
+    'window_size': 512,  # จำนวนค่าล่าสุดที่ใช้คำนวณ p50/p95/p99 ต่อขั้นตอน
+    'refresh_ms': 1000,  # ความถี่อัปเดต panel สถิติ
+    'export_file': 'trace_stats.json'  # ไฟล์ export (ในโฟลเดอร์ข้อมูลของแอป)
+}
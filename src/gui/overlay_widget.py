@@ -0,0 +1,142 @@
+"""
+OverlayWidget module - แสดงคำแปลทับพื้นที่ตรวจจับบนหน้าจอ
+หน้าต่างโปร่งใสเต็มจอแบบคลิกทะลุ (ใช้ ScreenOverlayWindow เดียวกับ SelectionWidget)
+
+- แต่ละพื้นที่เป็นหนึ่ง segment ที่เก็บ layout ของข้อความไว้ใน QStaticText
+  จัด layout ใหม่เฉพาะเมื่อข้อความหรือความกว้างเปลี่ยน - ย้ายพื้นที่อย่างเดียวไม่ต้องจัดใหม่
+- วาดใหม่เฉพาะกรอบของ segment ที่เปลี่ยน (กรอบเดิม + กรอบใหม่) ไม่ใช่ทั้งจอ
+"""
+
+import sys
+
+from PyQt5.QtCore import QRect, Qt
+from PyQt5.QtGui import QColor, QFont, QPainter, QStaticText, QTransform
+
+from config import OVERLAY_CONFIG
+from gui.selection_widget import ScreenOverlayWindow
+
+
+def exclude_from_capture(widget):
+    """ไม่ให้หน้าต่างนี้ติดไปในภาพที่จับหน้าจอ (Windows 10 2004+ เท่านั้น)
+
+    Returns:
+        bool: สำเร็จหรือไม่ - ระบบอื่นคืน False (overlay จะติดไปในภาพที่จับ)
+    """
+    if sys.platform != 'win32':
+        return False
+    try:
+        import ctypes
+        WDA_EXCLUDEFROMCAPTURE = 0x11
+        return bool(ctypes.windll.user32.SetWindowDisplayAffinity(int(widget.winId()), WDA_EXCLUDEFROMCAPTURE))
+    except Exception:
+        return False
+
+
+class _Segment:
+    """คำแปลของพื้นที่หนึ่ง พร้อม layout ที่จัดไว้แล้ว"""
+
+    __slots__ = ('text', 'anchor', 'width', 'static_text', 'bounds')
+
+    def __init__(self, text, anchor, width, static_text, bounds):
+        self.text = text
+        self.anchor = anchor  # กรอบของพื้นที่ตรวจจับ
+        self.width = width  # ความกว้างที่ใช้จัด layout
+        self.static_text = static_text
+        self.bounds = bounds  # กรอบที่วาดจริง (พื้นหลัง + ข้อความ)
+
+
+class OverlayWidget(ScreenOverlayWindow):
+    """overlay คำแปลแบบคลิกทะลุ - หนึ่ง segment ต่อพื้นที่ตรวจจับ"""
+
+    def __init__(self):
+        super().__init__(click_through=True)
+        config = OVERLAY_CONFIG
+        self.text_font = QFont(config['font_family'], config['font_size'])
+        self.text_color = QColor(*config['text_color'])
+        self.background = QColor(*config['background'])
+        self.padding = config['padding']
+        self.gap = config['gap']
+
+        self.segments = {}  # ชื่อพื้นที่ -> _Segment
+        self.stats = {'updates': 0, 'unchanged': 0, 'layouts': 0, 'repaints': 0, 'painted_segments': 0}
+        self.excluded_from_capture = config['exclude_from_capture'] and exclude_from_capture(self)
+        # overlay ที่ติดไปในภาพที่จับต้องไม่วาดทับพื้นที่ - ไม่เช่นนั้น OCR จะอ่านคำแปลของตัวเองแล้วแปลวนซ้ำ
+        self.below = config['placement'] == 'below' or not self.excluded_from_capture
+
+    def _layout(self, text, width):
+        """จัด layout ของข้อความครั้งเดียว แล้วเก็บไว้ใน QStaticText"""
+        static_text = QStaticText(text)
+        static_text.setTextFormat(Qt.PlainText)
+        static_text.setTextWidth(width)
+        static_text.setPerformanceHint(QStaticText.AggressiveCaching)
+        static_text.prepare(QTransform(), self.text_font)
+        self.stats['layouts'] += 1
+        return static_text
+
+    def _bounds(self, anchor, static_text):
+        """กรอบที่วาด segment (ทับพื้นที่ หรือใต้พื้นที่ตาม placement)"""
+        height = int(static_text.size().height() + 0.999) + 2 * self.padding
+        top = anchor.bottom() + self.gap if self.below else anchor.top()
+        return QRect(anchor.left(), top, anchor.width(), height)
+
+    def set_segment(self, name, text, rect):
+        """แสดงคำแปลของพื้นที่หนึ่ง
+
+        Args:
+            name (str): ชื่อพื้นที่
+            text (str): คำแปล ('' = ลบ segment)
+            rect (QRect): กรอบของพื้นที่ตรวจจับบนหน้าจอ
+        """
+        if not text:
+            self.remove_segment(name)
+            return
+        anchor = QRect(rect)
+        segment = self.segments.get(name)
+        if segment is not None and segment.text == text and segment.anchor == anchor:
+            self.stats['unchanged'] += 1
+            return
+
+        self.stats['updates'] += 1
+        width = max(1, anchor.width() - 2 * self.padding)
+        if segment is not None and segment.text == text and segment.width == width:
+            static_text = segment.static_text  # ย้ายอย่างเดียว - ใช้ layout เดิม
+        else:
+            static_text = self._layout(text, width)
+        bounds = self._bounds(anchor, static_text)
+
+        if segment is not None:
+            self.update(segment.bounds)
+        self.segments[name] = _Segment(text, anchor, width, static_text, bounds)
+        self.update(bounds)
+
+    def move_segment(self, name, rect):
+        """ย้าย/ปรับขนาด segment ตามพื้นที่ตรวจจับ"""
+        segment = self.segments.get(name)
+        if segment is not None:
+            self.set_segment(name, segment.text, rect)
+
+    def remove_segment(self, name):
+        """ลบ segment ของพื้นที่หนึ่ง"""
+        segment = self.segments.pop(name, None)
+        if segment is not None:
+            self.update(segment.bounds)
+
+    def clear(self):
+        """ลบทุก segment"""
+        for name in list(self.segments):
+            self.remove_segment(name)
+
+    def paintEvent(self, event):
+        """วาดเฉพาะ segment ที่อยู่ในกรอบที่ต้องวาดใหม่"""
+        dirty = event.rect()
+        painter = QPainter(self)
+        painter.setFont(self.text_font)
+        painter.setPen(self.text_color)
+        self.stats['repaints'] += 1
+        for segment in self.segments.values():
+            if not segment.bounds.intersects(dirty):
+                continue
+            painter.fillRect(segment.bounds, self.background)
+            painter.drawStaticText(segment.bounds.left() + self.padding, segment.bounds.top() + self.padding,
+                                   segment.static_text)
+            self.stats['painted_segments'] += 1
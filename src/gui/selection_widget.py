@@ -1,15 +1,50 @@
 """
 SelectionWidget module for screen selection functionality
+
+ระหว่างลาก/ปรับขนาด:
+- วาดใหม่เฉพาะกรอบเดิม + กรอบใหม่ (รวม handles และป้ายขนาด) ไม่ใช่ทั้งจอ
+- รวมสัญญาณตำแหน่งหลาย mouse move เป็นครั้งเดียวตาม selection_signal_interval_ms
+- แจ้ง interaction_changed ให้หน้าต่างหลักหยุดจับภาพจนกว่าจะปล่อยเมาส์
 """
 
 from PyQt5.QtWidgets import QWidget, QApplication
-from PyQt5.QtCore import Qt, QRect, pyqtSignal, QPoint
+from PyQt5.QtCore import Qt, QRect, pyqtSignal, QPoint, QTimer
 from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QCursor
 
+from config import UI_CONFIG
+
+
+class ScreenOverlayWindow(QWidget):
+    """หน้าต่างโปร่งใสเต็มจอแบบ tool ที่อยู่บนสุด - ใช้ร่วมกันระหว่างกรอบเลือกพื้นที่และ overlay คำแปล"""
+    
+    def __init__(self, click_through=False):
+        """
+        Args:
+            click_through (bool): ให้คลิก/เมาส์ทะลุไปยังหน้าต่างด้านล่าง และไม่แย่ง focus เมื่อแสดง
+        """
+        super().__init__()
+        
+        # กำหนดเป็น fullscreen window แบบ tool
+        flags = Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool
+        if click_through:
+            flags |= Qt.WindowTransparentForInput
+        self.setWindowFlags(flags)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        if click_through:
+            self.setAttribute(Qt.WA_TransparentForMouseEvents)
+            self.setAttribute(Qt.WA_ShowWithoutActivating)
+        
+        # กำหนดขนาดเต็มหน้าจอ
+        screen = QApplication.desktop().screenGeometry()
+        self.setGeometry(screen)
+
 
-class SelectionWidget(QWidget):
+class SelectionWidget(ScreenOverlayWindow):
     """Enhanced Widget สำหรับวาดกรอบเลือกพื้นที่บนหน้าจอ พร้อมการปรับปรุงการเคลื่อนไหว"""
     position_changed = pyqtSignal(int, int, int, int)
+    region_changed = pyqtSignal(str, int, int, int, int)  # name, x, y, width, height
+    active_region_changed = pyqtSignal(str)
+    interaction_changed = pyqtSignal(bool)  # True = เริ่มลาก/ปรับขนาด, False = ปล่อยเมาส์
     
     # กำหนดประเภทการปรับขนาด
     RESIZE_NONE = 0
@@ -25,16 +60,11 @@ class SelectionWidget(QWidget):
     def __init__(self):
         super().__init__()
         
-        # กำหนดเป็น fullscreen window แบบ tool
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
-        self.setAttribute(Qt.WA_TranslucentBackground)
-        
-        # กำหนดขนาดเต็มหน้าจอ
-        screen = QApplication.desktop().screenGeometry()
-        self.setGeometry(screen)
+        # พื้นที่ตรวจจับทั้งหมด (ชื่อ -> กรอบ) และพื้นที่ที่กำลังแก้ไข
+        self.regions = {'main': QRect(400, 300, 200, 100)}
+        self.active_region = 'main'
         
         # ตัวแปรสำหรับการลากและปรับขนาด
-        self.selection_rect = QRect(400, 300, 200, 100)
         self.dragging = False
         self.resizing = False
         self.resize_direction = self.RESIZE_NONE
@@ -54,26 +84,106 @@ class SelectionWidget(QWidget):
         self.movement_highlight_alpha = 30
         self.smooth_movement = True
         
+        # รวมสัญญาณตำแหน่งระหว่างลาก - ส่งไม่ถี่กว่า selection_signal_interval_ms
+        self.signal_timer = QTimer(self)
+        self.signal_timer.setSingleShot(True)
+        self.signal_timer.setInterval(UI_CONFIG['selection_signal_interval_ms'])
+        self.signal_timer.timeout.connect(self.emit_position_changed)
+        
         # แสดงตลอดเวลา
         self.show()
         
+    @property
+    def selection_rect(self):
+        """กรอบของพื้นที่ที่กำลังแก้ไขอยู่"""
+        return self.regions[self.active_region]
+    
+    @selection_rect.setter
+    def selection_rect(self, rect):
+        self.regions[self.active_region] = QRect(rect)
+    
+    def add_region(self, name, rect=None):
+        """เพิ่มพื้นที่ตรวจจับใหม่และตั้งให้เป็นพื้นที่ที่กำลังแก้ไข
+        
+        Args:
+            name (str): ชื่อพื้นที่
+            rect (QRect): กรอบเริ่มต้น (None = วางเยื้องจากพื้นที่ปัจจุบัน)
+        """
+        if rect is None:
+            rect = QRect(self.selection_rect).translated(30, 30)
+            rect = rect.intersected(self.rect()) if self.rect().isValid() else rect
+        self.regions[name] = QRect(rect)
+        self.set_active_region(name)
+        self.emit_position_changed()
+    
+    def remove_region(self, name):
+        """ลบพื้นที่ตรวจจับ (ต้องเหลืออย่างน้อยหนึ่งพื้นที่)"""
+        if name not in self.regions or len(self.regions) <= 1:
+            return False
+        rect = self.regions.pop(name)
+        self.update(self.paint_bounds(rect))
+        if self.active_region == name:
+            self.set_active_region(next(iter(self.regions)))
+        return True
+    
+    def region_names(self):
+        """รายชื่อพื้นที่ทั้งหมด"""
+        return list(self.regions.keys())
+    
+    def set_active_region(self, name):
+        """เลือกพื้นที่ที่จะลาก/ปรับขนาด"""
+        if name in self.regions and name != self.active_region:
+            previous = self.regions.get(self.active_region)
+            old_bounds = self.paint_bounds(previous) if previous is not None else QRect()
+            self.active_region = name
+            self.active_region_changed.emit(name)
+            self.update(old_bounds.united(self.paint_bounds(self.selection_rect)))
+    
+    def region_at(self, pos):
+        """หาชื่อพื้นที่ที่อยู่ใต้ตำแหน่งเมาส์ (พื้นที่ที่กำลังแก้ไขมาก่อน)"""
+        if self.expanded_rect(self.selection_rect).contains(pos):
+            return self.active_region
+        for name, rect in self.regions.items():
+            if rect.contains(pos):
+                return name
+        return None
+    
+    def expanded_rect(self, rect):
+        """ขยายกรอบออกไปเพื่อรวม resize handles"""
+        expanded = QRect(rect)
+        border = self.resize_border_width + self.resize_handle_size
+        expanded.adjust(-border, -border, border, border)
+        return expanded
+    
+    def label_rect(self, rect):
+        """กรอบของป้ายขนาด/สถานะ (ตำแหน่งเดียวกับ draw_enhanced_size_info)"""
+        y = rect.top() - 30
+        if y < 40:
+            y = rect.bottom() + 40
+        return QRect(rect.left() - 6, y - 20, max(rect.width(), 320) + 12, 66)
+    
+    def paint_bounds(self, rect):
+        """กรอบทั้งหมดที่ต้องวาดใหม่เมื่อพื้นที่นี้เปลี่ยน (กรอบ + handles + ป้ายขนาด)"""
+        return self.expanded_rect(rect).united(self.label_rect(rect))
+    
+    def update_selection(self, old_rect):
+        """วาดใหม่เฉพาะกรอบเดิมรวมกับกรอบใหม่ แล้วนัดส่งสัญญาณตำแหน่ง (รวมหลายครั้งเป็นครั้งเดียว)"""
+        self.update(self.paint_bounds(old_rect).united(self.paint_bounds(self.selection_rect)))
+        if not self.signal_timer.isActive():
+            self.signal_timer.start()
+        
     def get_interactive_region(self):
         """ได้พื้นที่ที่สามารถโต้ตอบได้ (selection rect + resize handles)"""
         if not self.visible_mode:
             return QRect()  # ไม่มีพื้นที่โต้ตอบเมื่อซ่อน
             
-        # ขยายกรอบออกไปเพื่อรวม resize handles
-        expanded_rect = QRect(self.selection_rect)
-        border = self.resize_border_width + self.resize_handle_size
-        expanded_rect.adjust(-border, -border, border, border)
-        return expanded_rect
+        return self.expanded_rect(self.selection_rect)
         
     def should_handle_mouse_event(self, pos):
         """ตรวจสอบว่าควรจัดการ mouse event หรือไม่"""
         if not self.visible_mode:
             return False
-        interactive_region = self.get_interactive_region()
-        return interactive_region.contains(pos)
+        return self.region_at(pos) is not None
         
     def paintEvent(self, event):
         """✨ Enhanced paint event with improved visual feedback"""
@@ -83,6 +193,9 @@ class SelectionWidget(QWidget):
             
         painter = QPainter(self)
         
+        # วาดพื้นที่อื่นที่ไม่ได้แก้ไขอยู่แบบจาง ๆ
+        self.draw_inactive_regions(painter)
+        
         # วาดพื้นที่ที่เลือก (สีดำโปร่งใส 60%)
         painter.fillRect(self.selection_rect, QColor(0, 0, 0, 153))  # 60% transparency = 255 * 0.6 = 153
         
@@ -116,6 +229,21 @@ class SelectionWidget(QWidget):
         # ✨ Enhanced size info with movement status (IMPROVED)
         self.draw_enhanced_size_info(painter)
     
+    def draw_inactive_regions(self, painter):
+        """วาดพื้นที่ตรวจจับอื่น ๆ พร้อมชื่อ"""
+        if len(self.regions) <= 1:
+            return
+        
+        painter.setFont(QFont("Arial", 9))
+        for name, rect in self.regions.items():
+            if name == self.active_region:
+                continue
+            painter.fillRect(rect, QColor(0, 0, 0, 90))
+            painter.setPen(QPen(QColor(255, 160, 0, 180), 1, Qt.DashLine))
+            painter.drawRect(rect)
+            painter.setPen(QPen(QColor(255, 255, 255, 220)))
+            painter.drawText(rect.left() + 4, rect.top() + 14, name)
+    
     def draw_move_icon(self, painter):
         """Draws a small cross icon at the top-left of the selection box."""
         rect = self.selection_rect
@@ -169,6 +297,8 @@ class SelectionWidget(QWidget):
         
         # Main size text
         size_text = f"{rect.width()} × {rect.height()}"
+        if len(self.regions) > 1:
+            size_text = f"{self.active_region}: {size_text}"
         
         # ✨ Add movement status indicator
         if self.dragging:
@@ -220,6 +350,9 @@ class SelectionWidget(QWidget):
                 event.ignore()
                 return
             
+            # คลิกที่พื้นที่อื่นเพื่อสลับไปแก้ไขพื้นที่นั้น
+            self.set_active_region(self.region_at(pos))
+            
             # ตรวจสอบว่าเป็นการปรับขนาดหรือไม่
             resize_direction = self.get_resize_direction(pos)
             
@@ -229,12 +362,14 @@ class SelectionWidget(QWidget):
                 self.resize_direction = resize_direction
                 self.drag_start_pos = pos
                 self.initial_rect = QRect(self.selection_rect)
+                self.interaction_changed.emit(True)
                 event.accept()
             else:
                 # ✨ Enhanced dragging - allow from anywhere in interactive region
                 self.dragging = True
                 self.drag_start_pos = pos
-                self.update()  # Trigger immediate visual feedback
+                self.interaction_changed.emit(True)
+                self.update(self.paint_bounds(self.selection_rect))  # Trigger immediate visual feedback
                 event.accept()
     
     def mouseMoveEvent(self, event):
@@ -257,10 +392,10 @@ class SelectionWidget(QWidget):
             if (new_rect.left() >= 0 and new_rect.top() >= 0 and 
                 new_rect.right() <= screen_rect.width() and 
                 new_rect.bottom() <= screen_rect.height()):
+                old_rect = self.selection_rect
                 self.selection_rect = new_rect
                 self.drag_start_pos = pos
-                self.update()
-                self.emit_position_changed()
+                self.update_selection(old_rect)
                 
         elif self.resizing and self.drag_start_pos and self.initial_rect:
             # ปรับขนาดกรอบ
@@ -296,16 +431,20 @@ class SelectionWidget(QWidget):
             # ✨ Enhanced move cursor with hover state
             self.setCursor(QCursor(Qt.SizeAllCursor))
             self.is_hovering_move_area = True
+        elif self.region_at(pos) is not None:
+            # พื้นที่อื่น - คลิกเพื่อเลือก
+            self.setCursor(QCursor(Qt.PointingHandCursor))
         else:
             self.setCursor(QCursor(Qt.ArrowCursor))
             
         # ✨ Update visual feedback if hover state changed
         if prev_hovering != self.is_hovering_move_area:
-            self.update()  # Trigger repaint for highlight effect
+            self.update(self.paint_bounds(self.selection_rect))  # Trigger repaint for highlight effect
     
     def mouseReleaseEvent(self, event):
         """✨ Enhanced mouse release with cleanup (IMPROVED)"""
         was_dragging = self.dragging
+        was_interacting = self.dragging or self.resizing
         
         self.dragging = False
         self.resizing = False
@@ -313,9 +452,16 @@ class SelectionWidget(QWidget):
         self.drag_start_pos = None
         self.initial_rect = None
         
+        # ส่งตำแหน่งสุดท้ายที่ยังค้างอยู่ทันที แล้วค่อยให้กลับมาจับภาพ
+        if self.signal_timer.isActive():
+            self.signal_timer.stop()
+            self.emit_position_changed()
+        if was_interacting:
+            self.interaction_changed.emit(False)
+        
         # ✨ Update visual feedback when dragging ends
         if was_dragging:
-            self.update()
+            self.update(self.paint_bounds(self.selection_rect))
     
     def resize_selection(self, current_pos):
         """ปรับขนาดกรอบตามทิศทางที่เลือก"""
@@ -351,10 +497,10 @@ class SelectionWidget(QWidget):
         new_rect = new_rect.intersected(screen_rect)
         
         # อัปเดตกรอบ
-        if new_rect.isValid():
+        if new_rect.isValid() and new_rect != self.selection_rect:
+            old_rect = self.selection_rect
             self.selection_rect = new_rect
-            self.update()
-            self.emit_position_changed()
+            self.update_selection(old_rect)
     
     def get_resize_direction(self, pos):
         """กำหนดทิศทางการปรับขนาดจากตำแหน่งที่คลิก"""
@@ -408,12 +554,9 @@ class SelectionWidget(QWidget):
     
     def emit_position_changed(self):
         """ส่งสัญญาณเมื่อตำแหน่งหรือขนาดเปลี่ยน"""
-        self.position_changed.emit(
-            self.selection_rect.x(),
-            self.selection_rect.y(),
-            self.selection_rect.width(),
-            self.selection_rect.height()
-        )
+        rect = self.selection_rect
+        self.position_changed.emit(rect.x(), rect.y(), rect.width(), rect.height())
+        self.region_changed.emit(self.active_region, rect.x(), rect.y(), rect.width(), rect.height())
     
     def keyPressEvent(self, event):
         """Handle keyboard events"""
@@ -4,7 +4,7 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                             QHBoxLayout, QPushButton, QTextEdit, QLabel, 
                             QFrame, QSplitter, QGroupBox, QProgressBar,
                             QCheckBox, QSpinBox, QSlider, QComboBox)
-from PyQt5.QtCore import Qt, QTimer, QRect, pyqtSignal, QThread, pyqtSlot, QPoint
+from PyQt5.QtCore import Qt, QRect, pyqtSignal, QObject, pyqtSlot, QPoint, QTimer, QThread
 from PyQt5.QtGui import QPainter, QPen, QColor, QFont, QCursor
 from PIL import Image
 
@@ -13,43 +13,47 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from translation.ocr import OCR
 from translation.translator import Translator
 from translation.ollama_service import ollama_service
-from translation.ollama_translator import OllamaTranslator
-from config import UI_CONFIG, OLLAMA_CONFIG
+from translation.regions import RegionScheduler
+from translation.sources import ScreenSource
+from translation.pipeline import Pipeline
+from translation.recording import SessionRecorder
+from translation.health import get_health_monitor
+from translation.generation import get_budget_tracker
+from config import (UI_CONFIG, OLLAMA_CONFIG, SCHEDULER_CONFIG, TRACING_CONFIG, CAPTURE_CONFIG, HEALTH_CONFIG,
+                    OVERLAY_CONFIG)
+from utils.tracing import get_tracer, traced
 from gui.selection_widget import SelectionWidget
 
 
-class OCRWorker(QThread):
-    """Worker thread สำหรับ OCR เพื่อป้องกานการค้างของ UI"""
-    finished = pyqtSignal(str, float)  # text, confidence
-    error = pyqtSignal(str)  # error message
+class PipelineBridge(QObject):
+    """ส่ง event จาก pipeline thread และสถานะจาก health monitor เข้าสู่ UI thread ผ่าน Qt signal"""
+    event = pyqtSignal(object)
+    health = pyqtSignal(object)
+
+
+class ModelDiscoveryWorker(QThread):
+    """ค้นหา Ollama models และตรวจการเชื่อมต่อใน background เพื่อไม่ให้หน้าต่างค้างตอนเปิด"""
+    discovered = pyqtSignal(object)
     
-    def __init__(self, ocr, screenshot):
+    def __init__(self, translator=None, force=False):
         super().__init__()
-        self.ocr = ocr
-        self.screenshot = screenshot
-        self._is_cancelled = False
+        self.translator = translator
+        self.force = force
     
     def run(self):
-        """รัน OCR ใน background thread"""
+        result = {'available': False, 'vision_models': [], 'text_models': []}
         try:
-            if self._is_cancelled:
-                return
-                
-            # สกัดข้อความพร้อมค่าความมั่นใจ
-            text, confidence = self.ocr.get_text_with_confidence(self.screenshot)
-            
-            if not self._is_cancelled:
-                self.finished.emit(text, confidence)
-                
+            # /api/tags ครั้งเดียว (และ /api/show เฉพาะ model ใหม่) แล้วอ่านจาก cache
+            if ollama_service.refresh(force=self.force):
+                result['available'] = True
+                result['vision_models'] = ollama_service.get_vision_models(refresh=False)
+                result['text_models'] = ollama_service.get_text_models(refresh=False)
+            # ตรวจการเชื่อมต่อของ translator ล่วงหน้า ไม่ให้ไปค้างตอนแปลครั้งแรก
+            if self.translator is not None:
+                self.translator.is_available()
         except Exception as e:
-            if not self._is_cancelled:
-                self.error.emit(str(e))
-    
-    def cancel(self):
-        """ยกเลิกการประมวลผล"""
-        self._is_cancelled = True
-        self.quit()
-        self.wait(2000)  # รอ 2 วินาทีให้ thread หยุด
+            result['error'] = str(e)
+        self.discovered.emit(result)
 
 
 class Window(QMainWindow):
@@ -62,6 +66,9 @@ class Window(QMainWindow):
         # ✨ Use the enhanced SelectionWidget
         self.selection_widget = SelectionWidget()
         self.selection_widget.position_changed.connect(self.on_selection_changed)
+        self.selection_widget.region_changed.connect(self.on_region_changed)
+        self.selection_widget.active_region_changed.connect(self.on_active_region_changed)
+        self.selection_widget.interaction_changed.connect(self.on_selection_interaction)
         
         # Rest of initialization...
         self.current_selection = QRect(100, 100, 300, 200)
@@ -74,23 +81,41 @@ class Window(QMainWindow):
         self.custom_prompt = ""  # Reset to default on restart
         OLLAMA_CONFIG['custom_prompt'] = ""  # Update config too
         
+        # Health monitor ตรวจ Ollama ใน background - translator อ่านสถานะจาก flag ที่ cache ไว้
+        self.health_monitor = get_health_monitor() if HEALTH_CONFIG['enabled'] else None
         self.ocr = OCR(vision_model=self.vision_model)
-        self.translator = Translator(service='ollama', ollama_model=self.translation_model, custom_prompt=self.custom_prompt)
+        self.translator = Translator(service='ollama', ollama_model=self.translation_model, custom_prompt=self.custom_prompt,
+                                     health=self.health_monitor)
         self.auto_translate = True
         self.target_language = 'th'
-        self.last_detected_text = ""
-        
-        # OCR Worker thread เพื่อป้องกันการค้าง
-        self.ocr_worker = None
+        self.region_translations = {}  # region name -> คำแปลล่าสุด
+        self.overlay = None  # OverlayWidget เมื่อเปิดแสดงคำแปลบนหน้าจอ
         
         # การตั้งค่าระยะเวลาการจับภาพ
         self.capture_interval = UI_CONFIG.get('capture_interval', 2000)  # default 2000ms
         
-        self.setup_ui()
+        # Scheduler กลางสำหรับทุกพื้นที่ - จับภาพครั้งเดียวต่อรอบ
+        self.active_region = self.selection_widget.active_region
+        self.region_scheduler = RegionScheduler(self.ocr.capture_screen)
+        self.region_scheduler.add_region(
+            self.active_region,
+            (self.current_selection.x(), self.current_selection.y(),
+             self.current_selection.width(), self.current_selection.height()),
+            interval_ms=self.capture_interval
+        )
+        
+        # Pipeline แบบ headless ทำงานใน background thread - หน้าต่างนี้เป็นเพียงผู้รับ event
+        self.pipeline = Pipeline(ScreenSource(self.region_scheduler), self.ocr, self.translator,
+                                 target_language=self.target_language, auto_translate=self.auto_translate)
+        self.pipeline_bridge = PipelineBridge()
+        self.pipeline_bridge.event.connect(self.on_pipeline_event)
+        self.pipeline.add_sink(self.pipeline_bridge.event.emit)
+        self.pipeline_bridge.health.connect(self.on_health_changed)
+        self.ollama_state = 'unknown'
+        self.session_recorder = None  # SessionRecorder ขณะบันทึก session
+        self.discovery_worker = None  # ModelDiscoveryWorker ที่ค้นหา Ollama models
         
-        # Timer setup
-        self.capture_timer = QTimer()
-        self.capture_timer.timeout.connect(self.capture_and_process)
+        self.setup_ui()
         
     def setup_ui(self):
         """ตั้งค่า UI - Windows Black & White Theme"""
@@ -242,9 +267,36 @@ class Window(QMainWindow):
             }
         """)
         
+        # ปุ่มเพิ่ม/ลบพื้นที่ตรวจจับ
+        region_buttons_layout = QHBoxLayout()
+        self.add_region_button = QPushButton("➕ พื้นที่")
+        self.add_region_button.clicked.connect(self.add_region)
+        self.add_region_button.setToolTip("เพิ่มพื้นที่ตรวจจับใหม่")
+        self.add_region_button.setStyleSheet(self.toggle_button.styleSheet().replace("min-width: 100px;", "min-width: 40px;"))
+        self.remove_region_button = QPushButton("➖ พื้นที่")
+        self.remove_region_button.clicked.connect(self.remove_active_region)
+        self.remove_region_button.setToolTip("ลบพื้นที่ที่เลือกอยู่")
+        self.remove_region_button.setStyleSheet(self.add_region_button.styleSheet())
+        region_buttons_layout.addWidget(self.add_region_button)
+        region_buttons_layout.addWidget(self.remove_region_button)
+        
         control_layout.addWidget(self.start_button)
         control_layout.addWidget(self.stop_button)
         control_layout.addWidget(self.toggle_button)
+        control_layout.addLayout(region_buttons_layout)
+        
+        # บันทึก session (ภาพ + ผลลัพธ์) สำหรับเล่นซ้ำด้วย replay_session.py
+        self.record_checkbox = QCheckBox("⏺️ บันทึก session")
+        self.record_checkbox.setChecked(CAPTURE_CONFIG['record_session'])
+        self.record_checkbox.setToolTip("บันทึกภาพที่จับได้และผลลัพธ์ลงไฟล์ เพื่อเล่นซ้ำและเทียบการตั้งค่า")
+        control_layout.addWidget(self.record_checkbox)
+        
+        # แสดงคำแปลทับพื้นที่ตรวจจับบนหน้าจอ (คลิกทะลุได้)
+        self.overlay_checkbox = QCheckBox("🪟 คำแปลบนหน้าจอ")
+        self.overlay_checkbox.setToolTip("แสดงคำแปลทับพื้นที่ตรวจจับโดยตรง (คลิกทะลุได้)")
+        self.overlay_checkbox.toggled.connect(self.set_overlay_enabled)
+        self.overlay_checkbox.setChecked(OVERLAY_CONFIG['enabled'])
+        control_layout.addWidget(self.overlay_checkbox)
         bottom_layout.addWidget(control_group)
         
         # Column 2: การตั้งค่าระยะเวลา
@@ -282,9 +334,20 @@ class Window(QMainWindow):
         self.interval_value_label.setMinimumWidth(40)
         self.interval_value_label.setStyleSheet("QLabel { font-weight: bold; color: #0078d4; font-size: 11px; }")
         
+        # ลำดับความสำคัญของพื้นที่ที่เลือกอยู่
+        priority_label = QLabel("ลำดับความสำคัญ:")
+        priority_label.setStyleSheet("QLabel { color: #323130; font-size: 11px; }")
+        
+        self.priority_spin = QSpinBox()
+        self.priority_spin.setRange(0, 10)
+        self.priority_spin.setValue(0)
+        self.priority_spin.valueChanged.connect(self.on_priority_changed)
+        
         interval_layout.addWidget(interval_label)
         interval_layout.addWidget(self.interval_slider)
         interval_layout.addWidget(self.interval_value_label)
+        interval_layout.addWidget(priority_label)
+        interval_layout.addWidget(self.priority_spin)
         bottom_layout.addWidget(interval_group)
         
         # Column 3: สถานะ
@@ -311,6 +374,11 @@ class Window(QMainWindow):
         ollama_group = QGroupBox("🤖 การตั้งค่า Ollama")
         ollama_layout = QVBoxLayout(ollama_group)
         
+        # สถานะการเชื่อมต่อ (อัปเดตจาก health monitor)
+        self.health_label = QLabel("🟡 Ollama: กำลังตรวจสอบ...")
+        self.health_label.setStyleSheet("QLabel { font-size: 10px; color: #605e5c; }")
+        self.health_label.setWordWrap(True)
+        
         # Vision Model Selection
         vision_label = QLabel("AI Vision Model:")
         vision_label.setStyleSheet("QLabel { color: #323130; font-size: 11px; }")
@@ -388,6 +456,7 @@ class Window(QMainWindow):
             }
         """)
         
+        ollama_layout.addWidget(self.health_label)
         ollama_layout.addWidget(vision_label)
         ollama_layout.addWidget(self.vision_model_combo)
         ollama_layout.addWidget(translation_label)
@@ -400,23 +469,123 @@ class Window(QMainWindow):
         # เพิ่ม layout 4 column ลงใน main layout
         main_layout.addLayout(bottom_layout)
         
+        # 3. Panel สถิติเวลาของแต่ละขั้นตอน (พับได้ - อัปเดตเฉพาะตอนเปิด)
+        self.perf_group = QGroupBox("⏱️ ประสิทธิภาพ (p50 / p95 / p99)")
+        self.perf_group.setCheckable(True)
+        self.perf_group.setChecked(False)
+        perf_layout = QVBoxLayout(self.perf_group)
+        
+        self.perf_content = QWidget()
+        perf_content_layout = QVBoxLayout(self.perf_content)
+        perf_content_layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.perf_label = QLabel("ยังไม่มีข้อมูล")
+        self.perf_label.setFont(QFont("Consolas", 9))
+        self.perf_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        
+        perf_buttons = QHBoxLayout()
+        self.perf_export_btn = QPushButton("💾 Export JSON")
+        self.perf_export_btn.clicked.connect(self.export_perf_stats)
+        self.perf_reset_btn = QPushButton("🔄 ล้างสถิติ")
+        self.perf_reset_btn.clicked.connect(self.reset_perf_stats)
+        perf_buttons.addWidget(self.perf_export_btn)
+        perf_buttons.addWidget(self.perf_reset_btn)
+        perf_buttons.addStretch()
+        
+        perf_content_layout.addWidget(self.perf_label)
+        perf_content_layout.addLayout(perf_buttons)
+        perf_layout.addWidget(self.perf_content)
+        self.perf_content.setVisible(False)
+        self.perf_group.toggled.connect(self.on_perf_panel_toggled)
+        main_layout.addWidget(self.perf_group)
+        
+        self.perf_timer = QTimer(self)
+        self.perf_timer.setInterval(TRACING_CONFIG['refresh_ms'])
+        self.perf_timer.timeout.connect(self.update_perf_panel)
+        
         # โหลด Ollama models เมื่อเริ่มต้น
         self.load_ollama_models()
+        if self.health_monitor is not None:
+            self.health_monitor.add_listener(self.pipeline_bridge.health.emit)
+            self.health_monitor.start()
         
     def on_selection_changed(self, x, y, width, height):
         """เมื่อพื้นที่ที่เลือกเปลี่ยน"""
         self.current_selection = QRect(x, y, width, height)
         self.position_label.setText(f"ตำแหน่ง: X={x}, Y={y}, กว้าง={width}, สูง={height}")
     
+    def on_region_changed(self, name, x, y, width, height):
+        """เมื่อพื้นที่ตรวจจับใด ๆ ถูกย้ายหรือปรับขนาด"""
+        if self.region_scheduler.get_region(name):
+            self.region_scheduler.update_region(name, rect=(x, y, width, height))
+        else:
+            self.region_scheduler.add_region(name, (x, y, width, height), interval_ms=self.capture_interval)
+        if self.overlay is not None:
+            self.overlay.move_segment(name, QRect(x, y, width, height))
+    
+    def on_selection_interaction(self, active):
+        """ระหว่างลาก/ปรับขนาดพื้นที่ หยุดจับภาพ - ภาพระหว่างทางไม่มีประโยชน์และทำให้ลากกระตุก"""
+        if active:
+            self.region_scheduler.pause()
+        else:
+            self.region_scheduler.resume()
+    
+    def on_active_region_changed(self, name):
+        """เมื่อเลือกพื้นที่อื่นเพื่อแก้ไข - แสดงค่าของพื้นที่นั้นใน UI"""
+        self.active_region = name
+        region = self.region_scheduler.get_region(name)
+        if region:
+            x, y, width, height = region.rect
+            self.current_selection = QRect(x, y, width, height)
+            self.position_label.setText(f"ตำแหน่ง ({name}): X={x}, Y={y}, กว้าง={width}, สูง={height}")
+            self.interval_slider.blockSignals(True)
+            self.interval_slider.setValue(region.interval_ms // 1000)
+            self.interval_slider.blockSignals(False)
+            self.interval_value_label.setText(f"{region.interval_ms // 1000}s")
+            self.priority_spin.blockSignals(True)
+            self.priority_spin.setValue(region.priority)
+            self.priority_spin.blockSignals(False)
+    
+    def add_region(self):
+        """เพิ่มพื้นที่ตรวจจับใหม่"""
+        names = self.selection_widget.region_names()
+        if len(names) >= SCHEDULER_CONFIG['max_regions']:
+            self.status_label.setText(f"สถานะ: เพิ่มได้สูงสุด {SCHEDULER_CONFIG['max_regions']} พื้นที่")
+            return
+        
+        index = len(names) + 1
+        while f"region{index}" in names:
+            index += 1
+        name = f"region{index}"
+        
+        # region_changed จะเพิ่มพื้นที่ลงใน scheduler
+        self.selection_widget.add_region(name)
+        self.status_label.setText(f"สถานะ: เพิ่มพื้นที่ {name}")
+    
+    def remove_active_region(self):
+        """ลบพื้นที่ที่เลือกอยู่"""
+        name = self.active_region
+        if self.selection_widget.remove_region(name):
+            self.region_scheduler.remove_region(name)
+            self.pipeline.last_text.pop(name, None)
+            self.region_translations.pop(name, None)
+            self.render_translations()
+            if self.overlay is not None:
+                self.overlay.remove_segment(name)
+            self.status_label.setText(f"สถานะ: ลบพื้นที่ {name}")
+    
+    def on_priority_changed(self, value):
+        """เมื่อเปลี่ยนลำดับความสำคัญของพื้นที่ที่เลือกอยู่"""
+        self.region_scheduler.update_region(self.active_region, priority=value)
+    
     def on_interval_changed(self, value):
         """เมื่อระยะเวลาการจับภาพเปลี่ยน"""
         self.capture_interval = value * 1000  # Convert seconds to milliseconds
         self.interval_value_label.setText(f"{value}s")
+        # scheduler ที่ pipeline ใช้อยู่จะเห็นค่าใหม่ในรอบถัดไป
+        self.region_scheduler.update_region(self.active_region, interval_ms=self.capture_interval)
         
-        # ถ้ากำลังจับภาพอยู่ให้อัปเดต timer
         if self.is_capturing:
-            self.capture_timer.stop()
-            self.capture_timer.start(self.capture_interval)
             print(f"🔄 อัปเดตระยะเวลาการจับภาพเป็น {value} วินาที")
         
     def start_capture(self):
@@ -425,8 +594,11 @@ class Window(QMainWindow):
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
         
-        # เริ่ม timer สำหรับจับภาพด้วยระยะเวลาที่กำหนด
-        self.capture_timer.start(self.capture_interval)
+        if self.record_checkbox.isChecked():
+            self.start_session_recording()
+        
+        # เริ่ม pipeline - รอบแรกจับภาพทุกพื้นที่ทันที รอบถัดไปตามกำหนดของแต่ละพื้นที่
+        self.pipeline.start()
         
         self.status_label.setText(f"สถานะ: เริ่มการจับภาพ (ทุก {self.capture_interval//1000} วินาที)")
         
@@ -436,118 +608,193 @@ class Window(QMainWindow):
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
         
-        # หยุด timer
-        self.capture_timer.stop()
+        # หยุด pipeline โดยไม่รอคำขอที่ค้างอยู่ (ผลลัพธ์ที่มาทีหลังจะถูกทิ้ง)
+        self.pipeline.stop(timeout=0)
+        self.stop_session_recording()
         
         self.status_label.setText("สถานะ: หยุดการจับภาพ")
-        
-    def capture_and_process(self):
-        """จับภาพหน้าจอและประมวลผล OCR"""
+    
+    def start_session_recording(self):
+        """เริ่มบันทึกภาพที่จับได้และผลลัพธ์ลงไฟล์ session"""
+        if self.session_recorder is not None:
+            return
         try:
-            # ตรวจสอบว่า OCR worker ยังทำงานอยู่หรือไม่
-            if self.ocr_worker and self.ocr_worker.isRunning():
-                print("⚠️ OCR ยังทำงานอยู่ ข้าม capture ครั้งนี้")
-                return
-                
-            self.status_label.setText("สถานะ: กำลังจับภาพ...")
-            
-            # จับภาพพื้นที่ที่เลือก
-            region = (
-                self.current_selection.x(),
-                self.current_selection.y(),
-                self.current_selection.width(),
-                self.current_selection.height()
-            )
-            
-            # ใช้ OCR สำหรับสกัดข้อความ
-            screenshot = self.ocr.capture_screen(region)
-            
-            if screenshot:
-                # ยกเลิก worker เก่าถ้ามี
-                if self.ocr_worker:
-                    self.ocr_worker.cancel()
-                    
-                # สร้าง worker ใหม่
-                self.ocr_worker = OCRWorker(self.ocr, screenshot)
-                self.ocr_worker.finished.connect(self.on_ocr_finished)
-                self.ocr_worker.error.connect(self.on_ocr_error)
-                
-                # เริ่มประมวลผล OCR ใน background
-                self.status_label.setText("สถานะ: กำลังอ่านข้อความ...")
-                self.ocr_worker.start()
-            else:
-                self.status_label.setText("สถานะ: ไม่สามารถจับภาพได้")
-                
+            self.session_recorder = SessionRecorder()
         except Exception as e:
-            self.translated_text.clear()
-            self.translated_text.append(f"❌ เกิดข้อผิดพลาด: {str(e)}")
-            self.status_label.setText("สถานะ: เกิดข้อผิดพลาด")
+            print(f"❌ ไม่สามารถเริ่มบันทึก session: {e}")
+            return
+        self.session_recorder.attach(self.region_scheduler)
+        self.pipeline.add_sink(self.session_recorder)
+        print(f"⏺️ เริ่มบันทึก session: {self.session_recorder.path}")
     
-    @pyqtSlot(str, float)
-    def on_ocr_finished(self, text, confidence):
-        """เมื่อ OCR เสร็จสิ้น"""
-        try:
+    def stop_session_recording(self):
+        """หยุดบันทึก session และปิดไฟล์"""
+        if self.session_recorder is None:
+            return
+        self.pipeline.remove_sink(self.session_recorder)
+        stats = self.session_recorder.close()
+        self.session_recorder = None
+        print(f"💾 บันทึก session แล้ว: {stats['path']} "
+              f"({stats['frames']} ภาพ, {stats['events']} events, {stats['bytes'] // 1024} KB)")
+        
+    @pyqtSlot(object)
+    def on_pipeline_event(self, event):
+        """รับ event จาก pipeline แล้วอัปเดต UI"""
+        event_type = event.get('type')
+        region_name = event.get('region')
+        
+        if event_type == 'ocr':
             self.status_label.setText("สถานะ: กำลังประมวลผล...")
-            
-            # แสดงข้อความ
-            if text.strip():
-                # ตรวจสอบว่าเป็นข้อความใหม่หรือไม่
-                if text != self.last_detected_text:
-                    # แปลอัตโนมัติเสมอ
-                    if self.auto_translate:
-                        self.translate_text(text)
-                    
-                    self.last_detected_text = text
-            
-            self.status_label.setText("สถานะ: พร้อมใช้งาน")
-            
-        except Exception as e:
-            self.on_ocr_error(str(e))
+            if not event['text'].strip():
+                self.status_label.setText("สถานะ: พร้อมใช้งาน")
+        
+        elif event_type == 'translation':
+            if event['translated_text']:
+                # เก็บคำแปลล่าสุดของพื้นที่นี้แล้วแสดงใหม่ทั้งหมด (แสดงเฉพาะคำแปล)
+                self.region_translations[region_name or self.active_region] = event['translated_text']
+                self.render_translations()
+                self.update_overlay(region_name or self.active_region)
+                self.status_label.setText("สถานะ: แปลสำเร็จ")
+            else:
+                self.region_translations[region_name or self.active_region] = "❌ ไม่สามารถแปลข้อความได้"
+                self.render_translations()
+                self.status_label.setText("สถานะ: แปลไม่สำเร็จ")
+        
+        elif event_type == 'error':
+            self.on_pipeline_error(event['stage'], region_name, event['error'])
     
-    @pyqtSlot(str)
-    def on_ocr_error(self, error_message):
-        """เมื่อ OCR เกิดข้อผิดพลาด"""
+    def on_pipeline_error(self, stage, region_name, error_message):
+        """เมื่อ pipeline เกิดข้อผิดพลาดในขั้นตอนใดขั้นตอนหนึ่ง (แสดงแทนคำแปลของพื้นที่นั้น - พื้นที่อื่นไม่เปลี่ยน)"""
+        if stage == 'translate' and error_message == 'translator not available':
+            message = "❌ ระบบแปลภาษาไม่พร้อมใช้งาน"
+            self.status_label.setText("สถานะ: ระบบแปลไม่พร้อมใช้งาน")
+        elif stage == 'translate':
+            message = f"❌ เกิดข้อผิดพลาดในการแปล: {error_message}"
+            self.status_label.setText("สถานะ: เกิดข้อผิดพลาดในการแปล")
+        elif stage == 'ocr':
+            message = f"❌ เกิดข้อผิดพลาด OCR: {error_message}"
+            self.status_label.setText("สถานะ: เกิดข้อผิดพลาด OCR")
+        else:
+            message = f"❌ เกิดข้อผิดพลาด: {error_message}"
+            self.status_label.setText("สถานะ: เกิดข้อผิดพลาด")
+        self.region_translations[region_name or self.active_region] = message
+        self.render_translations()
+    
+    @traced('ui.update')
+    def render_translations(self):
+        """แสดงคำแปลของทุกพื้นที่ (มีหัวข้อชื่อพื้นที่เมื่อมีมากกว่าหนึ่งพื้นที่)"""
         self.translated_text.clear()
-        self.translated_text.append(f"❌ เกิดข้อผิดพลาด OCR: {error_message}")
-        self.status_label.setText("สถานะ: เกิดข้อผิดพลาด OCR")
+        
+        names = [name for name in self.region_scheduler.region_names() if name in self.region_translations]
+        if len(self.region_scheduler.region_names()) <= 1:
+            for name in names:
+                self.translated_text.append(self.region_translations[name])
+        else:
+            for name in names:
+                self.translated_text.append(f"[{name}]\n{self.region_translations[name]}\n")
+        
+        # เลื่อนไปที่ข้อความล่าสุด
+        self.translated_text.verticalScrollBar().setValue(
+            self.translated_text.verticalScrollBar().maximum()
+        )
     
-    def translate_text(self, text):
-        """แปลข้อความ"""
+    def on_perf_panel_toggled(self, expanded):
+        """พับ/กาง panel สถิติ - timer ทำงานเฉพาะตอนกางอยู่"""
+        self.perf_content.setVisible(expanded)
+        if expanded:
+            self.update_perf_panel()
+            self.perf_timer.start()
+        else:
+            self.perf_timer.stop()
+    
+    def update_perf_panel(self):
+        """แสดง p50/p95/p99 ของแต่ละขั้นตอน"""
+        tracer = get_tracer()
+        if not tracer.enabled:
+            self.perf_label.setText("การจับเวลาถูกปิดอยู่ (TRACING_CONFIG['enabled'])")
+            return
+        
+        snapshot = tracer.snapshot()
+        if not snapshot:
+            self.perf_label.setText("ยังไม่มีข้อมูล")
+            return
+        
+        lines = [f"{'ขั้นตอน':<14}{'n':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"]
+        for name, stats in snapshot.items():
+            lines.append(f"{name:<14}{stats['count']:>7}{stats['p50_ms']:>8.1f}ms"
+                         f"{stats['p95_ms']:>8.1f}ms{stats['p99_ms']:>8.1f}ms{stats['max_ms']:>8.1f}ms")
+        
+        # สถานะ circuit breaker ของแต่ละ backend
+        breakers = self.translator.breaker_stats()
+        lines.append(f"สลับไป service สำรอง: {breakers['failovers']} ครั้ง")
+        for name, stats in breakers['backends'].items():
+            time_in_state = " ".join(f"{k}={v:.0f}s" for k, v in stats['time_in_state_s'].items())
+            lines.append(f"  {name:<8}{stats['state']:<11}ตัดวงจร {stats['trips']} ครั้ง | {time_in_state}")
+        hedge = self.translator.hedge_stats()
+        if hedge['enabled']:
+            wins = " ".join(f"{name}={count}" for name, count in hedge['wins'].items())
+            lines.append(f"Hedge: ส่งซ้ำ {hedge['hedge_rate'] * 100:.1f}% ({hedge['hedged']}/{hedge['requests']}) "
+                         f"หลัง {hedge['hedge_delay_ms']:.0f}ms | ชนะ: {wins or '-'}")
+        if self.translator.memory is not None:
+            memory = self.translator.memory.snapshot()
+            reused = memory['exact'] + memory['adapted'] + memory['fuzzy']
+            lines.append(f"Translation memory: {memory['entries']} รายการ | ใช้ซ้ำ {reused}/{memory['lookups']} "
+                         f"(แทนที่ {memory['adapted']}, คล้าย {memory['fuzzy']})")
+        quality = self.pipeline.quality_gate.snapshot()
+        if quality['checked']:
+            reasons = " ".join(f"{name}={count}" for name, count in quality['reasons'].items())
+            lines.append(f"คัด OCR ทิ้งก่อนแปล: {quality['rejected']}/{quality['checked']} "
+                         f"({quality['reject_rate'] * 100:.1f}%) | {reasons or '-'}")
+        scroll = self.pipeline.scroll_tracker.snapshot()
+        if scroll['scrolls']:
+            lines.append(f"Scroll: อ่านเฉพาะแถบใหม่ {scroll['scrolls']}/{scroll['frames']} เฟรม "
+                         f"(รอสะสม {scroll['deferred']}) | ส่ง OCR {scroll['read_ratio'] * 100:.0f}% ของแถว")
+        if self.overlay is not None:
+            overlay = self.overlay.stats
+            lines.append(f"Overlay: อัปเดต {overlay['updates']} (ซ้ำ {overlay['unchanged']}) | "
+                         f"จัด layout {overlay['layouts']} | วาด {overlay['painted_segments']} segment "
+                         f"ใน {overlay['repaints']} ครั้ง")
+        # num_predict ที่ตั้งเทียบกับ token ที่ model สร้างจริง
+        for kind, stats in get_budget_tracker().snapshot().items():
+            lines.append(f"Budget {kind}: ใช้ {stats['utilization'] * 100:.0f}% ของ {stats['avg_budget']:.0f} tokens | "
+                         f"ถูกตัด {stats['truncated']} ครั้ง, ขอใหม่ {stats['retries']} ครั้ง")
+        self.perf_label.setText("\n".join(lines))
+    
+    def export_perf_stats(self):
+        """บันทึกสถิติเวลาเป็นไฟล์ JSON"""
         try:
-            self.status_label.setText("สถานะ: กำลังแปล...")
-            
-            # ตรวจสอบว่า translator พร้อมใช้งานหรือไม่
-            if not self.translator.is_available():
-                self.translated_text.clear()
-                self.translated_text.append("❌ ระบบแปลภาษาไม่พร้อมใช้งาน")
-                self.status_label.setText("สถานะ: ระบบแปลไม่พร้อมใช้งาน")
-                return
-            
-            # แปลข้อความ
-            result = self.translator.translate(text, self.target_language)
-            
-            if result['translated_text']:
-                # Auto clean old content when new text arrives
-                self.translated_text.clear()
-                
-                # แสดงเฉพาะคำแปล
-                self.translated_text.append(f"{result['translated_text']}")
-                
-                # เลื่อนไปที่ข้อความล่าสุด
-                self.translated_text.verticalScrollBar().setValue(
-                    self.translated_text.verticalScrollBar().maximum()
-                )
-                
-                self.status_label.setText("สถานะ: แปลสำเร็จ")
-            else:
-                self.translated_text.clear()
-                self.translated_text.append("❌ ไม่สามารถแปลข้อความได้")
-                self.status_label.setText("สถานะ: แปลไม่สำเร็จ")
-                
+            path = get_tracer().export_json()
+            self.status_label.setText("สถานะ: บันทึกสถิติแล้ว")
+            print(f"💾 บันทึกสถิติเวลาไปที่: {path}")
         except Exception as e:
-            self.translated_text.clear()
-            self.translated_text.append(f"❌ เกิดข้อผิดพลาดในการแปล: {str(e)}")
-            self.status_label.setText("สถานะ: เกิดข้อผิดพลาดในการแปล")
+            print(f"❌ ไม่สามารถบันทึกสถิติ: {e}")
+            self.status_label.setText("สถานะ: บันทึกสถิติไม่สำเร็จ")
+    
+    def reset_perf_stats(self):
+        """ล้างสถิติเวลาทั้งหมด"""
+        get_tracer().reset()
+        self.update_perf_panel()
+    
+    def set_overlay_enabled(self, enabled):
+        """เปิด/ปิด overlay คำแปลบนหน้าจอ (สร้างหน้าต่างเมื่อเปิดครั้งแรก)"""
+        if enabled:
+            if self.overlay is None:
+                from gui.overlay_widget import OverlayWidget
+                self.overlay = OverlayWidget()
+            for name in self.region_translations:
+                self.update_overlay(name)
+            self.overlay.show()
+        elif self.overlay is not None:
+            self.overlay.clear()
+            self.overlay.hide()
+    
+    def update_overlay(self, region_name):
+        """แสดงคำแปลล่าสุดของพื้นที่บน overlay (วาดใหม่เฉพาะ segment นั้น)"""
+        if self.overlay is None or not self.overlay_checkbox.isChecked():
+            return
+        region = self.region_scheduler.get_region(region_name)
+        if region is not None:
+            self.overlay.set_segment(region_name, self.region_translations.get(region_name, ''), QRect(*region.rect))
     
     def toggle_selection_visibility(self):
         """สลับการแสดงผลของ selection widget"""
@@ -557,43 +804,72 @@ class Window(QMainWindow):
         """ตั้งค่าการแสดงผลของ selection widget"""
         self.selection_widget.set_visible_mode(visible)
     
-    def load_ollama_models(self):
-        """โหลดรายการ models จาก Ollama และอัปเดต UI"""
-        try:
-            # ล้างรายการเดิม
-            self.vision_model_combo.clear()
-            self.translation_model_combo.clear()
-            
-            if ollama_service.is_available():
-                # ดึงรายการ models
-                vision_models = ollama_service.get_vision_models()
-                text_models = ollama_service.get_text_models()
-                
-                # เพิ่มลงใน combo boxes
-                self.vision_model_combo.addItems(vision_models)
-                self.translation_model_combo.addItems(text_models)
-                
-                # ตั้งค่า current selection
-                if self.vision_model in vision_models:
-                    self.vision_model_combo.setCurrentText(self.vision_model)
-                if self.translation_model in text_models:
-                    self.translation_model_combo.setCurrentText(self.translation_model)
-                
-                print(f"✅ โหลด Ollama models สำเร็จ: Vision={len(vision_models)}, Text={len(text_models)}")
-            else:
-                # ใส่ default model เมื่อ Ollama ไม่พร้อมใช้งาน
-                self.vision_model_combo.addItem(self.vision_model)
-                self.translation_model_combo.addItem(self.translation_model)
-                print("⚠️ Ollama ไม่พร้อมใช้งาน - ใช้ default models")
-                
-        except Exception as e:
-            print(f"❌ Error loading Ollama models: {e}")
-            # Fallback ถ้ามีข้อผิดพลาด
-            self.vision_model_combo.addItem(self.vision_model)
-            self.translation_model_combo.addItem(self.translation_model)
+    def load_ollama_models(self, force=False):
+        """แสดงรายการ models ที่บันทึกไว้ทันที แล้วอัปเดตจาก Ollama ใน background
+        
+        Args:
+            force (bool): ถาม Ollama ใหม่แม้รายการใน cache ยังไม่หมดอายุ
+        """
+        self.populate_model_combos(ollama_service.get_vision_models(refresh=False),
+                                   ollama_service.get_text_models(refresh=False))
         
         # ตั้งค่า custom prompt
         self.prompt_text.setText(self.custom_prompt)
+        
+        if self.discovery_worker is not None and self.discovery_worker.isRunning():
+            return
+        self.discovery_worker = ModelDiscoveryWorker(self.translator, force=force)
+        self.discovery_worker.discovered.connect(self.on_models_discovered)
+        self.discovery_worker.start()
+    
+    @pyqtSlot(object)
+    def on_models_discovered(self, result):
+        """เมื่อค้นหา models เสร็จ (เรียกใน UI thread)"""
+        if result.get('error'):
+            print(f"❌ Error loading Ollama models: {result['error']}")
+        
+        if result['available']:
+            self.populate_model_combos(result['vision_models'], result['text_models'])
+            print(f"✅ โหลด Ollama models สำเร็จ: Vision={len(result['vision_models'])}, "
+                  f"Text={len(result['text_models'])}")
+        else:
+            print("⚠️ Ollama ไม่พร้อมใช้งาน - ใช้ default models")
+    
+    @pyqtSlot(object)
+    def on_health_changed(self, health):
+        """เมื่อสถานะ Ollama เปลี่ยน (เรียกใน UI thread)"""
+        previous, self.ollama_state = self.ollama_state, health['state']
+        if health['state'] == 'up':
+            if any(self.translation_model in name for name in health['loaded_models']):
+                residency = f"{self.translation_model} โหลดอยู่"
+            else:
+                residency = f"{self.translation_model} ยังไม่โหลด (คำแปลแรกอาจช้า)"
+            self.health_label.setText(f"🟢 Ollama: เชื่อมต่อแล้ว - {residency}")
+            self.health_label.setToolTip("\n".join(health['loaded_models']) or "ไม่มี model ในหน่วยความจำ")
+            # Ollama เพิ่งกลับมา - โหลดรายการ models ใหม่
+            if previous == 'down':
+                print("✅ Ollama กลับมาเชื่อมต่อได้แล้ว")
+                self.load_ollama_models(force=True)
+        else:
+            self.health_label.setText("🔴 Ollama: เชื่อมต่อไม่ได้ - กำลังลองเชื่อมต่อใหม่อัตโนมัติ")
+            self.health_label.setToolTip(health['last_error'])
+            if previous == 'up':
+                print("⚠️ ขาดการเชื่อมต่อกับ Ollama - กำลังลองเชื่อมต่อใหม่")
+    
+    def populate_model_combos(self, vision_models, text_models):
+        """ใส่รายการ models ลงใน combo boxes โดยคง model ที่เลือกอยู่"""
+        for combo, models, current, on_changed in (
+                (self.vision_model_combo, vision_models, self.vision_model, self.on_vision_model_changed),
+                (self.translation_model_combo, text_models, self.translation_model, self.on_translation_model_changed)):
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItems(models or [current])
+            if current in models:
+                combo.setCurrentText(current)
+            combo.blockSignals(False)
+            # model เดิมไม่มีในเครื่อง - ใช้ model แรกที่มี
+            if models and current not in models:
+                on_changed(combo.currentText())
     
     def on_vision_model_changed(self, model_name):
         """เมื่อเปลี่ยน Vision Model"""
@@ -653,12 +929,20 @@ class Window(QMainWindow):
     
     def closeEvent(self, event):
         """เมื่อปิดหน้าต่างหลัก"""
-        # ยกเลิกและรอ OCR worker
-        if self.ocr_worker and self.ocr_worker.isRunning():
-            print("🛑 กำลังยกเลิก OCR worker...")
-            self.ocr_worker.cancel()
+        # หยุด pipeline และรอคำขอที่ค้างอยู่
+        if self.pipeline.is_running():
+            print("🛑 กำลังหยุด pipeline...")
+            self.pipeline.stop(timeout=2.0)
+        self.stop_session_recording()
+        if self.health_monitor is not None:
+            self.health_monitor.remove_listener(self.pipeline_bridge.health.emit)
+            self.health_monitor.stop()
+        if self.discovery_worker is not None:
+            self.discovery_worker.wait(1000)
         
         self.selection_widget.close()
+        if self.overlay is not None:
+            self.overlay.close()
         event.accept()
 
 
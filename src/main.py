@@ -1,12 +1,14 @@
 import sys
 from PyQt5.QtWidgets import QApplication
 from gui.window import Window
+from utils.helpers import setup_logging
 
 def main():
+    setup_logging()
     app = QApplication(sys.argv)
     window = Window()
     window.show()
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,100 @@
+"""
+Replay CLI for Screen Translator
+เล่นไฟล์ session ที่บันทึกไว้ผ่าน Pipeline อีกครั้ง เพื่อเทียบการตั้งค่า change gate, cache และ scheduler
+บน input ชุดเดียวกัน
+
+ตัวอย่าง:
+    python replay_session.py session_20240101_120000.stsession --max-speed
+    python replay_session.py session.stsession --max-speed --change-threshold 8 --no-cache
+    python replay_session.py session.stsession --interval 2000 --no-translate
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import CACHE_CONFIG, OLLAMA_CONFIG, TRANSLATION_CONFIG
+
+
+def build_parser():
+    """สร้าง argument parser"""
+    parser = argparse.ArgumentParser(description="เล่นไฟล์ session ซ้ำผ่าน pipeline แล้วเทียบกับผลตอนบันทึก")
+    parser.add_argument('session', help="ไฟล์ .stsession")
+    parser.add_argument('--speed', type=float, default=1.0, help="ความเร็วการเล่น (1.0 = เท่าตอนบันทึก)")
+    parser.add_argument('--max-speed', action='store_true', help="เล่นเร็วที่สุดโดยไม่รอตามเวลาที่บันทึก")
+    parser.add_argument('--interval', type=int, default=None, help="แทนที่ interval ของทุกพื้นที่ (ms)")
+    parser.add_argument('--change-threshold', type=float, default=None, help="แทนที่ threshold ของ change gate")
+    parser.add_argument('--max-dispatch', type=int, default=None, help="จำนวนพื้นที่สูงสุดที่ส่ง OCR ต่อรอบ")
+    parser.add_argument('--vision-model', default=OLLAMA_CONFIG['vision_model'])
+    parser.add_argument('--translation-model', default=OLLAMA_CONFIG['translation_model'])
+    parser.add_argument('--no-translate', action='store_true', help="OCR อย่างเดียว")
+    parser.add_argument('--no-cache', action='store_true', help="ปิด cache ของ OCR และคำแปล")
+    return parser
+
+
+def main(argv=None):
+    """Entry point ของ replay CLI"""
+    args = build_parser().parse_args(argv)
+    from utils.helpers import setup_logging
+    setup_logging()
+    if not os.path.isfile(args.session):
+        print(f"❌ ไม่พบไฟล์: {args.session}")
+        return 1
+
+    if args.no_cache:
+        CACHE_CONFIG['enable_ocr_cache'] = False
+        TRANSLATION_CONFIG['enable_cache'] = False
+
+    from translation.ocr import OCR
+    from translation.pipeline import Pipeline
+    from translation.recording import ReplaySource, load_session_events
+    from translation.translator import Translator
+
+    source = ReplaySource(args.session, speed=None if args.max_speed else args.speed,
+                          interval_ms=args.interval, change_threshold=args.change_threshold,
+                          max_dispatch_per_tick=args.max_dispatch)
+    ocr = OCR(vision_model=args.vision_model)
+    translator = None if args.no_translate else Translator(service='ollama', ollama_model=args.translation_model)
+
+    replayed = []
+    pipeline = Pipeline(source, ocr, translator, sinks=[replayed.append], auto_translate=not args.no_translate)
+
+    print(f"⏯️ เล่น session: {args.session} ({'เร็วที่สุด' if args.max_speed else f'x{args.speed}'})")
+    started = time.perf_counter()
+    pipeline.start()
+    try:
+        while pipeline.is_running():
+            pipeline.wait(0.5)
+    except KeyboardInterrupt:
+        print("\n🛑 ถูกขัดจังหวะ")
+        pipeline.stop()
+    elapsed = time.perf_counter() - started
+
+    recorded = load_session_events(args.session)
+    stats = pipeline.stats()
+    source_stats = stats['source']
+
+    def count(events, event_type):
+        return sum(1 for e in events if e.get('type') == event_type)
+
+    print("=" * 60)
+    print(f"📊 เล่นภาพ {source_stats['frames_replayed']} ภาพใน {elapsed:.1f}s")
+    print(f"   ส่ง OCR: {stats['ocr_requests']} ครั้ง | ข้อความซ้ำ: {stats['duplicates']} | ข้อผิดพลาด: {stats['errors']}")
+    for name, region in source_stats['regions'].items():
+        print(f"   [{name}] จับ {region['captures']} | เปลี่ยน {region['changes']} "
+              f"| ไม่เปลี่ยน {region['unchanged']} | รอภาพนิ่ง {region['settling']} "
+              f"(ครบเวลารอ {region['settle_forced']}) | ส่งต่อ {region['dispatched']}")
+    print(f"   OCR events: ตอนบันทึก {count(recorded, 'ocr')} -> เล่นซ้ำ {count(replayed, 'ocr')}")
+    print(f"   คำแปล: ตอนบันทึก {count(recorded, 'translation')} -> เล่นซ้ำ {count(replayed, 'translation')}")
+    for component in (ocr, translator):
+        cache = getattr(component, 'cache', None)
+        if cache is not None:
+            print(f"   cache {os.path.basename(cache.path or 'memory')}: {cache.stats()}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Cache Module for Screen Translator
+Cache แบบ LRU ในหน่วยความจำ พร้อมเก็บลงดิสก์ด้วย SQLite (ถ้ากำหนด path)
+ใช้ร่วมกันระหว่างแอป GUI และ batch CLI สำหรับผล OCR และผลการแปล
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(*parts) -> str:
+    """สร้าง cache key จากหลายส่วน (str หรือ bytes)"""
+    digest = hashlib.sha1()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode('utf-8')
+        digest.update(part)
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def image_key(image) -> str:
+    """สร้าง key จากเนื้อหาของภาพ (ขนาด + mode + pixel)"""
+    return make_key(image.mode, image.size, image.tobytes())
+
+
+def default_cache_path(filename: str) -> str:
+    """ได้ path มาตรฐานของไฟล์ cache ในโฟลเดอร์ข้อมูลแอป"""
+    from utils.helpers import get_app_data_dir
+    return os.path.join(get_app_data_dir(), filename)
+
+
+class Cache:
+    """Cache แบบ key-value (ค่าต้องแปลงเป็น JSON ได้) ใช้งานได้จากหลาย thread"""
+
+    def __init__(self, path: Optional[str] = None, max_memory_entries: Optional[int] = None):
+        """
+        Args:
+            path (str): ไฟล์ SQLite สำหรับเก็บถาวร (None = เก็บในหน่วยความจำอย่างเดียว)
+            max_memory_entries (int): จำนวนรายการสูงสุดใน LRU
+        """
+        self.path = path
+        self.max_memory_entries = max_memory_entries or CACHE_CONFIG['memory_entries']
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+                self._db.commit()
+            except Exception as e:
+                logger.error("❌ ไม่สามารถเปิดไฟล์ cache %s: %s", path, e)
+                self._db = None
+
+    def get(self, key: str) -> Optional[Any]:
+        """อ่านค่าจาก cache (None ถ้าไม่มี)"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        """บันทึกค่าลง cache"""
+        with self._lock:
+            self._remember(key, value)
+            if self._db is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)",
+                                     (key, json.dumps(value, ensure_ascii=False)))
+                    self._db.commit()
+                except Exception as e:
+                    logger.error("❌ ไม่สามารถบันทึก cache: %s", e)
+
+    def _remember(self, key: str, value: Any):
+        """เก็บลง LRU และตัดรายการเก่าที่เกินขนาด"""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict:
+        """สถิติการใช้ cache"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'memory_entries': len(self._memory),
+            'persistent': self._db is not None,
+        }
+
+    def close(self):
+        """ปิดไฟล์ cache"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_shared_caches: Dict[str, Cache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache(filename: str) -> Cache:
+    """ได้ cache ถาวรที่ใช้ร่วมกันทั้งโปรเซส (เปิดไฟล์ครั้งเดียวต่อชื่อไฟล์)"""
+    with _shared_lock:
+        if filename not in _shared_caches:
+            _shared_caches[filename] = Cache(default_cache_path(filename))
+        return _shared_caches[filename]
@@ -0,0 +1,146 @@
+"""
+Change Detection Module for Screen Translator
+ใช้ fingerprint ขนาดเล็กของภาพเพื่อตัดสินว่าพื้นที่บนหน้าจอเปลี่ยนไปจนควรส่ง OCR ใหม่หรือไม่
+และรอให้ภาพนิ่งก่อนส่ง OCR (ข้อความที่ค่อย ๆ ปรากฏ/พิมพ์ทีละตัว/เคลื่อนไหว)
+"""
+
+from collections import deque
+from typing import Optional, Tuple
+
+from PIL import Image
+
+
+def frame_fingerprint(image, size: Tuple[int, int] = (32, 32)) -> bytes:
+    """
+    สร้าง fingerprint ของภาพ (grayscale ย่อขนาด)
+
+    Args:
+        image (PIL.Image): ภาพที่จะสร้าง fingerprint
+        size (tuple): ขนาดของ fingerprint (กว้าง, สูง)
+
+    Returns:
+        bytes: ค่า pixel ของภาพย่อ
+    """
+    small = image.convert('L').resize(size, Image.Resampling.BILINEAR)
+    return small.tobytes()
+
+
+def fingerprint_distance(a: Optional[bytes], b: Optional[bytes]) -> float:
+    """
+    คำนวณค่าความต่างเฉลี่ยต่อ pixel ระหว่าง fingerprint สองชุด
+
+    Returns:
+        float: ค่าความต่าง 0-255 (255 ถ้าเทียบกันไม่ได้)
+    """
+    if not a or not b or len(a) != len(b):
+        return 255.0
+    return sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+
+
+class ChangeGate:
+    """ประตูกรองเฟรม - ปล่อยผ่านเฉพาะเฟรมที่ต่างจากเฟรมล่าสุดที่ผ่านไปเกิน threshold"""
+
+    def __init__(self, threshold: float = 4.0, fingerprint_size: Tuple[int, int] = (32, 32)):
+        """
+        เริ่มต้น Change Gate
+
+        Args:
+            threshold (float): ค่าความต่างเฉลี่ยต่อ pixel ขั้นต่ำที่ถือว่าเปลี่ยน
+            fingerprint_size (tuple): ขนาดของ fingerprint
+        """
+        self.threshold = threshold
+        self.fingerprint_size = fingerprint_size
+        self.last_fingerprint = None
+        self.last_distance = 0.0
+        self.current_fingerprint = None  # fingerprint ของภาพล่าสุดที่ตรวจ (ใช้ต่อใน StabilityGate)
+
+    def check(self, image) -> bool:
+        """
+        ตรวจสอบว่าภาพเปลี่ยนไปหรือไม่ และจำภาพนี้ไว้ถ้าเปลี่ยน
+
+        Args:
+            image (PIL.Image): ภาพที่จับได้
+
+        Returns:
+            bool: True ถ้าควรส่งภาพนี้ไป OCR
+        """
+        if image is None:
+            return False
+
+        fingerprint = frame_fingerprint(image, self.fingerprint_size)
+        self.current_fingerprint = fingerprint
+        self.last_distance = fingerprint_distance(self.last_fingerprint, fingerprint)
+
+        if self.last_distance < self.threshold:
+            return False
+
+        self.last_fingerprint = fingerprint
+        return True
+
+    def reset(self):
+        """ล้างเฟรมอ้างอิง ทำให้เฟรมถัดไปผ่านเสมอ"""
+        self.last_fingerprint = None
+        self.last_distance = 0.0
+
+
+class StabilityGate:
+    """
+    ประตูรอภาพนิ่ง - ส่ง OCR เมื่อภาพไม่เปลี่ยนติดต่อกันครบจำนวนรอบและเวลาที่กำหนด
+    หรือเมื่อรอนานเกิน max_wait_ms (ภาพที่เปลี่ยนตลอดเวลาจะไม่ถูกรอไปเรื่อย ๆ)
+    """
+
+    def __init__(self, settle_ticks: int = 2, settle_ms: float = 250, max_wait_ms: float = 2000,
+                 threshold: float = 0.5, history: int = 8):
+        """
+        เริ่มต้น Stability Gate
+
+        Args:
+            settle_ticks (int): จำนวนภาพที่จับซ้ำแล้วไม่เปลี่ยนติดต่อกันขั้นต่ำ
+            settle_ms (float): ระยะเวลาที่ภาพต้องนิ่งขั้นต่ำ (milliseconds)
+            max_wait_ms (float): รอนานสุดนับจากภาพแรกที่เปลี่ยน แล้วส่งภาพล่าสุดเลย
+            threshold (float): ค่าความต่างเฉลี่ยต่อ pixel สูงสุดที่ยังถือว่านิ่ง
+            history (int): จำนวน fingerprint ล่าสุดที่เก็บไว้ (ring buffer)
+        """
+        self.settle_ticks = settle_ticks
+        self.settle_ms = settle_ms
+        self.max_wait_ms = max_wait_ms
+        self.threshold = threshold
+        self.history = deque(maxlen=max(2, history, settle_ticks + 1))  # (timestamp, fingerprint)
+        self.waiting_since = None
+        self.forced = False  # ผลล่าสุดมาจากการรอครบ max_wait_ms ไม่ใช่ภาพนิ่ง
+
+    def observe(self, fingerprint: bytes, now: float) -> bool:
+        """
+        เพิ่มภาพล่าสุดของพื้นที่ที่กำลังรอ
+
+        Args:
+            fingerprint (bytes): fingerprint ของภาพ (จาก frame_fingerprint)
+            now (float): เวลาที่จับภาพ (วินาที)
+
+        Returns:
+            bool: True ถ้าควรส่งภาพนี้ไป OCR
+        """
+        if self.waiting_since is None:
+            self.waiting_since = now
+        self.history.append((now, fingerprint))
+
+        # นับภาพย้อนหลังที่เหมือนภาพล่าสุด (เทียบกับภาพล่าสุดทุกภาพ การเปลี่ยนทีละน้อยจึงสะสมจนเกิน threshold)
+        stable_ticks, stable_since = 0, now
+        for timestamp, previous in reversed(list(self.history)[:-1]):
+            if fingerprint_distance(previous, fingerprint) > self.threshold:
+                break
+            stable_ticks += 1
+            stable_since = timestamp
+
+        self.forced = False
+        if stable_ticks >= self.settle_ticks and (now - stable_since) * 1000 >= self.settle_ms:
+            return True
+        if (now - self.waiting_since) * 1000 >= self.max_wait_ms:
+            self.forced = True
+            return True
+        return False
+
+    def reset(self):
+        """เริ่มรอรอบใหม่"""
+        self.history.clear()
+        self.waiting_since = None
@@ -0,0 +1,84 @@
+"""
+Text Chunker for Screen Translator
+แบ่งข้อความ OCR ยาว ๆ เป็นส่วนตามขอบย่อหน้า/ประโยคไม่ให้เกิน token budget
+เพื่อแปลแต่ละส่วนพร้อมกัน แล้วประกอบกลับตามลำดับเดิม (รักษาตัวคั่นเดิมระหว่างส่วน)
+"""
+
+import os
+import re
+import sys
+from typing import List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import CHUNK_CONFIG
+from .generation import estimate_text_tokens
+
+# ขอบที่ตัดได้ เรียงตามลำดับความสำคัญ: ย่อหน้า, ขึ้นบรรทัดใหม่, จบประโยค
+_BOUNDARY_PATTERN = re.compile(r'(\n[ \t]*\n\s*|\n|(?<=[.!?…])[ \t]+)')
+
+
+def _split_words(piece: str, max_tokens: int) -> List[str]:
+    """แบ่งประโยคที่ยาวเกิน budget ตามช่องว่างระหว่างคำ"""
+    parts, current = [], []
+    for word in piece.split(' '):
+        if current and estimate_text_tokens(' '.join(current + [word])) > max_tokens:
+            parts.append(' '.join(current))
+            current = []
+        current.append(word)
+    if current:
+        parts.append(' '.join(current))
+    return parts
+
+
+def split_chunks(text: str, max_tokens: int = None) -> List[Tuple[str, str]]:
+    """แบ่งข้อความเป็นส่วนที่ไม่เกิน max_tokens
+
+    Args:
+        text (str): ข้อความ
+        max_tokens (int): token สูงสุดต่อส่วน (None = ค่าจาก config)
+
+    Returns:
+        list: [(ข้อความของส่วน, ตัวคั่นหลังส่วนนี้)] - ''.join(ส่วน + ตัวคั่น) ได้ข้อความเดิม
+    """
+    max_tokens = max_tokens or CHUNK_CONFIG['max_tokens']
+    parts = _BOUNDARY_PATTERN.split(text)
+    # [ข้อความ, ตัวคั่น, ข้อความ, ตัวคั่น, ..., ข้อความ]
+    pieces = []
+    for i in range(0, len(parts), 2):
+        piece, separator = parts[i], parts[i + 1] if i + 1 < len(parts) else ''
+        if estimate_text_tokens(piece) > max_tokens:
+            words = _split_words(piece, max_tokens)
+            pieces.extend((word_part, ' ') for word_part in words[:-1])
+            pieces.append((words[-1], separator))
+        else:
+            pieces.append((piece, separator))
+
+    chunks: List[Tuple[str, str]] = []
+    current, current_tokens = '', 0
+    for piece, separator in pieces:
+        tokens = estimate_text_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            chunk, trailing = _strip_trailing(current)
+            chunks.append((chunk, trailing))
+            current, current_tokens = '', 0
+        current += piece + separator
+        current_tokens += tokens
+    if current:
+        chunks.append(_strip_trailing(current))
+    return [(chunk, separator) for chunk, separator in chunks if chunk.strip()] or [(text, '')]
+
+
+def _strip_trailing(chunk: str) -> Tuple[str, str]:
+    """แยกช่องว่างท้ายส่วนออกมาเป็นตัวคั่น"""
+    stripped = chunk.rstrip()
+    return stripped, chunk[len(stripped):]
+
+
+def join_chunks(translated: List[str], chunks: List[Tuple[str, str]]) -> str:
+    """ประกอบคำแปลของแต่ละส่วนกลับตามลำดับ พร้อมตัวคั่นเดิม"""
+    return ''.join(text + separator for text, (_, separator) in zip(translated, chunks)).strip()
+
+
+def needs_chunking(text: str, max_tokens: int = None) -> bool:
+    """ข้อความยาวเกินกว่าจะแปลในคำขอเดียวหรือไม่"""
+    return CHUNK_CONFIG['enabled'] and estimate_text_tokens(text) > (max_tokens or CHUNK_CONFIG['max_tokens'])
@@ -0,0 +1,137 @@
+"""
+Circuit Breaker for Screen Translator
+ตัดการเรียก backend ที่ล้มเหลวหรือช้าติดกันหลายครั้ง เพื่อไม่ให้ทุกคำแปลต้องรอ timeout
+
+สถานะ:
+    closed    - เรียกได้ตามปกติ
+    open      - ไม่เรียก backend นี้ (ใช้ backend สำรองแทน) จนครบ reset_timeout_s
+    half_open - ปล่อยคำขอทดสอบหนึ่งคำขอ สำเร็จ = closed, ล้มเหลว = open อีกครั้ง
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """Circuit breaker ของ backend หนึ่งตัว (thread-safe)"""
+
+    def __init__(self, name: str, failure_threshold: int = 3, slow_call_ms: Optional[float] = None,
+                 reset_timeout_s: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            name (str): ชื่อ backend
+            failure_threshold (int): จำนวนครั้งที่ล้มเหลว/ช้าติดกันก่อนตัดวงจร
+            slow_call_ms (float): คำขอที่ใช้เวลานานกว่านี้นับเป็นความล้มเหลว (None = ไม่นับ)
+            reset_timeout_s (float): เวลาที่วงจรเปิดค้างก่อนปล่อยคำขอทดสอบ
+            clock (callable): นาฬิกา (เปลี่ยนได้สำหรับทดสอบ)
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.slow_call_ms = slow_call_ms
+        self.reset_timeout_s = reset_timeout_s
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._state_since = clock()
+        self._time_in_state = {CLOSED: 0.0, OPEN: 0.0, HALF_OPEN: 0.0}
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        self.last_failure = ''
+        self.stats_counters = {'calls': 0, 'successes': 0, 'failures': 0, 'slow_calls': 0,
+                               'rejected': 0, 'trips': 0, 'probes': 0}
+
+    @property
+    def state(self) -> str:
+        """สถานะปัจจุบัน (open ที่ครบเวลาแล้วแสดงเป็น half_open)"""
+        with self._lock:
+            if self._state == OPEN and self.clock() - self._state_since >= self.reset_timeout_s:
+                return HALF_OPEN
+            return self._state
+
+    def _transition(self, state: str):
+        """เปลี่ยนสถานะ และสะสมเวลาที่อยู่ในสถานะเดิม (ต้องถือ lock)"""
+        now = self.clock()
+        self._time_in_state[self._state] += now - self._state_since
+        self._state = state
+        self._state_since = now
+        if state == OPEN:
+            self.stats_counters['trips'] += 1
+            logger.warning("⚠️ ตัดวงจร %s (%s ครั้งติด: %s)", self.name, self.consecutive_failures, self.last_failure)
+        elif state == CLOSED:
+            logger.info("✅ %s กลับมาใช้งานได้", self.name)
+
+    def allow_request(self) -> bool:
+        """ขออนุญาตเรียก backend - ถ้าได้ ต้องตามด้วย record_success/record_failure
+
+        Returns:
+            bool: True หากเรียกได้ (รวมถึงคำขอทดสอบใน half_open)
+        """
+        with self._lock:
+            if self._state == OPEN and self.clock() - self._state_since >= self.reset_timeout_s:
+                self._transition(HALF_OPEN)
+            if self._state == CLOSED:
+                self.stats_counters['calls'] += 1
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self.stats_counters['calls'] += 1
+                self.stats_counters['probes'] += 1
+                return True
+            self.stats_counters['rejected'] += 1
+            return False
+
+    def record_success(self, latency_ms: Optional[float] = None):
+        """บันทึกว่าคำขอสำเร็จ - ถ้าช้ากว่า slow_call_ms นับเป็นความล้มเหลว"""
+        if self.slow_call_ms is not None and latency_ms is not None and latency_ms > self.slow_call_ms:
+            self.stats_counters['slow_calls'] += 1
+            self.record_failure(f"ช้า {latency_ms:.0f}ms")
+            return
+        with self._lock:
+            self.stats_counters['successes'] += 1
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self, reason: str = ''):
+        """บันทึกว่าคำขอล้มเหลว (timeout, เชื่อมต่อไม่ได้, HTTP error ฯลฯ)"""
+        with self._lock:
+            self.stats_counters['failures'] += 1
+            self.consecutive_failures += 1
+            self.last_failure = reason
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+                self._transition(OPEN)
+            elif self._state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def record_cancelled(self):
+        """คำขอถูกยกเลิกก่อนได้ผล (เช่นแพ้ใน hedged request) - ไม่นับเป็นสำเร็จหรือล้มเหลว"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def reset(self):
+        """ปิดวงจรทันที (เช่นเมื่อผู้ใช้เปลี่ยน model)"""
+        with self._lock:
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def stats(self) -> Dict:
+        """สถิติของ breaker รวมเวลาที่อยู่ในแต่ละสถานะ (วินาที)"""
+        with self._lock:
+            time_in_state = dict(self._time_in_state)
+            time_in_state[self._state] += self.clock() - self._state_since
+            return dict(self.stats_counters, name=self.name, state=self._state,
+                        consecutive_failures=self.consecutive_failures, last_failure=self.last_failure,
+                        time_in_state_s={k: round(v, 3) for k, v in time_in_state.items()})
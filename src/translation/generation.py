@@ -0,0 +1,143 @@
+"""
+Generation Budget for Screen Translator
+ประมาณความยาวคำตอบจากขนาด input เพื่อกำหนด num_predict, num_ctx และ stop sequences ของคำขอ Ollama
+
+- คำแปลอังกฤษ -> ไทย: จำนวน token ของต้นฉบับ x translation_ratio
+- OCR: ความหนาแน่นของข้อความในภาพ (จำนวนพิกเซลขอบตัวอักษร) / ocr_edge_px_per_token
+- คำตอบที่ถูกตัดเพราะครบ num_predict (done_reason == 'length') ถูกตรวจจับเพื่อขอใหม่ด้วย budget ที่มากขึ้น
+"""
+
+import math
+import os
+import sys
+import threading
+from typing import Dict, Iterable, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import GENERATION_CONFIG
+
+KIND_TRANSLATION = 'translation'
+KIND_OCR = 'ocr'
+
+
+def _clamp(value: float, low: int, high: int) -> int:
+    return int(max(low, min(high, math.ceil(value))))
+
+
+def estimate_text_tokens(text: str) -> int:
+    """ประมาณจำนวน token ของข้อความ (ASCII ~4 ตัวอักษร/token, อักษรอื่นเช่นไทย ~2 ตัวอักษร/token)"""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 2)
+
+
+def translation_budget(text: str) -> int:
+    """num_predict สำหรับแปลข้อความนี้เป็นภาษาไทย"""
+    config = GENERATION_CONFIG
+    estimate = estimate_text_tokens(text) * config['translation_ratio'] + config['translation_margin']
+    return _clamp(estimate, config['translation_min'], config['translation_max'])
+
+
+def estimate_ocr_tokens(image) -> int:
+    """ประมาณจำนวน token ของข้อความในภาพจากจำนวนพิกเซลที่เป็นขอบ (ความหนาแน่นของตัวอักษร)
+
+    ภาพใหญ่ถูกย่อก่อนนับ - จำนวนขอบแปรผันตามความยาวเส้น จึงชดเชยด้วยอัตราย่อแบบเส้นตรง
+    """
+    from PIL import ImageFilter
+
+    config = GENERATION_CONFIG
+    gray = image.convert('L')
+    scale = min(1.0, config['ocr_analysis_width'] / max(1, gray.width))
+    if scale < 1.0:
+        gray = gray.resize((max(1, int(gray.width * scale)), max(1, int(gray.height * scale))))
+    histogram = gray.filter(ImageFilter.FIND_EDGES).histogram()
+    edge_px = sum(histogram[config['ocr_edge_threshold']:]) / scale
+    return math.ceil(edge_px / config['ocr_edge_px_per_token'])
+
+
+def ocr_budget(images: Optional[Iterable] = None, count: int = 1) -> int:
+    """num_predict สำหรับ OCR ของภาพชุดนี้ (ไม่มีภาพ = ใช้ค่าเริ่มต้นต่อภาพ x count)"""
+    config = GENERATION_CONFIG
+    if images is None:
+        return _clamp(config['ocr_default'] * count, config['ocr_min'], config['ocr_max'] * count)
+    images = list(images)
+    # ตัวคั่นของคำขอแบบ batch ใช้ ~8 token ต่อภาพ
+    estimate = sum(estimate_ocr_tokens(image) * config['ocr_ratio'] + config['ocr_margin'] for image in images)
+    if len(images) > 1:
+        estimate += 8 * len(images)
+    return _clamp(estimate, config['ocr_min'], config['ocr_max'] * max(1, len(images)))
+
+
+def context_size(prompt_tokens: int, num_predict: int, image_count: int = 0) -> int:
+    """num_ctx ที่พอสำหรับ prompt + ภาพ + คำตอบ
+
+    ปัดขึ้นเป็นกำลังสองและไม่ต่ำกว่า num_ctx_min - Ollama โหลด model ใหม่เมื่อ num_ctx เปลี่ยน
+    ค่าจึงต้องคงที่เกือบทุกคำขอ
+    """
+    config = GENERATION_CONFIG
+    needed = prompt_tokens + image_count * config['image_tokens'] + num_predict
+    size = config['num_ctx_min']
+    while size < needed and size < config['num_ctx_max']:
+        size *= 2
+    return size
+
+
+def grow_budget(num_predict: int, kind: str) -> int:
+    """budget ใหม่เมื่อคำตอบถูกตัด (เพิ่มเท่าตัวแต่ไม่เกินเพดานของชนิดคำขอ)"""
+    config = GENERATION_CONFIG
+    ceiling = config['translation_max'] if kind == KIND_TRANSLATION else config['ocr_max'] * 4
+    return min(ceiling, num_predict * 2)
+
+
+def is_truncated(final: Optional[Dict]) -> bool:
+    """คำตอบถูกตัดเพราะครบ num_predict หรือไม่"""
+    return bool(final) and final.get('done_reason') == 'length'
+
+
+class BudgetTracker:
+    """เทียบ eval_count จริงกับ num_predict ที่ตั้งไว้ แยกตามชนิดคำขอ (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._kinds: Dict[str, Dict] = {}
+
+    def record(self, kind: str, num_predict: int, final: Optional[Dict], retried: bool = False):
+        """บันทึกผลของคำขอหนึ่งครั้ง (final = chunk สุดท้ายจาก Ollama)"""
+        if not final:
+            return
+        with self._lock:
+            stats = self._kinds.setdefault(kind, {'requests': 0, 'budget_tokens': 0, 'eval_count': 0,
+                                                  'truncated': 0, 'retries': 0, 'max_utilization': 0.0})
+            eval_count = final.get('eval_count', 0)
+            stats['requests'] += 1
+            stats['budget_tokens'] += num_predict
+            stats['eval_count'] += eval_count
+            stats['truncated'] += int(is_truncated(final))
+            stats['retries'] += int(retried)
+            if num_predict:
+                stats['max_utilization'] = max(stats['max_utilization'], eval_count / num_predict)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """สรุปต่อชนิดคำขอ: budget เฉลี่ย, eval_count เฉลี่ย, สัดส่วนที่ใช้ และจำนวนครั้งที่ถูกตัด"""
+        with self._lock:
+            return {
+                kind: {
+                    'requests': stats['requests'],
+                    'avg_budget': round(stats['budget_tokens'] / stats['requests'], 1),
+                    'avg_eval_count': round(stats['eval_count'] / stats['requests'], 1),
+                    'utilization': round(stats['eval_count'] / stats['budget_tokens'], 3) if stats['budget_tokens'] else 0.0,
+                    'max_utilization': round(stats['max_utilization'], 3),
+                    'truncated': stats['truncated'],
+                    'retries': stats['retries'],
+                }
+                for kind, stats in self._kinds.items() if stats['requests']
+            }
+
+
+_shared_tracker = BudgetTracker()
+
+
+def get_budget_tracker() -> BudgetTracker:
+    """tracker กลางที่ทั้ง OCR และ OllamaTranslator ใช้"""
+    return _shared_tracker
@@ -0,0 +1,235 @@
+"""
+Ollama Health Monitor for Screen Translator
+ตรวจสถานะ Ollama ใน background thread (พร้อม backoff เมื่อเชื่อมต่อไม่ได้)
+เก็บสถานะการเชื่อมต่อ, รายการ models และ models ที่โหลดอยู่ในหน่วยความจำ (/api/ps)
+
+hot path (เช่น Translator.is_available) อ่านค่าจาก flag ที่ cache ไว้ - ไม่มี I/O
+ผู้ที่สนใจการเปลี่ยนสถานะลงทะเบียนด้วย add_listener (callback ถูกเรียกจาก monitor thread)
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import HEALTH_CONFIG, OLLAMA_CONFIG
+
+logger = logging.getLogger(__name__)
+
+STATE_UNKNOWN = 'unknown'
+STATE_UP = 'up'
+STATE_DOWN = 'down'
+
+
+class OllamaHealthMonitor:
+    """ตรวจสถานะ Ollama เป็นระยะ และแจ้งเมื่อสถานะเปลี่ยน"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 interval_s: Optional[float] = None, min_backoff_s: Optional[float] = None,
+                 max_backoff_s: Optional[float] = None, timeout_s: Optional[float] = None):
+        """
+        Args:
+            host (str): Ollama server host (None = ใช้ค่าจาก config)
+            port (int): Ollama server port (None = ใช้ค่าจาก config)
+            interval_s (float): ระยะเวลาตรวจเมื่อเชื่อมต่อได้
+            min_backoff_s (float): ระยะรอครั้งแรกหลังเชื่อมต่อไม่ได้ (เพิ่มเท่าตัวทุกครั้งที่ล้มเหลว)
+            max_backoff_s (float): ระยะรอสูงสุดเมื่อเชื่อมต่อไม่ได้
+            timeout_s (float): timeout ของแต่ละการตรวจ
+        """
+        self.host = host or OLLAMA_CONFIG['host']
+        self.port = port or OLLAMA_CONFIG['port']
+        self.base_url = f"http://{self.host}:{self.port}"
+        self.interval_s = HEALTH_CONFIG['interval_s'] if interval_s is None else interval_s
+        self.min_backoff_s = HEALTH_CONFIG['min_backoff_s'] if min_backoff_s is None else min_backoff_s
+        self.max_backoff_s = HEALTH_CONFIG['max_backoff_s'] if max_backoff_s is None else max_backoff_s
+        self.timeout_s = HEALTH_CONFIG['timeout_s'] if timeout_s is None else timeout_s
+        self.session = requests.Session()
+
+        self.state = STATE_UNKNOWN
+        self.models: Set[str] = set()
+        self.loaded_models: Set[str] = set()
+        self.last_checked = 0.0
+        self.last_error = ''
+        self.consecutive_failures = 0
+        self.stats = {'checks': 0, 'failures': 0, 'transitions': 0, 'reported_failures': 0}
+
+        self._listeners: List[Callable[[Dict], None]] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ----- สถานะแบบไม่มี I/O -----
+
+    @property
+    def is_up(self) -> bool:
+        """เชื่อมต่อ Ollama ได้ในการตรวจล่าสุดหรือไม่"""
+        return self.state == STATE_UP
+
+    def is_model_available(self, model: str) -> bool:
+        """Ollama เชื่อมต่อได้และมี model นี้ (ชื่อเต็มหรือชื่อย่อ)"""
+        return self.is_up and any(model in name for name in self.models)
+
+    def is_model_loaded(self, model: str) -> bool:
+        """model นี้โหลดอยู่ในหน่วยความจำแล้ว (คำขอแรกจะไม่ต้องรอโหลด)"""
+        return any(model in name for name in self.loaded_models)
+
+    def snapshot(self) -> Dict:
+        """สถานะปัจจุบันทั้งหมด"""
+        with self._lock:
+            return {
+                'state': self.state,
+                'models': sorted(self.models),
+                'loaded_models': sorted(self.loaded_models),
+                'last_checked': self.last_checked,
+                'last_error': self.last_error,
+                'consecutive_failures': self.consecutive_failures,
+                'next_check_in': self._next_delay(),
+            }
+
+    # ----- listeners -----
+
+    def add_listener(self, callback: Callable[[Dict], None]):
+        """ลงทะเบียน callback(snapshot) ที่ถูกเรียกเมื่อสถานะหรือ models ที่โหลดอยู่เปลี่ยน"""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[Dict], None]):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def _notify(self):
+        snapshot = self.snapshot()
+        for callback in list(self._listeners):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error("❌ health listener error: %s", e)
+
+    # ----- การตรวจ -----
+
+    def check_now(self) -> bool:
+        """ตรวจสถานะทันทีหนึ่งครั้ง (/api/tags และ /api/ps)
+
+        Returns:
+            bool: True หากเชื่อมต่อได้
+        """
+        self.stats['checks'] += 1
+        try:
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=self.timeout_s)
+            response.raise_for_status()
+            models = {m.get('name', '') for m in response.json().get('models', []) if m.get('name')}
+            loaded = set()
+            try:
+                ps = self.session.get(f"{self.base_url}/api/ps", timeout=self.timeout_s)
+                if ps.status_code == 200:
+                    loaded = {m.get('name', '') for m in ps.json().get('models', []) if m.get('name')}
+            except requests.RequestException:
+                pass  # Ollama รุ่นเก่าไม่มี /api/ps
+            self._update(STATE_UP, models=models, loaded=loaded)
+            return True
+        except Exception as e:
+            self.stats['failures'] += 1
+            self._update(STATE_DOWN, error=str(e))
+            return False
+
+    def _update(self, state: str, models: Optional[Set[str]] = None, loaded: Optional[Set[str]] = None,
+                error: str = ''):
+        """บันทึกผลการตรวจ และแจ้ง listeners ถ้ามีอะไรเปลี่ยน"""
+        with self._lock:
+            changed = state != self.state
+            self.state = state
+            self.last_checked = time.time()
+            self.last_error = error
+            if state == STATE_UP:
+                self.consecutive_failures = 0
+                changed = changed or models != self.models or loaded != self.loaded_models
+                self.models = models
+                self.loaded_models = loaded
+            else:
+                self.consecutive_failures += 1
+                self.loaded_models = set()
+            if changed:
+                self.stats['transitions'] += 1
+        if changed:
+            self._notify()
+
+    def report_failure(self, error: str = '', connection_lost: bool = False):
+        """ให้ผู้ใช้ Ollama แจ้งว่าคำขอล้มเหลว - ตรวจใหม่เร็วขึ้น
+
+        Args:
+            error (str): ข้อความข้อผิดพลาด
+            connection_lost (bool): เชื่อมต่อไม่ได้แน่นอน (เช่น connection refused) - เปลี่ยนเป็น down ทันที
+        """
+        self.stats['reported_failures'] += 1
+        if connection_lost and self.state != STATE_DOWN:
+            self._update(STATE_DOWN, error=error)
+        self.poke()
+
+    def report_success(self):
+        """ให้ผู้ใช้ Ollama แจ้งว่าคำขอสำเร็จ - ถ้าสถานะยังเป็น down ให้ตรวจใหม่ทันที"""
+        if self.state != STATE_UP:
+            self.poke()
+
+    def poke(self):
+        """ปลุก monitor ให้ตรวจรอบถัดไปโดยไม่ต้องรอครบกำหนด"""
+        self._wake.set()
+
+    def _next_delay(self) -> float:
+        """ระยะรอก่อนตรวจครั้งถัดไป - backoff แบบเท่าตัวเมื่อเชื่อมต่อไม่ได้"""
+        if self.state == STATE_UP:
+            return self.interval_s
+        if self.consecutive_failures == 0:
+            return 0.0
+        return min(self.max_backoff_s, self.min_backoff_s * (2 ** (self.consecutive_failures - 1)))
+
+    # ----- background thread -----
+
+    def start(self):
+        """เริ่ม monitor thread (เรียกซ้ำได้)"""
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ollama-health", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 1.0):
+        """หยุด monitor thread"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and timeout:
+            self._thread.join(timeout)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.check_now()
+            checked = time.monotonic()
+            self._wake.wait(self._next_delay())
+            if self._stop.is_set():
+                return
+            # poke ถี่ ๆ (เช่นทุกคำขอที่ล้มเหลว) ไม่ทำให้ตรวจถี่กว่า min_backoff_s
+            gap = self.min_backoff_s - (time.monotonic() - checked)
+            if gap > 0:
+                self._stop.wait(gap)
+
+
+_shared_monitor: Optional[OllamaHealthMonitor] = None
+_shared_lock = threading.Lock()
+
+
+def get_health_monitor() -> OllamaHealthMonitor:
+    """monitor กลางของแอป (สร้างครั้งแรกที่เรียก - ยังไม่เริ่ม thread จนกว่าจะเรียก start())"""
+    global _shared_monitor
+    with _shared_lock:
+        if _shared_monitor is None:
+            _shared_monitor = OllamaHealthMonitor()
+        return _shared_monitor
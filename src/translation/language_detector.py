@@ -0,0 +1,214 @@
+"""
+Language Detector for Screen Translator
+ตรวจจับภาษาจากสัดส่วนของระบบตัวเขียน (Unicode block) ในข้อความ - แปลงข้อความครั้งเดียวด้วย str.translate ไม่มี I/O
+
+รองรับ: ไทย, ละติน, จีน (Han), ญี่ปุ่น (Kana), เกาหลี (Hangul), ซีริลลิก, อาหรับ, เทวนาครี
+ข้อความละตินที่ไม่ชัดว่าเป็นภาษาอังกฤษ (มีตัวอักษรเน้นเสียง หรือไม่มีคำอังกฤษที่พบบ่อย)
+ใช้การตรวจจับระยะไกล (ถ้ากำหนด) และเก็บผลไว้ใน cache
+"""
+
+import logging
+import os
+import re
+import sys
+import threading
+from typing import Callable, Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import LANGUAGE_DETECTION_CONFIG
+from .cache import Cache, make_key
+from .vocabulary import ENGLISH_FUNCTION_WORDS
+
+logger = logging.getLogger(__name__)
+
+SCRIPT_THAI = 'thai'
+SCRIPT_LATIN = 'latin'
+SCRIPT_HAN = 'han'
+SCRIPT_KANA = 'kana'
+SCRIPT_HANGUL = 'hangul'
+SCRIPT_CYRILLIC = 'cyrillic'
+SCRIPT_ARABIC = 'arabic'
+SCRIPT_DEVANAGARI = 'devanagari'
+
+# (เริ่ม, จบ, ระบบตัวเขียน)
+_SCRIPT_RANGES = [
+    (0x0041, 0x005A, SCRIPT_LATIN), (0x0061, 0x007A, SCRIPT_LATIN),
+    (0x00C0, 0x00D6, SCRIPT_LATIN), (0x00D8, 0x00F6, SCRIPT_LATIN), (0x00F8, 0x024F, SCRIPT_LATIN),
+    (0x1E00, 0x1EFF, SCRIPT_LATIN),  # Latin Extended Additional (เวียดนาม)
+    (0x0400, 0x052F, SCRIPT_CYRILLIC),
+    (0x0600, 0x06FF, SCRIPT_ARABIC), (0x0750, 0x077F, SCRIPT_ARABIC),
+    (0xFB50, 0xFDFF, SCRIPT_ARABIC), (0xFE70, 0xFEFF, SCRIPT_ARABIC),
+    (0x0900, 0x097F, SCRIPT_DEVANAGARI),
+    (0x0E00, 0x0E7F, SCRIPT_THAI),
+    (0x1100, 0x11FF, SCRIPT_HANGUL), (0x3130, 0x318F, SCRIPT_HANGUL), (0xAC00, 0xD7AF, SCRIPT_HANGUL),
+    (0x3040, 0x30FF, SCRIPT_KANA), (0x31F0, 0x31FF, SCRIPT_KANA), (0xFF66, 0xFF9F, SCRIPT_KANA),
+    (0x3400, 0x4DBF, SCRIPT_HAN), (0x4E00, 0x9FFF, SCRIPT_HAN), (0xF900, 0xFAFF, SCRIPT_HAN),
+]
+
+_SCRIPT_LANGUAGE = {
+    SCRIPT_THAI: 'th',
+    SCRIPT_LATIN: 'en',
+    SCRIPT_HAN: 'zh',
+    SCRIPT_KANA: 'ja',
+    SCRIPT_HANGUL: 'ko',
+    SCRIPT_CYRILLIC: 'ru',
+    SCRIPT_ARABIC: 'ar',
+    SCRIPT_DEVANAGARI: 'hi',
+}
+
+# ละตินนอก ASCII (é, ñ, ü, ă ฯลฯ) นับแยกไว้ก่อน แล้วรวมเข้ากับละติน - ใช้บอกว่าไม่ใช่ภาษาอังกฤษล้วน
+_LATIN_EXTENDED = 'latin_extended'
+
+
+def _build_table():
+    """ตาราง str.translate ที่แปลงอักขระของแต่ละระบบเป็นอักขระแทน (Private Use Area) หนึ่งตัวต่อระบบ"""
+    names = sorted({name for _, _, name in _SCRIPT_RANGES}) + [_LATIN_EXTENDED]
+    marks = {name: chr(0xF0000 + i) for i, name in enumerate(names)}
+    table = {}
+    for start, end, name in _SCRIPT_RANGES:
+        mark = marks[_LATIN_EXTENDED] if name == SCRIPT_LATIN and start >= 0x80 else marks[name]
+        for code in range(start, end + 1):
+            table[code] = mark
+    return table, list(marks.items())
+
+
+_TABLE, _MARKS = _build_table()
+_WORD_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+
+def _raw_counts(text: str) -> Dict[str, int]:
+    """จำนวนอักขระต่อระบบ (ละตินนอก ASCII แยกเป็น latin_extended) - แปลงด้วย str.translate ครั้งเดียวใน C"""
+    mapped = text.translate(_TABLE)
+    counts = {}
+    for name, mark in _MARKS:
+        count = mapped.count(mark)
+        if count:
+            counts[name] = count
+    return counts
+
+
+def script_counts(text: str) -> Dict[str, int]:
+    """จำนวนอักขระของแต่ละระบบตัวเขียน"""
+    counts = _raw_counts(text)
+    extended = counts.pop(_LATIN_EXTENDED, 0)
+    if extended:
+        counts[SCRIPT_LATIN] = counts.get(SCRIPT_LATIN, 0) + extended
+    return counts
+
+
+def script_proportions(text: str) -> Dict[str, float]:
+    """สัดส่วนของแต่ละระบบตัวเขียนเทียบกับตัวอักษรทั้งหมดที่รู้จัก"""
+    counts = script_counts(text)
+    total = sum(counts.values())
+    return {script: count / total for script, count in counts.items()} if total else {}
+
+
+class LanguageDetector:
+    """ตรวจจับภาษาแบบ local ก่อน - เรียกการตรวจจับระยะไกลเฉพาะข้อความละตินที่ไม่ชัดเจน"""
+
+    def __init__(self, cache: Optional[Cache] = None):
+        """
+        Args:
+            cache (Cache): cache ของผลการตรวจจับระยะไกล (None = LRU ในหน่วยความจำ)
+        """
+        config = LANGUAGE_DETECTION_CONFIG
+        self.cache = cache if cache is not None else Cache(max_memory_entries=config['remote_cache_entries'])
+        self.min_letters = config['min_letters']
+        self.english_word_ratio = config['english_word_ratio']
+        self._lock = threading.Lock()
+        self.stats = {'detections': 0, 'ambiguous': 0, 'remote_calls': 0, 'remote_errors': 0}
+
+    def _latin_is_ambiguous(self, text: str, extended: int) -> bool:
+        """ข้อความละตินนี้อาจไม่ใช่ภาษาอังกฤษหรือไม่ (extended = จำนวนตัวอักษรละตินนอก ASCII)"""
+        if extended:
+            return True  # é, ñ, ü, ă ฯลฯ
+        words = _WORD_PATTERN.findall(text.lower())
+        if len(words) < 3:
+            return False  # ข้อความสั้น (เมนู/ปุ่ม) - ถือเป็นอังกฤษ
+        english = sum(map(ENGLISH_FUNCTION_WORDS.__contains__, words))
+        return english / len(words) < self.english_word_ratio
+
+    def detect(self, text: str, remote: Optional[Callable[[str], str]] = None) -> Dict:
+        """ตรวจจับภาษาของข้อความ
+
+        Args:
+            text (str): ข้อความ
+            remote (callable): ฟังก์ชันตรวจจับระยะไกล text -> รหัสภาษา (None = local อย่างเดียว)
+
+        Returns:
+            dict: {'language', 'confidence', 'script', 'proportions', 'source': 'local'|'remote'|'cache'}
+        """
+        with self._lock:
+            self.stats['detections'] += 1
+        counts = _raw_counts(text or '')
+        extended = counts.pop(_LATIN_EXTENDED, 0)
+        if extended:
+            counts[SCRIPT_LATIN] = counts.get(SCRIPT_LATIN, 0) + extended
+        total = sum(counts.values())
+        if not total:
+            return {'language': 'unknown', 'confidence': 0.0, 'script': None, 'proportions': {},
+                    'source': 'local'}
+
+        script = max(counts, key=counts.get)
+        # ญี่ปุ่นผสม Kanji (Han) กับ Kana - มี Kana อยู่บ้างก็เป็นญี่ปุ่น
+        if script == SCRIPT_HAN and counts.get(SCRIPT_KANA, 0) >= 0.1 * total:
+            script = SCRIPT_KANA
+            share = (counts[SCRIPT_HAN] + counts[SCRIPT_KANA]) / total
+        else:
+            share = counts[script] / total
+        # ข้อความสั้นมีความมั่นใจน้อยกว่า
+        confidence = share * (0.5 + 0.5 * min(1.0, total / self.min_letters))
+        result = {'language': _SCRIPT_LANGUAGE[script], 'confidence': round(confidence, 3), 'script': script,
+                  'proportions': {name: round(count / total, 3) for name, count in counts.items()},
+                  'source': 'local'}
+
+        if script == SCRIPT_LATIN and self._latin_is_ambiguous(text, extended):
+            with self._lock:
+                self.stats['ambiguous'] += 1
+            result['confidence'] = round(confidence * 0.6, 3)
+            if remote is not None:
+                self._detect_remote(text, remote, result)
+        return result
+
+    def _detect_remote(self, text: str, remote: Callable[[str], str], result: Dict):
+        """ใช้การตรวจจับระยะไกลกับข้อความละตินที่ไม่ชัดเจน (ผลเก็บใน cache)
+
+        ล้มเหลว = ใช้ผล local และจำไว้ (เก็บ '' ใน cache) เพื่อไม่ให้ข้อความเดิมต้องรอ remote ซ้ำ
+        """
+        key = make_key('language', text)
+        language = self.cache.get(key)
+        if language is not None:
+            if language:
+                result.update(language=language, confidence=0.9, source='cache')
+            return
+        with self._lock:
+            self.stats['remote_calls'] += 1
+        try:
+            language = remote(text)
+        except Exception as e:
+            with self._lock:
+                self.stats['remote_errors'] += 1
+            logger.warning("⚠️ ตรวจจับภาษาระยะไกลไม่ได้ ใช้ผล local แทน: %s", e)
+            self.cache.set(key, '')
+            return
+        if language:
+            self.cache.set(key, language)
+            result.update(language=language, confidence=0.9, source='remote')
+
+
+_shared_detector: Optional[LanguageDetector] = None
+_shared_lock = threading.Lock()
+
+
+def get_language_detector() -> LanguageDetector:
+    """detector กลางที่ทุก translator ใช้ร่วมกัน (cache ผลระยะไกลร่วมกัน)"""
+    global _shared_detector
+    with _shared_lock:
+        if _shared_detector is None:
+            _shared_detector = LanguageDetector()
+        return _shared_detector
+
+
+def detect_language(text: str, remote: Optional[Callable[[str], str]] = None) -> Dict:
+    """ตรวจจับภาษาด้วย detector กลาง"""
+    return get_language_detector().detect(text, remote)
@@ -0,0 +1,233 @@
+"""
+Ollama Node Pool for Screen Translator
+กระจายคำขอไปยัง Ollama หลายเครื่อง (OLLAMA_CONFIG['nodes'])
+
+- แต่ละ node มี weight, บทบาท (vision / translation) และรายการ models (จาก config หรือค้นหาจาก /api/tags)
+- เลือก node ที่มีคำขอค้างน้อยที่สุดเทียบกับ weight (least outstanding requests)
+- node ที่ล้มเหลวติดกันถูกพักชั่วคราว (ejection) และ node ที่ health monitor ตรวจว่า down จะไม่ถูกเลือก
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import OLLAMA_CONFIG
+from .health import OllamaHealthMonitor, STATE_DOWN
+
+logger = logging.getLogger(__name__)
+
+ROLE_VISION = 'vision'
+ROLE_TRANSLATION = 'translation'
+ALL_ROLES = (ROLE_VISION, ROLE_TRANSLATION)
+
+
+class NoNodeAvailable(requests.exceptions.ConnectionError):
+    """ไม่มี node ที่รับคำขอบทบาท/model นี้ได้ (จัดการเหมือนเชื่อมต่อ Ollama ไม่ได้)"""
+
+
+class OllamaNode:
+    """Ollama หนึ่งเครื่องใน pool"""
+
+    def __init__(self, host: str, port: int, weight: float = 1.0, roles: Optional[Iterable[str]] = None,
+                 models: Optional[Iterable[str]] = None, name: Optional[str] = None):
+        """
+        Args:
+            host (str): host ของ Ollama
+            port (int): port ของ Ollama
+            weight (float): น้ำหนัก (เครื่องแรงกว่า = weight สูงกว่า รับคำขอค้างได้มากกว่า)
+            roles (list): บทบาทที่รับ ('vision', 'translation') - None = ทุกบทบาท
+            models (list): models ที่ใช้บน node นี้ - None/ว่าง = ใช้รายการจาก /api/tags
+            name (str): ชื่อที่แสดง (None = host:port)
+        """
+        self.host = host
+        self.port = port
+        self.base_url = f"http://{host}:{port}"
+        self.name = name or f"{host}:{port}"
+        self.weight = max(0.01, float(weight))
+        self.roles = set(roles or ALL_ROLES)
+        self.configured_models = set(models or [])
+        self.health = OllamaHealthMonitor(host=host, port=port)
+
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.stats_counters = {'requests': 0, 'successes': 0, 'failures': 0}
+
+    def has_model(self, model: Optional[str]) -> bool:
+        """node นี้ใช้ model นี้ได้หรือไม่ (ยังไม่รู้รายการ models = ถือว่าได้)"""
+        if not model:
+            return True
+        if self.configured_models and not any(model in name for name in self.configured_models):
+            return False
+        if self.health.models:
+            return any(model in name for name in self.health.models)
+        return True
+
+    def is_ejected(self, now: Optional[float] = None) -> bool:
+        """ถูกพักอยู่ - จากความล้มเหลวติดกันหรือ health monitor ตรวจว่า down"""
+        if self.health.state == STATE_DOWN:
+            return True
+        return (now or time.monotonic()) < self.ejected_until
+
+    def stats(self) -> Dict:
+        return dict(self.stats_counters, name=self.name, weight=self.weight, roles=sorted(self.roles),
+                    outstanding=self.outstanding, state=self.health.state, ejected=self.is_ejected(),
+                    ejections=self.ejections, models=sorted(self.configured_models or self.health.models),
+                    loaded_models=sorted(self.health.loaded_models))
+
+
+class NodePool:
+    """เลือก node สำหรับแต่ละคำขอแบบ least outstanding requests (thread-safe)"""
+
+    def __init__(self, nodes: List[OllamaNode], eject_after: int = 2, eject_s: float = 10.0,
+                 max_eject_s: float = 120.0):
+        """
+        Args:
+            nodes (list): รายการ OllamaNode
+            eject_after (int): จำนวนครั้งที่ล้มเหลวติดกันก่อนพัก node
+            eject_s (float): เวลาพักครั้งแรก (เพิ่มเท่าตัวเมื่อถูกพักซ้ำ)
+            max_eject_s (float): เวลาพักสูงสุด
+        """
+        if not nodes:
+            raise ValueError("NodePool ต้องมีอย่างน้อยหนึ่ง node")
+        self.nodes = nodes
+        self.eject_after = max(1, eject_after)
+        self.eject_s = eject_s
+        self.max_eject_s = max_eject_s
+        self._lock = threading.Lock()
+        self._turn = 0  # ใช้สลับ node ที่คะแนนเท่ากัน
+        self._started = False
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict] = None) -> Optional['NodePool']:
+        """สร้าง pool จาก OLLAMA_CONFIG['nodes'] (None ถ้าไม่ได้ตั้งค่า nodes)"""
+        config = config or OLLAMA_CONFIG
+        entries = config.get('nodes') or []
+        if not entries:
+            return None
+        nodes = [OllamaNode(host=entry.get('host', config['host']), port=entry.get('port', config['port']),
+                            weight=entry.get('weight', 1.0), roles=entry.get('roles'),
+                            models=entry.get('models'), name=entry.get('name'))
+                 for entry in entries]
+        return cls(nodes, eject_after=config.get('node_eject_after', 2), eject_s=config.get('node_eject_s', 10.0))
+
+    def start(self):
+        """เริ่ม health monitor ของทุก node (เรียกซ้ำได้)"""
+        with self._lock:
+            if self._started:
+                return self
+            self._started = True
+        for node in self.nodes:
+            node.health.start()
+        return self
+
+    def stop(self):
+        """หยุด health monitor ของทุก node"""
+        for node in self.nodes:
+            node.health.stop()
+        self._started = False
+
+    def candidates(self, role: str, model: Optional[str] = None) -> List[OllamaNode]:
+        """node ที่รับบทบาทและ model นี้ได้ และไม่ได้ถูกพัก"""
+        now = time.monotonic()
+        return [node for node in self.nodes
+                if role in node.roles and node.has_model(model) and not node.is_ejected(now)]
+
+    def is_available(self, role: str, model: Optional[str] = None) -> bool:
+        """มี node ที่รับคำขอนี้ได้หรือไม่ (ไม่มี I/O)"""
+        return bool(self.candidates(role, model))
+
+    def choose(self, role: str, model: Optional[str] = None) -> OllamaNode:
+        """เลือก node ที่มีคำขอค้างน้อยที่สุดเทียบกับ weight และนับคำขอค้างทันที
+
+        Raises:
+            NoNodeAvailable: ไม่มี node ที่รับคำขอนี้ได้
+        """
+        if not self._started:
+            self.start()
+        with self._lock:
+            candidates = self.candidates(role, model)
+            if not candidates:
+                raise NoNodeAvailable(f"ไม่มี Ollama node สำหรับ {role} ({model or 'ทุก model'})")
+            self._turn += 1
+            offset = self._turn % len(candidates)
+            rotated = candidates[offset:] + candidates[:offset]
+            node = min(rotated, key=lambda n: (n.outstanding + 1) / n.weight)
+            node.outstanding += 1
+            node.stats_counters['requests'] += 1
+            return node
+
+    def release(self, node: OllamaNode, ok: bool, error: str = '', connection_lost: bool = False):
+        """คืน node หลังคำขอเสร็จ และบันทึกผล"""
+        with self._lock:
+            node.outstanding = max(0, node.outstanding - 1)
+            if ok:
+                node.stats_counters['successes'] += 1
+                node.consecutive_failures = 0
+                node.ejections = 0
+                return
+            node.stats_counters['failures'] += 1
+            node.consecutive_failures += 1
+            if node.consecutive_failures >= self.eject_after:
+                duration = min(self.max_eject_s, self.eject_s * (2 ** node.ejections))
+                node.ejected_until = time.monotonic() + duration
+                node.ejections += 1
+                node.consecutive_failures = 0
+                logger.warning("⚠️ พัก Ollama node %s %.0f วินาที (%s)", node.name, duration, error)
+        node.health.report_failure(error, connection_lost=connection_lost)
+
+    @contextmanager
+    def acquire(self, role: str, model: Optional[str] = None):
+        """ใช้ node หนึ่งตัวภายใน with - exception ใน block นับเป็นความล้มเหลวของ node
+
+        ตัวอย่าง:
+            with pool.acquire('vision', 'gemma3:4b') as node:
+                requests.post(f"{node.base_url}/api/generate", ...)
+        """
+        node = self.choose(role, model)
+        try:
+            yield node
+        except Exception as e:
+            connection_lost = isinstance(e, requests.exceptions.ConnectionError)
+            self.release(node, False, str(e), connection_lost=connection_lost)
+            raise
+        else:
+            self.release(node, True)
+
+    def stats(self) -> Dict:
+        """สถิติของทุก node"""
+        return {node.name: node.stats() for node in self.nodes}
+
+
+@contextmanager
+def ollama_endpoint(pool: Optional[NodePool], role: str, model: Optional[str] = None,
+                    default_url: Optional[str] = None):
+    """base URL สำหรับคำขอหนึ่งครั้ง - จาก pool ถ้ามี ไม่เช่นนั้นใช้ default_url หรือ host/port ใน OLLAMA_CONFIG"""
+    if pool is None:
+        yield default_url or f"http://{OLLAMA_CONFIG['host']}:{OLLAMA_CONFIG['port']}"
+        return
+    with pool.acquire(role, model) as node:
+        yield node.base_url
+
+
+_shared_pool: Optional[NodePool] = None
+_shared_pool_loaded = False
+_shared_lock = threading.Lock()
+
+
+def get_node_pool() -> Optional[NodePool]:
+    """pool กลางของแอปจาก OLLAMA_CONFIG['nodes'] (None = ใช้ host/port เดียวตามเดิม)"""
+    global _shared_pool, _shared_pool_loaded
+    with _shared_lock:
+        if not _shared_pool_loaded:
+            _shared_pool = NodePool.from_config()
+            _shared_pool_loaded = True
+        return _shared_pool
@@ -1,33 +1,47 @@
-import cv2
-import numpy as np
 from PIL import Image
+import logging
 import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import CAPTURE_CONFIG
+from config import CAPTURE_CONFIG, CACHE_CONFIG, GENERATION_CONFIG, OLLAMA_CONFIG
 import base64
+import re
 import requests
 from io import BytesIO
-from .ollama_translator import OllamaTranslator
+from .cache import get_shared_cache, image_key, make_key
+from .generation import (KIND_OCR, context_size, estimate_text_tokens, get_budget_tracker, grow_budget,
+                         is_truncated, ocr_budget)
+from .node_pool import ROLE_VISION, get_node_pool, ollama_endpoint
+from utils.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+
+# ตัวคั่นผลลัพธ์ของแต่ละภาพในคำขอแบบ batch
+BATCH_DELIMITER = "=== IMAGE {index} ==="
+BATCH_DELIMITER_PATTERN = re.compile(r'^\s*=+\s*IMAGE\s+(\d+)\s*=+\s*$', re.IGNORECASE | re.MULTILINE)
 
 
 class OCR:
-    def __init__(self, vision_model='gemma3:4b'):
+    def __init__(self, vision_model='gemma3:4b', cache=None, pool=None):
         """เริ่มต้น OCR engine ด้วย Ollama Vision
         vision_model: model ที่ใช้สำหรับ Ollama Vision
+        cache: Cache สำหรับผล OCR (None = ใช้ cache กลางถ้าเปิดใน config)
+        pool: NodePool สำหรับกระจายคำขอ (None = pool กลางจาก OLLAMA_CONFIG['nodes'] ถ้ามี)
         """
         self.vision_model = vision_model
-        try:
-            self.ollama = OllamaTranslator(model=self.vision_model)
-        except Exception as e:
-            print(f"❌ เกิดข้อผิดพลาดในการตั้งค่า OCR: {e}")
+        if cache is None and CACHE_CONFIG['enable_ocr_cache']:
+            cache = get_shared_cache(CACHE_CONFIG['ocr_cache_file'])
+        self.cache = cache
+        self.pool = pool if pool is not None else get_node_pool()
+        self.budget = get_budget_tracker()
     
     def update_vision_model(self, model: str):
         """อัปเดต vision model สำหรับ Ollama Vision"""
         self.vision_model = model
-        self.ollama = OllamaTranslator(model=self.vision_model)
-        print(f"🔄 เปลี่ยน vision model เป็น: {self.vision_model}")
+        logger.info("🔄 เปลี่ยน vision model เป็น: %s", self.vision_model)
 
+    @traced('capture')
     def capture_screen(self, region):
         """จับภาพหน้าจอในพื้นที่ที่กำหนด
         
@@ -44,7 +58,7 @@ class OCR:
             screenshot = pyautogui.screenshot(region=(x, y, width, height))
             return screenshot
         except Exception as e:
-            print(f"❌ เกิดข้อผิดพลาดในการจับภาพ: {e}")
+            logger.error("❌ เกิดข้อผิดพลาดในการจับภาพ: %s", e, extra={'stage': 'capture'})
             return None
 
     def process_image(self, image):
@@ -56,6 +70,9 @@ class OCR:
         Returns:
             PIL.Image: ภาพที่ประมวลผลแล้ว
         """
+        import cv2
+        import numpy as np
+        
         try:
             if image is None:
                 return None
@@ -67,7 +84,7 @@ class OCR:
                 ratio = min(MAX_WIDTH / image.width, MAX_HEIGHT / image.height)
                 new_size = (int(image.width * ratio), int(image.height * ratio))
                 image = image.resize(new_size, Image.Resampling.LANCZOS)
-                print(f"🔄 ปรับขนาดภาพเป็น {new_size} เพื่อประหยัดทรัพยากร")
+                logger.debug("🔄 ปรับขนาดภาพเป็น %s เพื่อประหยัดทรัพยากร", new_size)
                 
             # แปลงเป็น numpy array
             img_array = np.array(image)
@@ -107,52 +124,221 @@ class OCR:
             return processed_image
             
         except Exception as e:
-            print(f"❌ เกิดข้อผิดพลาดในการประมวลผลภาพ: {e}")
+            logger.error("❌ เกิดข้อผิดพลาดในการประมวลผลภาพ: %s", e, extra={'stage': 'ocr'})
             return image
 
+    @traced('ocr.encode')
+    def _encode_image(self, image):
+        """แปลงภาพเป็น PNG base64 สำหรับส่งให้ Ollama"""
+        buffered = BytesIO()
+        image.save(buffered, format="PNG")
+        return base64.b64encode(buffered.getvalue()).decode()
+
+    @traced('ocr.request')
+    def _request_vision(self, prompt, images_b64, read_timeout=15, num_predict=None):
+        """ส่งคำขอไปยัง Ollama Vision และคืนข้อความที่ได้ (None ถ้า HTTP error)
+
+        num_predict: budget ของคำตอบ (None = ค่าเริ่มต้นต่อภาพ) - ถ้าคำตอบถูกตัดจะขอใหม่ด้วย budget เท่าตัว
+        """
+        if num_predict is None:
+            num_predict = ocr_budget(count=len(images_b64))
+        retries = GENERATION_CONFIG['truncation_retries']
+        attempt = 0
+        while True:
+            text, final = self._post_vision(prompt, images_b64, read_timeout, num_predict)
+            if text is None:
+                return None
+            self.budget.record(KIND_OCR, num_predict, final, retried=attempt > 0)
+            larger = grow_budget(num_predict, KIND_OCR)
+            if not is_truncated(final) or attempt >= retries or larger <= num_predict:
+                if is_truncated(final):
+                    logger.warning("⚠️ ผล OCR ถูกตัดที่ %s tokens", num_predict, extra={'stage': 'ocr'})
+                return text
+            attempt += 1
+            num_predict = larger
+
+    def _post_vision(self, prompt, images_b64, read_timeout, num_predict):
+        """คำขอ /api/generate หนึ่งครั้ง
+
+        Returns:
+            tuple: (ข้อความ, คำตอบทั้งหมดที่มีสถิติ) - (None, None) ถ้า HTTP error
+        """
+        payload = {
+            "model": self.vision_model,
+            "prompt": prompt,
+            "images": images_b64,
+            "stream": False,
+            "options": {
+                "temperature": 0.1,
+                "num_predict": num_predict,
+                "num_ctx": context_size(estimate_text_tokens(prompt), num_predict, len(images_b64)),
+                "stop": GENERATION_CONFIG['ocr_stop']
+            }
+        }
+        with ollama_endpoint(self.pool, ROLE_VISION, self.vision_model) as base_url:
+            # ลดเวลา timeout เพื่อป้องกันการค้าง - จาก 60 วินาที เป็น 15 วินาที
+            # เพิ่ม connection timeout เพื่อจัดการปัญหาเครือข่าย
+            response = requests.post(f"{base_url}/api/generate", json=payload, timeout=(5, read_timeout))  # (connect_timeout, read_timeout)
+            if response.status_code >= 500 and self.pool is not None:
+                response.raise_for_status()  # ให้ pool นับเป็นความล้มเหลวของ node
+        if response.status_code == 200:
+            result = response.json()
+            return result.get('response', '').strip(), result
+        logger.error("❌ Ollama Vision error: %s", response.text, extra={'stage': 'ocr'})
+        return None, None
+
     def extract_text_ollama_vision(self, image):
         """ใช้ Ollama Vision อ่านข้อความจากภาพ"""
         try:
-            # แปลงภาพเป็น base64
-            buffered = BytesIO()
-            image.save(buffered, format="PNG")
-            img_b64 = base64.b64encode(buffered.getvalue()).decode()
+            cache_key = None
+            if self.cache is not None:
+                cache_key = make_key('ocr', self.vision_model, image_key(image))
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+            return self._extract_image_uncached(image, cache_key)
+        except Exception as e:
+            logger.error("❌ Ollama Vision OCR error: %s", e, extra={'stage': 'ocr'})
+            return ""
+
+    def _extract_image_uncached(self, image, cache_key=None):
+        """อ่านภาพ PIL หนึ่งภาพที่ไม่มีใน cache แล้วบันทึกผลลง cache"""
+        try:
+            # แปลงภาพเป็น base64 และประมาณความยาวคำตอบจากความหนาแน่นของข้อความในภาพ
+            img_b64 = self._encode_image(image)
+            return self._extract_text_uncached(img_b64, cache_key, ocr_budget([image]))
+        except Exception as e:
+            logger.error("❌ Ollama Vision OCR error: %s", e, extra={'stage': 'ocr'})
+            return ""
+
+    def extract_text_from_base64(self, img_b64, content_key=None, num_predict=None):
+        """อ่านข้อความจากภาพที่แปลงเป็น PNG base64 แล้ว (เช่น ภาพที่เตรียมไว้ใน process อื่น)
+
+        Args:
+            img_b64 (str): ภาพ PNG แบบ base64
+            content_key (str): key ของเนื้อหาภาพ (จาก image_key) สำหรับ cache
+            num_predict (int): budget ของคำตอบ (จาก ocr_budget ตอนเตรียมภาพ - None = ค่าเริ่มต้น)
+        """
+        cache_key = None
+        if self.cache is not None and content_key is not None:
+            cache_key = make_key('ocr', self.vision_model, content_key)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        return self._extract_text_uncached(img_b64, cache_key, num_predict)
+
+    def _extract_text_uncached(self, img_b64, cache_key=None, num_predict=None):
+        """ส่งภาพหนึ่งภาพไปยัง Ollama Vision แล้วบันทึกผลลง cache"""
+        try:
             prompt = "Read all text in this image. Return only the text, no explanation."
-            payload = {
-                "model": self.vision_model,
-                "prompt": prompt,
-                "images": [img_b64],
-                "stream": False,
-                "options": {"temperature": 0.1, "max_tokens": 1024}
-            }
-            url = f"http://localhost:11434/api/generate"
-            # ลดเวลา timeout เพื่อป้องกันการค้าง - จาก 60 วินาที เป็น 15 วินาที
-            # เพิ่ม connection timeout เพื่อจัดการปัญหาเครือข่าย
-            response = requests.post(url, json=payload, timeout=(5, 15))  # (connect_timeout, read_timeout)
-            if response.status_code == 200:
-                result = response.json()
-                text = result.get('response', '').strip()
-                return text
-            else:
-                print(f"❌ Ollama Vision error: {response.text}")
+            text = self._request_vision(prompt, [img_b64], num_predict=num_predict)
+            if text is None:
                 return ""
+            if cache_key is not None:
+                self.cache.set(cache_key, text)
+            return text
         except requests.exceptions.ConnectTimeout:
-            print(f"❌ Ollama Vision connection timeout: ไม่สามารถเชื่อมต่อ Ollama ได้")
+            logger.error("❌ Ollama Vision connection timeout: ไม่สามารถเชื่อมต่อ Ollama ได้", extra={'stage': 'ocr'})
             return ""
         except requests.exceptions.ReadTimeout:
-            print(f"❌ Ollama Vision read timeout: Ollama ตอบสนองช้าเกินไป")
+            logger.error("❌ Ollama Vision read timeout: Ollama ตอบสนองช้าเกินไป", extra={'stage': 'ocr'})
             return ""
         except requests.exceptions.RequestException as e:
-            print(f"❌ Ollama Vision network error: {e}")
+            logger.error("❌ Ollama Vision network error: %s", e, extra={'stage': 'ocr'})
             return ""
         except Exception as e:
-            print(f"❌ Ollama Vision OCR error: {e}")
+            logger.error("❌ Ollama Vision OCR error: %s", e, extra={'stage': 'ocr'})
             return ""
 
     def extract_text(self, image):
         """สกัดข้อความจากภาพด้วย Ollama Vision"""
         return self.extract_text_ollama_vision(image)
 
+    def _create_batch_prompt(self, count):
+        """สร้าง prompt ที่ให้ model ตอบข้อความของแต่ละภาพแยกด้วยตัวคั่น"""
+        example = "\n".join(f"{BATCH_DELIMITER.format(index=i)}\n<text of image {i}>" for i in range(1, count + 1))
+        return (
+            f"You are given {count} images. Read all text in each image separately.\n"
+            f"For every image, write its delimiter line exactly as shown, then only the text of that image. "
+            f"If an image has no text, leave its section empty. Do not add explanations.\n\n"
+            f"{example}"
+        )
+
+    def _parse_batch_response(self, text, count):
+        """แยกผลลัพธ์ของคำขอแบบ batch กลับเป็นข้อความของแต่ละภาพ
+
+        Returns:
+            list: ข้อความของแต่ละภาพตามลำดับ หรือ None ถ้าแยกไม่ได้ครบ
+        """
+        matches = list(BATCH_DELIMITER_PATTERN.finditer(text or ""))
+        results = {}
+        for i, match in enumerate(matches):
+            index = int(match.group(1))
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+            if 1 <= index <= count and index not in results:
+                results[index] = text[match.end():end].strip()
+
+        if len(results) != count:
+            return None
+        return [results[i] for i in range(1, count + 1)]
+
+    def extract_text_batch(self, images):
+        """อ่านข้อความจากหลายภาพในคำขอเดียว (ใช้ images array ของ Ollama)
+
+        ภาพที่มีใน cache ใช้ผลเดิม - ส่งไปอ่านเฉพาะภาพที่ยังไม่มี แล้วบันทึกผลของแต่ละภาพลง cache
+        ถ้าแยกผลลัพธ์ไม่ได้หรือคำขอล้มเหลว จะกลับไปอ่านทีละภาพ
+
+        Args:
+            images (list): รายการ PIL.Image
+
+        Returns:
+            list: ข้อความของแต่ละภาพตามลำดับ
+        """
+        results = [None] * len(images)
+        cache_keys = [None] * len(images)
+        if self.cache is not None:
+            for i, image in enumerate(images):
+                cache_keys[i] = make_key('ocr', self.vision_model, image_key(image))
+                results[i] = self.cache.get(cache_keys[i])
+
+        missing = [i for i, text in enumerate(results) if text is None]
+        if len(missing) == 1:
+            results[missing[0]] = self._extract_image_uncached(images[missing[0]], cache_keys[missing[0]])
+        elif missing:
+            texts = self._extract_batch_uncached([images[i] for i in missing], [cache_keys[i] for i in missing])
+            for i, text in zip(missing, texts):
+                results[i] = text
+        return results
+
+    def _extract_batch_uncached(self, images, cache_keys):
+        """อ่านหลายภาพที่ไม่มีใน cache ในคำขอเดียว แล้วบันทึกผลของแต่ละภาพลง cache"""
+        try:
+            images_b64 = [self._encode_image(image) for image in images]
+            prompt = self._create_batch_prompt(len(images))
+            # ให้เวลาอ่านเพิ่มตามจำนวนภาพ
+            text = self._request_vision(prompt, images_b64, read_timeout=15 + 5 * (len(images) - 1),
+                                        num_predict=ocr_budget(images))
+            if text is not None:
+                parsed = self._parse_batch_response(text, len(images))
+                if parsed is not None:
+                    for cache_key, image_text in zip(cache_keys, parsed):
+                        if cache_key is not None:
+                            self.cache.set(cache_key, image_text)
+                    return parsed
+                logger.warning("⚠️ แยกผลลัพธ์ batch OCR ไม่ได้ - อ่านทีละภาพแทน (%s ภาพ)", len(images),
+                               extra={'stage': 'ocr'})
+        except requests.exceptions.RequestException as e:
+            logger.error("❌ Ollama Vision batch error: %s - อ่านทีละภาพแทน", e, extra={'stage': 'ocr'})
+        except Exception as e:
+            logger.error("❌ Ollama Vision batch OCR error: %s - อ่านทีละภาพแทน", e, extra={'stage': 'ocr'})
+
+        return [self._extract_image_uncached(image, cache_key) for image, cache_key in zip(images, cache_keys)]
+
+    def get_text_with_confidence_batch(self, images):
+        """สกัดข้อความพร้อมค่าความมั่นใจจากหลายภาพในคำขอเดียว"""
+        return [(text, 0.9 if text.strip() else 0.0) for text in self.extract_text_batch(images)]
+
     def get_text_with_confidence(self, image):
         """สกัดข้อความพร้อมค่าความมั่นใจ สำหรับ Ollama Vision"""
         text = self.extract_text_ollama_vision(image)
@@ -201,10 +387,10 @@ class OCR:
             filepath = os.path.join(debug_folder, filename)
             
             image.save(filepath)
-            print(f"💾 บันทึกภาพ debug: {filepath}")
+            logger.info("💾 บันทึกภาพ debug: %s", filepath)
             
         except Exception as e:
-            print(f"❌ ไม่สามารถบันทึกภาพ debug: {e}")
+            logger.error("❌ ไม่สามารถบันทึกภาพ debug: %s", e)
 
     def test_ocr(self):
         """ทดสอบการทำงานของ OCR"""
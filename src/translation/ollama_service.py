@@ -3,85 +3,242 @@ Ollama Service Module for managing Ollama models and API interactions
 ใช้สำหรับดึงรายการ models และจัดการการเชื่อมต่อ Ollama
 """
 
+import logging
+import os
+import sys
 import requests
 import json
+import threading
+import time
 from typing import Dict, List, Optional
 
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import OLLAMA_CONFIG
+
+logger = logging.getLogger(__name__)
+
 
 class OllamaService:
     """Service สำหรับจัดการ Ollama API และ models"""
     
-    def __init__(self, host: str = "localhost", port: int = 11434):
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 ttl: Optional[float] = None, inventory_file: Optional[str] = None):
         """
         เริ่มต้น Ollama Service
         
         Args:
-            host (str): Ollama server host
-            port (int): Ollama server port
+            host (str): Ollama server host (None = ใช้ค่าจาก config)
+            port (int): Ollama server port (None = ใช้ค่าจาก config)
+            ttl (float): อายุของรายการ models ใน cache (วินาที, None = ใช้ค่าจาก config)
+            inventory_file (str): ไฟล์เก็บรายการ models (None = ใช้ค่าจาก config ในโฟลเดอร์ข้อมูลแอป, '' = ไม่บันทึก)
         """
-        self.host = host
-        self.port = port
-        self.base_url = f"http://{host}:{port}"
+        self.host = host or OLLAMA_CONFIG['host']
+        self.port = port or OLLAMA_CONFIG['port']
+        self.base_url = f"http://{self.host}:{self.port}"
         self.tags_url = f"{self.base_url}/api/tags"
+        self.show_url = f"{self.base_url}/api/show"
         self.session = requests.Session()
         self.timeout = 10
+        self.ttl = OLLAMA_CONFIG['inventory_ttl'] if ttl is None else ttl
+        self.inventory_file = OLLAMA_CONFIG['inventory_file'] if inventory_file is None else inventory_file
         
-    def is_available(self) -> bool:
-        """ตรวจสอบว่า Ollama พร้อมใช้งานหรือไม่"""
+        # รายการ models ล่าสุด: {'fetched_at', 'models': [/api/tags entries], 'details': {name: metadata}}
+        self._inventory: Optional[Dict] = None
+        self._reachable = False  # refresh ล่าสุดใน process นี้สำเร็จหรือไม่
+        self._lock = threading.Lock()
+        self.stats = {'refreshes': 0, 'cache_hits': 0, 'show_requests': 0, 'failures': 0}
+        self._load_inventory()
+    
+    # ----- inventory cache -----
+    
+    def _inventory_path(self) -> Optional[str]:
+        """path ของไฟล์ inventory (None = ไม่บันทึก)"""
+        if not self.inventory_file:
+            return None
+        if os.path.isabs(self.inventory_file):
+            return self.inventory_file
+        from utils.helpers import get_app_data_dir
+        return os.path.join(get_app_data_dir(), self.inventory_file)
+    
+    def _load_inventory(self):
+        """โหลดรายการ models ที่บันทึกไว้ เพื่อให้ UI แสดงได้ทันทีตอนเปิดแอป"""
         try:
-            response = self.session.get(self.tags_url, timeout=self.timeout)
-            return response.status_code == 200
-        except Exception:
-            return False
+            path = self._inventory_path()
+            if path and os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('base_url') == self.base_url:
+                    self._inventory = data
+        except Exception as e:
+            logger.warning("⚠️ ไม่สามารถโหลดรายการ models ที่บันทึกไว้: %s", e)
     
-    def get_available_models(self) -> List[Dict]:
+    def _save_inventory(self):
+        """บันทึกรายการ models ลงไฟล์"""
+        try:
+            path = self._inventory_path()
+            if not path:
+                return
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(dict(self._inventory, base_url=self.base_url), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.warning("⚠️ ไม่สามารถบันทึกรายการ models: %s", e)
+    
+    def is_fresh(self) -> bool:
+        """รายการ models ใน cache ยังไม่หมดอายุ และได้มาจาก server ใน process นี้"""
+        return (self._reachable and self._inventory is not None
+                and time.time() - self._inventory['fetched_at'] < self.ttl)
+    
+    def refresh(self, force: bool = False) -> bool:
         """
-        ดึงรายการ models ที่มีอยู่ใน Ollama
+        อัปเดตรายการ models จาก server ถ้า cache หมดอายุ (เรียก /api/tags ครั้งเดียวต่อรอบ)
+        /api/show ถูกเรียกเฉพาะ model ที่ใหม่หรือ digest เปลี่ยน
         
+        Args:
+            force (bool): อัปเดตแม้ cache ยังไม่หมดอายุ
+            
         Returns:
-            List[Dict]: รายการ models พร้อมข้อมูล
+            bool: True หาก server ตอบสำเร็จ (หรือ cache ยังใหม่อยู่)
         """
+        with self._lock:
+            if not force and self.is_fresh():
+                self.stats['cache_hits'] += 1
+                return True
+            
+            self.stats['refreshes'] += 1
+            try:
+                response = self.session.get(self.tags_url, timeout=self.timeout)
+                if response.status_code != 200:
+                    logger.error("❌ Error fetching models: %s", response.status_code)
+                    self._reachable = False
+                    self.stats['failures'] += 1
+                    return False
+                models = response.json().get('models', [])
+            except Exception as e:
+                logger.error("❌ Error connecting to Ollama: %s", e)
+                self._reachable = False
+                self.stats['failures'] += 1
+                return False
+            
+            old_details = (self._inventory or {}).get('details', {})
+            details = {}
+            for model in models:
+                name = model.get('name')
+                if not name:
+                    continue
+                cached = old_details.get(name)
+                if cached is not None and cached.get('digest') == model.get('digest'):
+                    details[name] = cached
+                else:
+                    details[name] = self._fetch_model_details(name, model)
+            
+            changed = self._inventory is None or details != old_details or \
+                [m.get('name') for m in models] != [m.get('name') for m in self._inventory.get('models', [])]
+            self._inventory = {'fetched_at': time.time(), 'models': models, 'details': details}
+            self._reachable = True
+            if changed:
+                self._save_inventory()
+            return True
+    
+    def _fetch_model_details(self, name: str, model: Dict) -> Dict:
+        """ดึงความสามารถของ model จาก /api/show (vision, context length, quantization)"""
+        details = model.get('details') or {}
+        info = {
+            'digest': model.get('digest'),
+            'family': details.get('family'),
+            'parameter_size': details.get('parameter_size'),
+            'quantization': details.get('quantization_level'),
+            'vision': None,
+            'context_length': None,
+            'capabilities': [],
+        }
         try:
-            response = self.session.get(self.tags_url, timeout=self.timeout)
-            if response.status_code == 200:
-                data = response.json()
-                models = data.get('models', [])
-                return models
-            else:
-                print(f"❌ Error fetching models: {response.status_code}")
-                return []
+            self.stats['show_requests'] += 1
+            response = self.session.post(self.show_url, json={'model': name, 'name': name}, timeout=self.timeout)
+            if response.status_code != 200:
+                return info
+            data = response.json()
         except Exception as e:
-            print(f"❌ Error connecting to Ollama: {e}")
-            return []
+            logger.warning("⚠️ ไม่สามารถดึงข้อมูล model %s: %s", name, e)
+            return info
+        
+        show_details = data.get('details') or {}
+        model_info = data.get('model_info') or {}
+        capabilities = data.get('capabilities') or []
+        families = show_details.get('families') or []
+        info.update({
+            'family': show_details.get('family') or info['family'],
+            'parameter_size': show_details.get('parameter_size') or info['parameter_size'],
+            'quantization': show_details.get('quantization_level') or info['quantization'],
+            'capabilities': capabilities,
+            'context_length': next((v for k, v in model_info.items() if k.endswith('.context_length')), None),
+            # Ollama รุ่นใหม่บอกใน capabilities รุ่นเก่าดูจาก projector / family ของ vision encoder
+            'vision': ('vision' in capabilities or bool(data.get('projector_info'))
+                       or any(f in ('clip', 'mllama') for f in families)),
+        })
+        return info
+    
+    # ----- API เดิม (ใช้ cache) -----
+    
+    def is_available(self) -> bool:
+        """ตรวจสอบว่า Ollama พร้อมใช้งานหรือไม่ (ใช้ผลจาก cache ถ้ายังไม่หมดอายุ)"""
+        return self.refresh()
     
-    def get_model_names(self) -> List[str]:
+    def get_available_models(self, refresh: bool = True) -> List[Dict]:
+        """
+        ดึงรายการ models ที่มีอยู่ใน Ollama
+        
+        Args:
+            refresh (bool): อัปเดตจาก server ถ้า cache หมดอายุ (False = ใช้ข้อมูลที่มีทันที)
+        
+        Returns:
+            List[Dict]: รายการ models พร้อมข้อมูล
+        """
+        if refresh:
+            self.refresh()
+        return list((self._inventory or {}).get('models', []))
+    
+    def get_model_names(self, refresh: bool = True) -> List[str]:
         """
         ดึงรายชื่อ models เฉพาะชื่อ
         
         Returns:
             List[str]: รายชื่อ models
         """
-        models = self.get_available_models()
+        models = self.get_available_models(refresh)
         return [model.get('name', '') for model in models if model.get('name')]
     
-    def get_vision_models(self) -> List[str]:
+    def get_model_details(self, name: str, refresh: bool = True) -> Dict:
+        """ความสามารถของ model: vision, context_length, quantization, family, parameter_size"""
+        if refresh:
+            self.refresh()
+        return dict((self._inventory or {}).get('details', {}).get(name, {}))
+    
+    def get_vision_models(self, refresh: bool = True) -> List[str]:
         """
-        ดึงรายการ models ทั้งหมดที่มี (ไม่กรองเฉพาะ vision)
+        ดึงรายการ models ที่อ่านภาพได้ (รวม model ที่ยังไม่รู้ความสามารถ)
         
         Returns:
-            List[str]: รายชื่อ models ทั้งหมด
+            List[str]: รายชื่อ vision models (ถ้าไม่พบเลยจะคืนทุก model)
         """
-        return self.get_model_names() # Return all model names
+        names = self.get_model_names(refresh)
+        details = (self._inventory or {}).get('details', {})
+        vision = [name for name in names if details.get(name, {}).get('vision') is not False]
+        return vision or names
     
-    def get_text_models(self) -> List[str]:
+    def get_text_models(self, refresh: bool = True) -> List[str]:
         """
         ดึงรายการ models สำหรับ text generation/translation
         
         Returns:
-            List[str]: รายชื่อ text models
+            List[str]: รายชื่อ text models (ไม่รวม model ที่ทำได้แค่ embedding)
         """
-        # สำหรับตอนนี้ return ทุก model เพราะส่วนใหญ่สามารถใช้แปลได้
-        return self.get_model_names()
+        names = self.get_model_names(refresh)
+        details = (self._inventory or {}).get('details', {})
+        text = [name for name in names
+                if not details.get(name, {}).get('capabilities')
+                or 'completion' in details[name]['capabilities']]
+        return text or names
     
     def get_default_models(self) -> Dict[str, str]:
         """
@@ -90,8 +247,9 @@ class OllamaService:
         Returns:
             Dict[str, str]: {'vision': model_name, 'translation': model_name}
         """
-        vision_models = self.get_vision_models()
-        text_models = self.get_text_models()
+        self.refresh()
+        vision_models = self.get_vision_models(refresh=False)
+        text_models = self.get_text_models(refresh=False)
         
         # เลือก default models
         default_vision = "gemma3:4b"  # current default
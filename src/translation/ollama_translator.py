@@ -3,54 +3,103 @@ Ollama Translator Module for Screen Translator
 ใช้ Ollama API เพื่อแปลภาษาอังกฤษเป็นไทยด้วย Gemma 3:4b model
 """
 
+import logging
+import os
+import sys
 import requests
 import json
 import time
-import re
-from typing import Dict, List, Optional
+import threading
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import GENERATION_CONFIG, OLLAMA_CONFIG
+from .generation import (KIND_TRANSLATION, context_size, estimate_text_tokens, get_budget_tracker,
+                         grow_budget, is_truncated, translation_budget)
+from .language_detector import detect_language
+from .node_pool import ROLE_TRANSLATION, get_node_pool, ollama_endpoint
+from utils.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
 
 
 class OllamaTranslator:
     """Translator ที่ใช้ Ollama API กับ Gemma3:4b model"""
     
-    def __init__(self, host: str = "localhost", port: int = 11434, model: str = "gemma3:4b", custom_prompt: str = ""):
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, model: str = "gemma3:4b", custom_prompt: str = "",
+                 health=None, pool=None, api_mode: Optional[str] = None):
         """
         เริ่มต้น Ollama Translator
         
         Args:
-            host (str): Ollama server host
-            port (int): Ollama server port
+            host (str): Ollama server host (None = ใช้ค่าจาก config)
+            port (int): Ollama server port (None = ใช้ค่าจาก config)
             model (str): Model name ที่จะใช้
             custom_prompt (str): Custom prompt template สำหรับการแปล
+            health (OllamaHealthMonitor): monitor ที่ให้สถานะการเชื่อมต่อแบบไม่มี I/O (None = ตรวจเองครั้งแรก)
+            pool (NodePool): กระจายคำขอไปหลาย Ollama (None = pool กลางจาก OLLAMA_CONFIG['nodes'] ถ้าไม่ได้ระบุ host/port)
+            api_mode (str): 'chat' = คำสั่งอยู่ใน system message คงที่ (ใช้ prompt cache ซ้ำได้),
+                'generate' = prompt เดียวแบบเดิม (None = ใช้ค่าจาก config)
         """
-        self.host = host
-        self.port = port
+        self.host = host or OLLAMA_CONFIG['host']
+        self.port = port or OLLAMA_CONFIG['port']
         self.model = model
         self.custom_prompt = custom_prompt
-        self.base_url = f"http://{host}:{port}"
+        self.base_url = f"http://{self.host}:{self.port}"
         self.api_url = f"{self.base_url}/api/generate"
         self.session = requests.Session()
         
         # กำหนด timeout
         self.timeout = 30
         
-        # ตรวจสอบการเชื่อมต่อ
-        self.is_connected = self._test_connection()
+        # ตรวจสอบการเชื่อมต่อเมื่อใช้งานครั้งแรก (ไม่บล็อกตอนสร้าง object)
+        self._connected: Optional[bool] = None
+        self.health = health
+        if pool is None and host is None and port is None:
+            pool = get_node_pool()
+        self.pool = pool
+        self.api_mode = api_mode or OLLAMA_CONFIG['api_mode']
         
-        if self.is_connected:
-            print(f"✅ เชื่อมต่อ Ollama สำเร็จ - Model: {self.model}")
+        # สถิติ prompt_eval/eval จากคำตอบของ Ollama แยกตาม endpoint
+        self._usage_lock = threading.Lock()
+        self.usage = {}
+        # num_predict ที่ตั้งเทียบกับ eval_count จริง (ใช้ร่วมกับ OCR)
+        self.budget = get_budget_tracker()
+    
+    @property
+    def is_connected(self) -> bool:
+        """สถานะการเชื่อมต่อ - อ่านจาก node pool หรือ health monitor ถ้ามี ไม่เช่นนั้นตรวจสอบกับ server ครั้งแรกที่ถูกเรียก"""
+        if self.pool is not None:
+            return self.pool.is_available(ROLE_TRANSLATION, self.model)
+        if self.health is not None and self.health.state != 'unknown':
+            return self.health.is_model_available(self.model)
+        if self._connected is None:
+            self.check_connection()
+        return self._connected
+    
+    @is_connected.setter
+    def is_connected(self, value: bool):
+        self._connected = value
+    
+    def check_connection(self) -> bool:
+        """ตรวจสอบการเชื่อมต่อกับ Ollama ทันที"""
+        self._connected = self._test_connection()
+        if self._connected:
+            logger.info("✅ เชื่อมต่อ Ollama สำเร็จ - Model: %s", self.model)
         else:
-            print(f"❌ ไม่สามารถเชื่อมต่อ Ollama ได้ - {self.base_url}")
+            logger.error("❌ ไม่สามารถเชื่อมต่อ Ollama ได้ - %s", self.base_url)
+        return self._connected
     
     def update_model(self, model: str):
-        """อัปเดต model ที่ใช้"""
+        """อัปเดต model ที่ใช้ (ตรวจสอบการเชื่อมต่อใหม่เมื่อใช้งานครั้งถัดไป)"""
         self.model = model
-        print(f"🔄 เปลี่ยน model เป็น: {self.model}")
+        self._connected = None
+        logger.info("🔄 เปลี่ยน model เป็น: %s", self.model)
     
     def update_custom_prompt(self, custom_prompt: str):
         """อัปเดต custom prompt"""
         self.custom_prompt = custom_prompt
-        print(f"🔄 อัปเดต custom prompt: {'ใช้' if custom_prompt else 'ไม่ใช้'}")
+        logger.info("🔄 อัปเดต custom prompt: %s", 'ใช้' if custom_prompt else 'ไม่ใช้')
 
     def _test_connection(self) -> bool:
         """ทดสอบการเชื่อมต่อกับ Ollama"""
@@ -63,27 +112,17 @@ class OllamaTranslator:
                 if any(self.model in name for name in model_names):
                     return True
                 else:
-                    print(f"⚠️ Model {self.model} ไม่พบในระบบ")
-                    print(f"📋 Models ที่มี: {', '.join(model_names)}")
+                    logger.warning("⚠️ Model %s ไม่พบในระบบ", self.model)
+                    logger.info("📋 Models ที่มี: %s", ', '.join(model_names))
                     return False
             return False
         except Exception as e:
-            print(f"❌ ข้อผิดพลาดในการทดสอบการเชื่อมต่อ: {e}")
+            logger.error("❌ ข้อผิดพลาดในการทดสอบการเชื่อมต่อ: %s", e)
             return False
 
     def _detect_language(self, text: str) -> str:
-        """ตรวจจับภาษาอย่างง่าย"""
-        # ตรวจจับอักขระไทย
-        thai_pattern = re.compile(r'[\u0E00-\u0E7F]')
-        if thai_pattern.search(text):
-            return 'th'
-        
-        # ตรวจจับอักขระอังกฤษ
-        english_pattern = re.compile(r'[a-zA-Z]')
-        if english_pattern.search(text):
-            return 'en'
-        
-        return 'unknown'
+        """ตรวจจับภาษาจากระบบตัวเขียนในข้อความ (ในเครื่องเท่านั้น - ข้อความละตินถือเป็นอังกฤษ)"""
+        return detect_language(text)['language']
 
     def _create_prompt(self, text: str) -> str:
         """สร้าง prompt สำหรับ Ollama - ใช้ custom prompt หรือ default prompt"""
@@ -102,7 +141,8 @@ Respond ONLY with the final Thai translation sentence. Do not include any Englis
 """
             return prompt
 
-    def translate(self, text: str, target_language: str = 'th', source_language: str = 'auto') -> Dict:
+    def translate(self, text: str, target_language: str = 'th', source_language: str = 'auto',
+                  cancel_event=None) -> Dict:
         """
         แปลข้อความจากอังกฤษเป็นไทย
         
@@ -110,6 +150,7 @@ Respond ONLY with the final Thai translation sentence. Do not include any Englis
             text (str): ข้อความที่จะแปล
             target_language (str): ภาษาเป้าหมาย (รองรับเฉพาะ 'th')
             source_language (str): ภาษาต้นฉบับ
+            cancel_event (threading.Event): ถ้ากำหนด จะรับคำตอบแบบ streaming และยกเลิกได้เมื่อ event ถูก set
             
         Returns:
             dict: ผลลัพธ์การแปล
@@ -166,36 +207,27 @@ Respond ONLY with the final Thai translation sentence. Do not include any Englis
             }
         
         try:
-            # เตรียม prompt
-            prompt = self._create_prompt(text)
+            # เตรียม prompt และเรียก Ollama API
+            endpoint, payload = self._build_request(text)
             
-            # เรียก Ollama API
-            payload = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.3,  # ลดความสุ่มเพื่อการแปลที่สอดคล้อง
-                    "top_p": 0.9,
-                    "max_tokens": 1000
-                }
-            }
+            logger.debug("🔄 กำลังแปลด้วย Ollama (%s)...", self.model)
             
-            print(f"🔄 กำลังแปลด้วย Ollama ({self.model})...")
-            
-            response = self.session.post(
-                self.api_url,
-                json=payload,
-                timeout=self.timeout,
-                headers={'Content-Type': 'application/json'}
-            )
+            response, translated_text, truncated = self._generate(endpoint, payload, cancel_event)
             
             if response.status_code == 200:
-                result_data = response.json()
-                translated_text = result_data.get('response', '').strip()
+                if translated_text is None:
+                    return {
+                        'translated_text': text,
+                        'detected_language': 'cancelled',
+                        'confidence': 0.0,
+                        'service': 'ollama',
+                        'cancelled': True
+                    }
                 
                 # ทำความสะอาดผลลัพธ์
                 translated_text = self._clean_translation(translated_text)
+                if self.health is not None:
+                    self.health.report_success()
                 
                 result = {
                     'translated_text': translated_text,
@@ -204,11 +236,13 @@ Respond ONLY with the final Thai translation sentence. Do not include any Englis
                     'service': 'ollama',
                     'model': self.model
                 }
+                if truncated:
+                    result['truncated'] = True
                 
                 return result
             else:
                 error_msg = f"HTTP {response.status_code}: {response.text}"
-                print(f"❌ Ollama API error: {error_msg}")
+                logger.error("❌ Ollama API error: %s", error_msg, extra={'stage': 'translate'})
                 return {
                     'translated_text': text,
                     'detected_language': 'error',
@@ -218,7 +252,9 @@ Respond ONLY with the final Thai translation sentence. Do not include any Englis
                 }
         
         except requests.exceptions.Timeout:
-            print("⏰ Ollama API timeout")
+            logger.warning("⏰ Ollama API timeout", extra={'stage': 'translate'})
+            if self.health is not None:
+                self.health.report_failure('Request timeout')
             return {
                 'translated_text': text,
                 'detected_language': 'error',
@@ -226,8 +262,19 @@ Respond ONLY with the final Thai translation sentence. Do not include any Englis
                 'service': 'ollama',
                 'error': 'Request timeout'
             }
+        except requests.exceptions.ConnectionError as e:
+            logger.error("❌ Ollama connection lost: %s", e, extra={'stage': 'translate'})
+            if self.health is not None:
+                self.health.report_failure(str(e), connection_lost=True)
+            return {
+                'translated_text': text,
+                'detected_language': 'error',
+                'confidence': 0.0,
+                'service': 'ollama',
+                'error': 'Ollama not connected'
+            }
         except Exception as e:
-            print(f"❌ Ollama translation error: {e}")
+            logger.error("❌ Ollama translation error: %s", e, extra={'stage': 'translate'})
             return {
                 'translated_text': text,
                 'detected_language': 'error',
@@ -236,6 +283,156 @@ Respond ONLY with the final Thai translation sentence. Do not include any Englis
                 'error': str(e)
             }
 
+    def _build_request(self, text: str) -> Tuple[str, Dict]:
+        """สร้าง endpoint และ payload ของคำขอแปล
+        
+        โหมด chat: คำสั่งแปลอยู่ใน system message ที่เหมือนกันทุกคำขอ ข้อความที่จะแปลอยู่ใน user message
+        ส่วนต้นของ prompt จึงคงที่ และ Ollama ใช้ KV cache ของส่วนนั้นซ้ำได้โดยไม่ต้องประมวลผลใหม่
+        custom prompt ที่มี {text} อยู่กลางข้อความยังใช้ /api/generate แบบเดิม
+        
+        num_predict ประมาณจากความยาวต้นฉบับ (translation_budget) และ stop sequences ตัดคำอธิบายที่ model เติมท้าย
+        """
+        num_predict = translation_budget(text)
+        options = {
+            "temperature": 0.3,  # ลดความสุ่มเพื่อการแปลที่สอดคล้อง
+            "top_p": 0.9,
+            "num_predict": num_predict,
+            "stop": GENERATION_CONFIG['translation_stop']
+        }
+        if self.api_mode == 'chat' and not self.custom_prompt:
+            endpoint, payload = '/api/chat', {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": OLLAMA_CONFIG['system_prompt']},
+                    {"role": "user", "content": text}
+                ],
+                "options": options
+            }
+        else:
+            endpoint, payload = '/api/generate', {
+                "model": self.model,
+                "prompt": self._create_prompt(text),
+                "options": options
+            }
+        options["num_ctx"] = context_size(self._prompt_tokens(payload), num_predict)
+        return endpoint, payload
+
+    @staticmethod
+    def _prompt_tokens(payload: Dict) -> int:
+        """จำนวน token โดยประมาณของ prompt ในคำขอ (รวมทุก message)"""
+        if 'messages' in payload:
+            return sum(estimate_text_tokens(message['content']) for message in payload['messages'])
+        return estimate_text_tokens(payload.get('prompt', ''))
+
+    def _generate(self, endpoint: str, payload: Dict, cancel_event=None):
+        """ส่งคำขอ และขอใหม่ด้วย num_predict เท่าตัวเมื่อคำตอบถูกตัด (done_reason == 'length')
+        
+        Returns:
+            tuple: (response, ข้อความคำตอบ, ยังถูกตัดอยู่หรือไม่)
+        """
+        retries = GENERATION_CONFIG['truncation_retries']
+        attempt = 0
+        while True:
+            num_predict = payload['options']['num_predict']
+            response, text, final = self._post(endpoint, payload, cancel_event)
+            if text is None:
+                return response, text, False
+            self.budget.record(KIND_TRANSLATION, num_predict, final, retried=attempt > 0)
+            if not is_truncated(final):
+                return response, text, False
+            larger = grow_budget(num_predict, KIND_TRANSLATION)
+            if attempt >= retries or larger <= num_predict:
+                logger.warning("⚠️ คำแปลถูกตัดที่ %s tokens", num_predict, extra={'stage': 'translate'})
+                return response, text, True
+            attempt += 1
+            options = dict(payload['options'], num_predict=larger)
+            options['num_ctx'] = context_size(self._prompt_tokens(payload), larger)
+            payload = dict(payload, options=options)
+
+    def _post(self, endpoint: str, payload: Dict, cancel_event=None):
+        """ส่งคำขอไปยัง Ollama (ผ่าน node pool ถ้ามี)
+        
+        Returns:
+            tuple: (response, ข้อความคำตอบ, chunk สุดท้ายที่มีสถิติ) - ข้อความเป็น None ถ้า HTTP error หรือถูกยกเลิก
+        """
+        payload = dict(payload, stream=cancel_event is not None)
+        with ollama_endpoint(self.pool, ROLE_TRANSLATION, self.model, self.base_url) as base_url:
+            response = self.session.post(
+                f"{base_url}{endpoint}",
+                json=payload,
+                timeout=self.timeout,
+                headers={'Content-Type': 'application/json'},
+                stream=cancel_event is not None
+            )
+            if response.status_code != 200:
+                if response.status_code >= 500 and self.pool is not None:
+                    response.raise_for_status()  # ให้ pool นับเป็นความล้มเหลวของ node
+                return response, None, None
+            if cancel_event is not None:
+                text, final = self._read_stream(response, cancel_event)
+            else:
+                final = response.json()
+                text = self._response_text(final).strip()
+        if final is not None:
+            self._record_usage(endpoint, final)
+        return response, text, final
+
+    @staticmethod
+    def _response_text(chunk: Dict) -> str:
+        """ข้อความในคำตอบของ /api/generate ('response') หรือ /api/chat ('message.content')"""
+        if 'message' in chunk:
+            return (chunk.get('message') or {}).get('content', '')
+        return chunk.get('response', '')
+
+    def _read_stream(self, response, cancel_event):
+        """อ่านคำตอบแบบ streaming (NDJSON) - ถ้า cancel_event ถูก set จะปิด connection
+        ให้ Ollama หยุดสร้างคำตอบ
+        
+        Returns:
+            tuple: (ข้อความ, chunk สุดท้ายที่มีสถิติ) - (None, None) ถ้าถูกยกเลิก
+        """
+        parts = []
+        final = None
+        try:
+            for line in response.iter_lines():
+                if cancel_event.is_set():
+                    return None, None
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                parts.append(self._response_text(chunk))
+                if chunk.get('done'):
+                    final = chunk
+                    break
+        finally:
+            response.close()
+        return ''.join(parts).strip(), final
+
+    def _record_usage(self, endpoint: str, final: Dict):
+        """สะสม prompt_eval_count/prompt_eval_duration/eval_count จากคำตอบ"""
+        prompt_eval_ms = final.get('prompt_eval_duration', 0) / 1e6
+        with self._usage_lock:
+            usage = self.usage.setdefault(endpoint, {'requests': 0, 'prompt_eval_count': 0,
+                                                     'prompt_eval_ms': 0.0, 'eval_count': 0})
+            usage['requests'] += 1
+            usage['prompt_eval_count'] += final.get('prompt_eval_count', 0)
+            usage['prompt_eval_ms'] += prompt_eval_ms
+            usage['eval_count'] += final.get('eval_count', 0)
+        get_tracer().record('ollama.prompt_eval', prompt_eval_ms)
+
+    def usage_stats(self) -> Dict:
+        """ค่าเฉลี่ยต่อคำขอของ prompt_eval_count, prompt_eval_duration และ eval_count แยกตาม endpoint"""
+        with self._usage_lock:
+            return {
+                endpoint: {
+                    'requests': usage['requests'],
+                    'avg_prompt_eval_count': round(usage['prompt_eval_count'] / usage['requests'], 1),
+                    'avg_prompt_eval_ms': round(usage['prompt_eval_ms'] / usage['requests'], 2),
+                    'avg_eval_count': round(usage['eval_count'] / usage['requests'], 1),
+                }
+                for endpoint, usage in self.usage.items() if usage['requests']
+            }
+
     def _clean_translation(self, text: str) -> str:
         """ทำความสะอาดผลลัพธ์การแปล"""
         # ลบข้อความที่ไม่จำเป็นที่ model อาจจะเพิ่มเข้ามา
@@ -269,7 +466,7 @@ Respond ONLY with the final Thai translation sentence. Do not include any Englis
         results = []
         
         for i, text in enumerate(texts):
-            print(f"🔄 แปลข้อความ {i+1}/{len(texts)}")
+            logger.debug("🔄 แปลข้อความ %s/%s", i + 1, len(texts))
             result = self.translate(text, target_language)
             results.append(result)
             
@@ -319,6 +516,9 @@ Respond ONLY with the final Thai translation sentence. Do not include any Englis
             'model': self.model,
             'host': self.host,
             'port': self.port,
+            'api_mode': self.api_mode,
+            'usage': self.usage_stats(),
+            'budget': self.budget.snapshot(),
             'available': self.is_available(),
             'supported_languages': {
                 'source': ['en'],
@@ -0,0 +1,354 @@
+"""
+Headless Pipeline Module for Screen Translator
+เครื่องมือหลัก capture -> OCR -> translate -> sinks ที่ไม่ขึ้นกับ Qt
+ใช้ได้ทั้งกับ GUI, CLI, benchmark หรือ server โดยแต่ละส่วนเปลี่ยนได้ (pluggable)
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .quality import get_quality_gate
+from .regions import RegionFrame
+from .scroll import ScrollTracker
+
+logger = logging.getLogger(__name__)
+
+
+class Pipeline:
+    """
+    Pipeline แบบ headless
+
+    - source: มี read(stop_event) คืนรายการ RegionFrame (ว่าง = ไม่มีภาพใหม่, None = หมด)
+    - ocr: มี extract_text(image) และ (ถ้ามี) extract_text_batch(images)
+    - translator: มี translate(text, target_language) คืน dict ที่มี 'translated_text'
+    - sinks: callable ที่รับ event dict หนึ่งตัว
+    - quality_gate: มี check(text) คืน dict ที่มี 'accepted' - ข้อความที่ไม่ผ่านถือเป็น OCR ว่าง
+    - scroll_tracker: ScrollTracker - พื้นที่ที่แค่เลื่อนถูก OCR/แปลเฉพาะแถบที่เลื่อนเข้ามาใหม่
+    """
+
+    def __init__(self, source, ocr, translator=None, sinks: Optional[List[Callable]] = None,
+                 target_language: str = 'th', auto_translate: bool = True, quality_gate=None,
+                 scroll_tracker=None):
+        """
+        Args:
+            source: แหล่งภาพ
+            ocr: OCR backend
+            translator: translation backend (None = OCR อย่างเดียว)
+            sinks (list): ผู้รับ event
+            target_language (str): ภาษาเป้าหมาย
+            auto_translate (bool): แปลอัตโนมัติหลัง OCR หรือไม่
+            quality_gate: ตัวกรองข้อความ OCR ก่อนแปล (None = gate กลาง)
+            scroll_tracker: ตัวติดตามการเลื่อนของแต่ละพื้นที่ (None = สร้างใหม่ตาม config)
+        """
+        self.source = source
+        self.ocr = ocr
+        self.translator = translator
+        self.sinks = list(sinks or [])
+        self.target_language = target_language
+        self.auto_translate = auto_translate
+        self.quality_gate = quality_gate if quality_gate is not None else get_quality_gate()
+        self.scroll_tracker = scroll_tracker if scroll_tracker is not None else ScrollTracker()
+
+        self.last_text: Dict[str, str] = {}
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._started_at = None
+
+        self.counters = {
+            'ticks': 0,
+            'frames': 0,
+            'ocr_requests': 0,
+            'ocr_empty': 0,
+            'ocr_rejected': 0,
+            'scroll_deferred': 0,
+            'duplicates': 0,
+            'translations': 0,
+            'errors': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Sinks
+    # ------------------------------------------------------------------
+
+    def add_sink(self, sink: Callable):
+        """เพิ่มผู้รับ event"""
+        with self._lock:
+            self.sinks.append(sink)
+
+    def remove_sink(self, sink: Callable):
+        """ลบผู้รับ event"""
+        with self._lock:
+            if sink in self.sinks:
+                self.sinks.remove(sink)
+
+    def _emit(self, event: Dict):
+        """ส่ง event ไปยังทุก sink - sink ที่ผิดพลาดจะไม่ทำให้ pipeline หยุด"""
+        with self._lock:
+            sinks = list(self.sinks)
+        for sink in sinks:
+            try:
+                sink(event)
+            except Exception as e:
+                logger.error("❌ Pipeline sink error: %s", e)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """เริ่ม pipeline ใน background thread"""
+        if self.is_running():
+            return
+        # ใช้ event ใหม่ทุกครั้ง เพื่อให้ thread เก่าที่ยังค้างคำขออยู่หยุดเองโดยไม่ชนกับรอบใหม่
+        self._stop_event = threading.Event()
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, args=(self._stop_event,), name="pipeline", daemon=True)
+        self._thread.start()
+        self._emit({'type': 'status', 'status': 'started'})
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """หยุด pipeline และรอ thread จบ (timeout=0 = ไม่รอ เหมาะกับ UI thread)"""
+        self._stop_event.set()
+        thread = self._thread
+        if timeout and thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout)
+        self._thread = None
+        self._emit({'type': 'status', 'status': 'stopped'})
+
+    def is_running(self) -> bool:
+        """ตรวจสอบว่า pipeline กำลังทำงานหรือไม่"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout: Optional[float] = None):
+        """รอจนกว่า source จะหมด (สำหรับ source ที่มีจุดสิ้นสุด)"""
+        thread = self._thread
+        if thread:
+            thread.join(timeout)
+
+    def _run(self, stop_event: threading.Event):
+        """ลูปหลักของ pipeline"""
+        while not stop_event.is_set():
+            if not self.run_once(stop_event):
+                self._emit({'type': 'status', 'status': 'finished'})
+                break
+
+    # ------------------------------------------------------------------
+    # Stages
+    # ------------------------------------------------------------------
+
+    def run_once(self, stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        ประมวลผลหนึ่งรอบ (อ่าน source หนึ่งครั้ง)
+
+        Returns:
+            bool: False เมื่อ source หมดแล้ว
+        """
+        stop_event = stop_event or self._stop_event
+        try:
+            frames = self.source.read(stop_event)
+        except Exception as e:
+            self.counters['errors'] += 1
+            self._emit({'type': 'error', 'stage': 'capture', 'region': None, 'error': str(e)})
+            return True
+
+        if frames is None:
+            return False
+
+        self.counters['ticks'] += 1
+        if frames and not stop_event.is_set():
+            self.process_frames(frames, stop_event)
+        return True
+
+    def process_frames(self, frames, stop_event: Optional[threading.Event] = None) -> List[Dict]:
+        """ส่งภาพผ่าน OCR และการแปล แล้วคืน event การแปลที่ได้"""
+        self.counters['frames'] += len(frames)
+        frames, plans = self.plan_scroll(frames)
+        if not frames:
+            return []
+        texts = self.run_ocr(frames)
+        if texts is None:
+            return []
+
+        results = []
+        for frame, text in zip(frames, texts):
+            # ถูกสั่งหยุดระหว่างรอ OCR - ทิ้งผลลัพธ์ที่เหลือ
+            if stop_event is not None and stop_event.is_set():
+                break
+
+            event = {
+                'type': 'ocr',
+                'region': frame.name,
+                'text': text,
+                'confidence': 0.9 if text.strip() else 0.0,
+                'captured_at': frame.captured_at,
+            }
+            # ข้อความขยะ (คำตอบปฏิเสธของ model, สัญลักษณ์, ตัวซ้ำ) ถือเป็น OCR ว่าง - ไม่ส่งไปแปล
+            if text.strip():
+                quality = self.quality_gate.check(text)
+                if not quality['accepted']:
+                    self.counters['ocr_rejected'] += 1
+                    event.update(text='', confidence=0.0, rejected=quality['reason'], raw_text=text)
+                    text = ''
+            # พื้นที่ที่เลื่อน: OCR อ่านเฉพาะแถบใหม่ - ประกอบกับบรรทัดเดิมที่ยังเห็นอยู่
+            plan = plans.get(frame.name)
+            if self.scroll_tracker is not None:
+                merged = self.scroll_tracker.commit(frame.name, text, plan)
+                if plan is not None:
+                    event.update(text=merged, confidence=0.9 if merged.strip() else 0.0,
+                                 scroll=plan.shift, new_text=text)
+                    new_text, text = text, merged
+            self._emit(event)
+
+            # ข้อความหายไป - ลืมข้อความเดิม ถ้าข้อความเดิมกลับมาอีกครั้งต้องแปลใหม่ (เป็นช่วง subtitle ใหม่)
+            if 'rejected' in event and plan is None:
+                self.last_text.pop(frame.name, None)
+                continue
+            if not text.strip():
+                self.counters['ocr_empty'] += 1
+                self.last_text.pop(frame.name, None)
+                continue
+            if text == self.last_text.get(frame.name):
+                self.counters['duplicates'] += 1
+                continue
+            self.last_text[frame.name] = text
+
+            if self.auto_translate and self.translator is not None:
+                if plan is not None:
+                    result = self.translate_scrolled(text, new_text, plan, frame.name, frame.captured_at)
+                else:
+                    result = self.translate_text(text, frame.name, frame.captured_at)
+                    if result and self.scroll_tracker is not None:
+                        self.scroll_tracker.set_translation(frame.name, result['translated_text'])
+                if result:
+                    results.append(result)
+        return results
+
+    def plan_scroll(self, frames):
+        """แทนภาพของพื้นที่ที่แค่เลื่อนด้วยแถบที่เลื่อนเข้ามาใหม่ - เลื่อนน้อยเกินไปยังไม่ต้อง OCR
+
+        Returns:
+            tuple: (RegionFrame ที่ต้อง OCR, {ชื่อพื้นที่: ScrollPlan})
+        """
+        if self.scroll_tracker is None:
+            return frames, {}
+        planned, plans = [], {}
+        for frame in frames:
+            plan = self.scroll_tracker.observe(frame.name, frame.image, frame.rect)
+            if plan is None:
+                planned.append(frame)
+            elif plan.image is None:
+                self.counters['scroll_deferred'] += 1
+            else:
+                plans[frame.name] = plan
+                planned.append(RegionFrame(frame.name, plan.image, frame.rect, frame.captured_at, frame.priority))
+        return planned, plans
+
+    def run_ocr(self, frames) -> Optional[List[str]]:
+        """อ่านข้อความจากภาพ - ใช้คำขอเดียวเมื่อมีหลายภาพและ backend รองรับ"""
+        images = [frame.image for frame in frames]
+        try:
+            self.counters['ocr_requests'] += 1
+            if len(images) > 1 and hasattr(self.ocr, 'extract_text_batch'):
+                return self.ocr.extract_text_batch(images)
+            return [self.ocr.extract_text(image) for image in images]
+        except Exception as e:
+            self.counters['errors'] += 1
+            for frame in frames:
+                self.invalidate(frame.name)
+                self._emit({'type': 'error', 'stage': 'ocr', 'region': frame.name, 'error': str(e)})
+            return None
+
+    def translate_text(self, text: str, region: Optional[str] = None,
+                       captured_at: Optional[float] = None) -> Optional[Dict]:
+        """แปลข้อความหนึ่งข้อความและส่ง event 'translation' ไปยัง sinks"""
+        result = self._translate(text, region)
+        if result is None:
+            return None
+        return self._emit_translation(text, result.get('translated_text', ''), result, region, captured_at)
+
+    def translate_scrolled(self, text: str, new_text: str, plan, region: str,
+                           captured_at: Optional[float] = None) -> Optional[Dict]:
+        """แปลเฉพาะข้อความในแถบที่เลื่อนเข้ามาใหม่ แล้วประกอบกับคำแปลเดิมของบรรทัดที่ยังเห็นอยู่"""
+        result = {'translated_text': '', 'confidence': 0.0}
+        if new_text.strip():
+            result = self._translate(new_text, region)
+            if result is None:
+                self.invalidate(region)
+                return None
+
+        translated = self.scroll_tracker.translate_strip(region, plan, result.get('translated_text', ''))
+        if translated is None:
+            # บางบรรทัดที่ยังเห็นอยู่ไม่เคยถูกแปล (เช่น เพิ่งเปิดการแปล) - แปลทั้งพื้นที่
+            event = self.translate_text(text, region, captured_at)
+            if event:
+                self.scroll_tracker.set_translation(region, event['translated_text'])
+            return event
+        return self._emit_translation(text, translated, dict(result, scroll=plan.shift, new_text=new_text),
+                                      region, captured_at)
+
+    def _translate(self, text: str, region: Optional[str]) -> Optional[Dict]:
+        """เรียก translator - ผิดพลาด/ไม่พร้อมใช้งานจะส่ง event 'error' และคืน None"""
+        if self.translator is None:
+            return None
+
+        if hasattr(self.translator, 'is_available') and not self.translator.is_available():
+            self.counters['errors'] += 1
+            self._emit({'type': 'error', 'stage': 'translate', 'region': region,
+                        'error': 'translator not available'})
+            return None
+
+        try:
+            return self.translator.translate(text, self.target_language)
+        except Exception as e:
+            self.counters['errors'] += 1
+            self._emit({'type': 'error', 'stage': 'translate', 'region': region, 'error': str(e)})
+            return None
+
+    def _emit_translation(self, text: str, translated: str, result: Dict, region: Optional[str],
+                          captured_at: Optional[float]) -> Dict:
+        """ส่ง event 'translation' ไปยัง sinks"""
+        self.counters['translations'] += 1
+        event = {
+            'type': 'translation',
+            'region': region,
+            'source_text': text,
+            'translated_text': translated,
+            'detected_language': result.get('detected_language', 'unknown'),
+            'confidence': result.get('confidence', 0.0),
+            'captured_at': captured_at,
+            'result': result,
+        }
+        self._emit(event)
+        return event
+
+    def invalidate(self, region: str):
+        """ให้พื้นที่นี้ถูกอ่านใหม่ในรอบถัดไป"""
+        self.last_text.pop(region, None)
+        if self.scroll_tracker is not None:
+            self.scroll_tracker.reset(region)
+        scheduler = getattr(self.source, 'scheduler', None)
+        if scheduler is not None:
+            scheduler.invalidate(region)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict:
+        """สถิติของ pipeline และ source"""
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        stats = {
+            'running': self.is_running(),
+            'uptime': uptime,
+            **self.counters,
+        }
+        if hasattr(self.quality_gate, 'snapshot'):
+            stats['quality'] = self.quality_gate.snapshot()
+        if self.scroll_tracker is not None:
+            stats['scroll'] = self.scroll_tracker.snapshot()
+        if hasattr(self.source, 'stats'):
+            stats['source'] = self.source.stats()
+        return stats
@@ -0,0 +1,209 @@
+"""
+OCR Quality Gate for Screen Translator
+ให้คะแนนข้อความจาก OCR ก่อนส่งแปล - คัดขยะทิ้งโดยไม่เสียเวลา model แปลภาษา
+
+ตรวจ (ทั้งหมดเป็น string operation ไม่มี I/O):
+- คำตอบปฏิเสธของ vision model ("I cannot read this image", "ไม่พบข้อความ" ฯลฯ)
+- สัดส่วนตัวอักษรเทียบกับสัญลักษณ์ (เช่น "|/_-=~" จากขอบหน้าต่าง)
+- การซ้ำ: ตัวอักษรเดียวยาวเป็นแถว, คำเดียวซ้ำทั้งข้อความ, วนซ้ำเป็นรูปแบบ (บีบอัดได้มากผิดปกติ)
+- ข้อความละติน: สัดส่วนคำที่เป็นคำอังกฤษ (พจนานุกรมคำที่พบบ่อย หรือรูปคำที่อ่านออกเสียงได้)
+"""
+
+import os
+import re
+import sys
+import threading
+import unicodedata
+import zlib
+from typing import Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import QUALITY_CONFIG
+from .vocabulary import ENGLISH_WORDS
+
+REASON_REFUSAL = 'refusal'
+REASON_NO_LETTERS = 'no_letters'
+REASON_SYMBOLS = 'symbols'
+REASON_REPETITION = 'repetition'
+REASON_GIBBERISH = 'gibberish'
+
+# คำตอบปฏิเสธ/อธิบายของ vision model แทนที่จะเป็นข้อความในภาพ - ต้องตรงทั้งคำตอบและพูดถึงภาพ/ข้อความในภาพ
+# (บทพูดในเกมอย่าง "I am sorry for your loss" หรือ "Sorry, I can't help you now" ต้องผ่าน)
+_IMAGE = r"(?:the |this |that |your |provided )?(?:image|picture|screenshot|photo)"
+_REFUSAL_PATTERN = re.compile(
+    r"^\s*(?:(?:i(?:'m| am) )?(?:sorry|apologi[sz]e)[,.!]?\s*|unfortunately,?\s*)?(?:"
+    r"(?:i (?:cannot|can ?not|can't|am unable to|'m unable to|could not|couldn't|was unable to) "
+    r"(?:read|see|extract|identify|make out|find|detect|recognize|process)"
+    r" (?:" + _IMAGE + r"|(?:any |the )?(?:visible |readable |legible )?(?:text|words|characters)"
+    r" (?:in|from|on) " + _IMAGE + r"))"
+    r"|(?:(?:there (?:is|are) )?no (?:visible |readable |legible |discernible )?text"
+    r"(?: (?:is )?(?:visible|found|detected|present))? (?:in|on) " + _IMAGE + r")"
+    r"|(?:" + _IMAGE + r" (?:does not|doesn't|do not|don't) (?:contain|have|show|include) (?:any )?"
+    r"(?:visible |readable |legible )?text)"
+    r"|(?:" + _IMAGE + r" (?:contains no|has no|shows no) (?:visible |readable |legible )?text)"
+    r"|(?:" + _IMAGE + r" (?:is|appears to be|seems to be) (?:blank|empty|too blurry|unreadable|illegible))"
+    r"|(?:(?:unable|impossible) to (?:read|extract|identify) (?:any |the )?text(?: (?:in|from) " + _IMAGE + r")?)"
+    r"|(?:ไม่(?:พบ|มี)ข้อความ(?:ใด ?ๆ)?(?:ใน(?:ภาพ|รูป)(?:นี้)?)?)"
+    r"|(?:ไม่สามารถอ่านข้อความ(?:ใน|จาก)?(?:ภาพ|รูป)?(?:นี้)?(?:ได้)?)"
+    r")(?:[,.;:]\s*[^.!?]{0,80})?[\s.!]*$",
+    re.IGNORECASE,
+)
+
+_WORD_PATTERN = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+# คำที่ออกเสียงได้: ยาว 3 ตัวขึ้นไป มีสระ และไม่มีพยัญชนะติดกันเกิน 4 ตัว
+_PRONOUNCEABLE = re.compile(r"^(?=.*[aeiouy])(?!.*[bcdfghjklmnpqrstvwxz]{5})[a-z]{3,20}$")
+
+
+def _is_word(word: str) -> bool:
+    """คำนี้น่าจะเป็นคำจริงหรือไม่ (ไม่ใช่เศษตัวอักษรจาก OCR เช่น "lI", "rn")"""
+    lower = word.lower()
+    if lower in ENGLISH_WORDS:
+        return True
+    if word.isupper() and len(word) <= 5:
+        return True  # ตัวย่อ
+    return bool(_PRONOUNCEABLE.match(lower)) and (word.islower() or word[1:].islower() or word.isupper())
+
+
+def _char_classes(text: str):
+    """นับ (ตัวอักษร, ตัวเลข, สัญลักษณ์, อักขระที่ไม่ใช่ช่องว่าง, ตัวซ้ำติดกันยาวที่สุด)
+
+    สระ/วรรณยุกต์ไทยเป็น combining mark (หมวด M) จึงนับเป็นตัวอักษรด้วย
+    """
+    letters = digits = symbols = visible = 0
+    longest_run = run = 0
+    previous = ''
+    for ch in text:
+        if ch.isspace():
+            previous = ''
+            run = 0
+            continue
+        visible += 1
+        if ch.isalpha():
+            letters += 1
+        elif ch.isdigit():
+            digits += 1
+        elif unicodedata.category(ch)[0] == 'M':
+            letters += 1
+        else:
+            symbols += 1
+        run = run + 1 if ch == previous else 1
+        previous = ch
+        if run > longest_run:
+            longest_run = run
+    return letters, digits, symbols, visible, longest_run
+
+
+def score_text(text: str) -> Dict:
+    """ให้คะแนนคุณภาพของข้อความ OCR
+
+    Args:
+        text (str): ข้อความจาก OCR
+
+    Returns:
+        dict: {'accepted': bool, 'score': 0..1, 'reason': เหตุผลที่ถูกคัดทิ้ง หรือ None, 'metrics': dict}
+    """
+    config = QUALITY_CONFIG
+    text = (text or '').strip()
+    letters, digits, symbols, visible, longest_run = _char_classes(text)
+    metrics = {'length': visible, 'letter_ratio': 0.0, 'symbol_ratio': 0.0, 'longest_run': longest_run}
+    if not visible:
+        return {'accepted': False, 'score': 0.0, 'reason': REASON_NO_LETTERS, 'metrics': metrics}
+
+    metrics['letter_ratio'] = round(letters / visible, 3)
+    metrics['symbol_ratio'] = round(symbols / visible, 3)
+    scores = {}
+
+    if len(text) <= config['refusal_max_chars'] and _REFUSAL_PATTERN.match(text):
+        scores[REASON_REFUSAL] = 0.0
+    if letters < config['min_letters']:
+        scores[REASON_NO_LETTERS] = 0.0
+    # ตัวอักษรน้อย/สัญลักษณ์มาก ลดคะแนนแบบเส้นตรงจนถึงเกณฑ์ (ไม่นับตัวเลข - "HP 100/100" เป็นข้อความปกติ)
+    if letters:
+        scores[REASON_SYMBOLS] = min(1.0, (letters / (letters + symbols)) / config['min_letter_ratio'],
+                                     (1.0 - symbols / visible) / (1.0 - config['max_symbol_ratio']))
+
+    # การซ้ำ: "aaaaaaa", "ok ok ok ok ok ok", หรือรูปแบบที่วนซ้ำ (model ติดลูป)
+    repetition = 1.0
+    if longest_run >= config['max_char_run']:
+        repetition = 0.0
+    words = text.lower().split()
+    if len(words) >= config['repeat_min_words']:
+        top = max(words.count(word) for word in set(words))
+        metrics['top_word_ratio'] = round(top / len(words), 3)
+        if top / len(words) > config['max_word_repeat']:
+            repetition = 0.0
+    if len(text) >= config['compression_min_chars']:
+        encoded = text.encode('utf-8')
+        ratio = len(zlib.compress(encoded, 1)) / len(encoded)
+        metrics['compression_ratio'] = round(ratio, 3)
+        repetition = min(repetition, ratio / config['min_compression_ratio'])
+    scores[REASON_REPETITION] = min(1.0, repetition)
+
+    # ข้อความละติน ASCII ยาวพอ: วัดสัดส่วนคำที่เป็นคำอังกฤษ, ตัวย่อ (HP, XP) หรืออ่านออกเสียงได้
+    latin_words = _WORD_PATTERN.findall(text) if text.isascii() else []
+    if len(latin_words) >= config['dictionary_min_words'] and sum(map(len, latin_words)) >= 0.5 * letters:
+        hits = sum(1 for word in latin_words if _is_word(word))
+        hit_rate = hits / len(latin_words)
+        metrics['dictionary_hit_rate'] = round(hit_rate, 3)
+        scores[REASON_GIBBERISH] = min(1.0, hit_rate / config['min_dictionary_hit_rate'])
+
+    reason = min(scores, key=scores.get)
+    score = scores[reason]
+    accepted = score >= config['min_score']
+    return {'accepted': accepted, 'score': round(score, 3), 'reason': None if accepted else reason,
+            'metrics': metrics}
+
+
+class QualityGate:
+    """ตัวกรองข้อความ OCR ก่อนแปล พร้อมนับจำนวนที่ถูกคัดทิ้งแยกตามเหตุผล (thread-safe)"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        """
+        Args:
+            enabled (bool): เปิดใช้งานหรือไม่ (None = ค่าจาก config)
+        """
+        self.enabled = QUALITY_CONFIG['enabled'] if enabled is None else enabled
+        self._lock = threading.Lock()
+        self.stats = {'checked': 0, 'rejected': 0, 'reasons': {}}
+
+    def check(self, text: str) -> Dict:
+        """ตรวจข้อความ - ปิดใช้งานอยู่ = ผ่านเสมอ (ยกเว้นข้อความว่าง)"""
+        if not self.enabled:
+            return {'accepted': bool(text and text.strip()), 'score': 1.0, 'reason': None, 'metrics': {}}
+        result = score_text(text)
+        with self._lock:
+            self.stats['checked'] += 1
+            if not result['accepted']:
+                self.stats['rejected'] += 1
+                self.stats['reasons'][result['reason']] = self.stats['reasons'].get(result['reason'], 0) + 1
+        return result
+
+    def snapshot(self) -> Dict:
+        """สถิติ: จำนวนที่ตรวจ, ที่คัดทิ้ง, อัตราคัดทิ้ง และแยกตามเหตุผล"""
+        with self._lock:
+            checked = self.stats['checked']
+            return {
+                'enabled': self.enabled,
+                'checked': checked,
+                'rejected': self.stats['rejected'],
+                'reject_rate': round(self.stats['rejected'] / checked, 3) if checked else 0.0,
+                'reasons': dict(self.stats['reasons']),
+            }
+
+    def reset(self):
+        """ล้างสถิติ"""
+        with self._lock:
+            self.stats = {'checked': 0, 'rejected': 0, 'reasons': {}}
+
+
+_shared_gate: Optional[QualityGate] = None
+_shared_lock = threading.Lock()
+
+
+def get_quality_gate() -> QualityGate:
+    """gate กลางที่ pipeline และ batch ใช้ร่วมกัน"""
+    global _shared_gate
+    with _shared_lock:
+        if _shared_gate is None:
+            _shared_gate = QualityGate()
+        return _shared_gate
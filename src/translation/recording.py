@@ -0,0 +1,306 @@
+"""
+Session recording and replay for Screen Translator
+บันทึกภาพที่จับได้ (ก่อนผ่าน change gate) พร้อมเวลา, ข้อมูลพื้นที่ และผล OCR/คำแปล ลงไฟล์ session
+แล้วเล่นซ้ำผ่าน Pipeline เพื่อเทียบการตั้งค่า change gate, cache และ scheduler บน input ชุดเดียวกัน
+
+รูปแบบไฟล์: MAGIC ตามด้วย record ต่อกัน แต่ละ record คือ
+    [kind 1 byte][header length 4 bytes][payload length 4 bytes][header JSON][payload]
+    kind: S = ข้อมูล session, F = ภาพ (payload = PNG), E = event จาก pipeline
+"""
+
+import io
+import json
+import logging
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import CAPTURE_CONFIG, SCHEDULER_CONFIG
+from .regions import RegionFrame, RegionScheduler
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'STSESSION1\n'
+_RECORD = struct.Struct('>cII')
+
+KIND_SESSION = b'S'
+KIND_FRAME = b'F'
+KIND_EVENT = b'E'
+
+
+def default_session_path() -> str:
+    """ได้ path ของไฟล์ session ใหม่ในโฟลเดอร์ข้อมูลแอป"""
+    from utils.helpers import get_app_data_dir
+    folder = os.path.join(get_app_data_dir(), CAPTURE_CONFIG['session_folder'])
+    return os.path.join(folder, time.strftime('session_%Y%m%d_%H%M%S.stsession'))
+
+
+def read_session(path: str) -> Iterator[Tuple[bytes, Dict, bytes]]:
+    """อ่าน record ทั้งหมดในไฟล์ session
+
+    Yields:
+        tuple: (kind, header dict, payload bytes)
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"ไม่ใช่ไฟล์ session: {path}")
+        while True:
+            prefix = f.read(_RECORD.size)
+            if len(prefix) < _RECORD.size:
+                return  # จบไฟล์ (หรือ record สุดท้ายเขียนไม่ครบเพราะแอปปิดกะทันหัน)
+            kind, header_len, payload_len = _RECORD.unpack(prefix)
+            header = f.read(header_len)
+            payload = f.read(payload_len)
+            if len(header) < header_len or len(payload) < payload_len:
+                return
+            yield kind, json.loads(header.decode('utf-8')), payload
+
+
+def load_session_events(path: str) -> List[Dict]:
+    """โหลดเฉพาะ event (ผล OCR/คำแปล) ที่บันทึกไว้"""
+    return [header for kind, header, _ in read_session(path) if kind == KIND_EVENT]
+
+
+class SessionRecorder:
+    """
+    บันทึก session การจับภาพ - ใช้เป็นทั้งตัวห่อ capture_func ของ RegionScheduler และ sink ของ Pipeline
+
+    การ encode PNG และเขียนไฟล์ทำใน background thread เพื่อไม่ให้ถ่วงรอบการจับภาพ
+    """
+
+    def __init__(self, path: Optional[str] = None, max_pending: int = 32):
+        """
+        Args:
+            path (str): ไฟล์ session (None = สร้างไฟล์ใหม่ในโฟลเดอร์ข้อมูลแอป)
+            max_pending (int): จำนวน record ที่รอเขียนได้สูงสุด (เกินนี้ภาพจะถูกข้ามและนับเป็น dropped)
+        """
+        self.path = path or default_session_path()
+        self.started_at = time.monotonic()
+        self.stats = {'frames': 0, 'events': 0, 'dropped': 0, 'bytes': len(MAGIC)}
+        self._scheduler = None
+        self._original_capture = None
+        self._last_regions = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_pending)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, 'wb')
+        self._file.write(MAGIC)
+        self._writer = threading.Thread(target=self._write_loop, name="session-writer", daemon=True)
+        self._writer.start()
+
+        self._enqueue(KIND_SESSION, {
+            'version': 1,
+            'created_at': time.time(),
+            'scheduler': dict(SCHEDULER_CONFIG),
+        }, block=True)
+
+    def _elapsed(self, timestamp: Optional[float] = None) -> float:
+        """เวลาตั้งแต่เริ่ม session (วินาที)"""
+        return round((time.monotonic() if timestamp is None else timestamp) - self.started_at, 4)
+
+    def _enqueue(self, kind: bytes, header: Dict, payload=None, block: bool = False) -> bool:
+        """ส่ง record ให้ writer thread (payload อาจเป็น PIL.Image ที่จะ encode ทีหลัง)"""
+        if self._closed:
+            return False
+        try:
+            self._queue.put((kind, header, payload), block=block, timeout=1.0 if block else None)
+            return True
+        except queue.Full:
+            self.stats['dropped'] += 1
+            return False
+
+    def _write_loop(self):
+        """encode และเขียน record ตามลำดับ"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            kind, header, payload = item
+            try:
+                if payload is None:
+                    data = b''
+                elif isinstance(payload, bytes):
+                    data = payload
+                else:
+                    buffer = io.BytesIO()
+                    payload.save(buffer, format='PNG')
+                    data = buffer.getvalue()
+                header_bytes = json.dumps(header, ensure_ascii=False, default=str).encode('utf-8')
+                self._file.write(_RECORD.pack(kind, len(header_bytes), len(data)))
+                self._file.write(header_bytes)
+                self._file.write(data)
+                self.stats['bytes'] += _RECORD.size + len(header_bytes) + len(data)
+            except Exception as e:
+                logger.error("❌ ไม่สามารถบันทึก session: %s", e)
+
+    def _region_snapshot(self) -> List[Dict]:
+        """ค่าของทุกพื้นที่ใน scheduler ที่ผูกไว้"""
+        return [
+            {'name': r.name, 'rect': list(r.rect), 'interval_ms': r.interval_ms,
+             'priority': r.priority, 'enabled': r.enabled}
+            for r in self._scheduler.regions.values()
+        ]
+
+    def attach(self, scheduler: RegionScheduler):
+        """ห่อ capture_func ของ scheduler ให้บันทึกทุกภาพที่จับได้"""
+        self._scheduler = scheduler
+        self._original_capture = scheduler.capture_func
+        scheduler.capture_func = self.wrap_capture(scheduler.capture_func)
+
+    def detach(self):
+        """คืน capture_func เดิมให้ scheduler"""
+        if self._scheduler is not None:
+            self._scheduler.capture_func = self._original_capture
+            self._scheduler = None
+
+    def wrap_capture(self, capture_func: Callable) -> Callable:
+        """คืน capture_func ที่บันทึกภาพก่อนส่งต่อ"""
+        def capture(rect):
+            image = capture_func(rect)
+            if image is not None:
+                self.record_frame(rect, image)
+            return image
+        return capture
+
+    def record_frame(self, rect, image, timestamp: Optional[float] = None):
+        """บันทึกภาพหนึ่งภาพพร้อมตำแหน่งบนจอ (ข้อมูลพื้นที่บันทึกเฉพาะเมื่อเปลี่ยน)"""
+        header = {'t': self._elapsed(timestamp), 'rect': list(rect)}
+        with self._lock:
+            if self._scheduler is not None:
+                regions = self._region_snapshot()
+                if regions != self._last_regions:
+                    header['regions'] = self._last_regions = regions
+        if self._enqueue(KIND_FRAME, header, image):
+            self.stats['frames'] += 1
+
+    def __call__(self, event: Dict):
+        """รับ event จาก pipeline (ใช้เป็น sink)"""
+        if event.get('type') not in ('ocr', 'translation', 'error'):
+            return
+        header = dict(event, t=self._elapsed())
+        if isinstance(header.get('captured_at'), float) and header['captured_at'] > self.started_at:
+            header['captured_at'] = self._elapsed(header['captured_at'])
+        if self._enqueue(KIND_EVENT, header, block=True):
+            self.stats['events'] += 1
+
+    def close(self) -> Dict:
+        """หยุดบันทึก เขียนข้อมูลที่ค้างอยู่ และปิดไฟล์
+
+        Returns:
+            dict: สถิติการบันทึก
+        """
+        with self._lock:
+            if self._closed:
+                return dict(self.stats)
+            self.detach()
+            self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        self._file.close()
+        return dict(self.stats, path=self.path)
+
+
+class ReplaySource:
+    """
+    Source ที่เล่นภาพจากไฟล์ session ผ่าน RegionScheduler ตัวใหม่
+
+    scheduler ทำงานด้วยเวลาเสมือนตามเวลาที่บันทึกไว้ จึงเทียบ change gate และ interval ได้บน input เดียวกัน
+    (interval ที่สั้นกว่าตอนบันทึกจะไม่ได้ภาพเพิ่ม เพราะมีเฉพาะภาพที่บันทึกไว้ - แต่ละภาพครอบเฉพาะพื้นที่
+    ที่ครบกำหนดตอนบันทึก พื้นที่ที่อยู่นอกภาพจึงรอจนกว่าจะมีภาพที่ครอบถึง)
+
+    RegionFrame.captured_at ของ source นี้คือวินาทีนับจากเริ่ม session
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = 1.0, interval_ms: Optional[int] = None,
+                 change_threshold: Optional[float] = None, **scheduler_kwargs):
+        """
+        Args:
+            path (str): ไฟล์ session
+            speed (float): ความเร็วการเล่น (1.0 = เท่าตอนบันทึก, None = เร็วที่สุด)
+            interval_ms (int): แทนที่ interval ของทุกพื้นที่ (None = ใช้ค่าที่บันทึกไว้)
+            change_threshold (float): แทนที่ threshold ของ change gate (None = ใช้ค่าจาก config)
+            **scheduler_kwargs: ส่งต่อให้ RegionScheduler (เช่น max_dispatch_per_tick)
+        """
+        self.path = path
+        self.speed = speed
+        self.interval_ms = interval_ms
+        self.change_threshold = change_threshold
+        self.scheduler = RegionScheduler(self._capture, **scheduler_kwargs)
+        self.frames_replayed = 0
+        self._records = (r for r in read_session(path) if r[0] == KIND_FRAME)
+        self._frame = None
+        self._frame_rect = None
+        self._virtual_base = None
+        self._wall_start = None
+
+    def _capture(self, rect):
+        """ตัดส่วนที่ scheduler ขอจากภาพที่กำลังเล่นอยู่"""
+        if self._frame is None:
+            return None
+        x, y, width, height = rect
+        fx, fy = self._frame_rect[0], self._frame_rect[1]
+        return self._frame.crop((x - fx, y - fy, x - fx + width, y - fy + height))
+
+    def _apply_regions(self, regions: List[Dict]):
+        """ปรับพื้นที่ใน scheduler ตามที่บันทึกไว้"""
+        names = {r['name'] for r in regions}
+        for name in self.scheduler.region_names():
+            if name not in names:
+                self.scheduler.remove_region(name)
+        for r in regions:
+            existing = self.scheduler.get_region(r['name'])
+            if existing is None:
+                self.scheduler.add_region(
+                    r['name'], tuple(r['rect']),
+                    interval_ms=self.interval_ms if self.interval_ms is not None else r['interval_ms'],
+                    priority=r['priority'], change_threshold=self.change_threshold)
+            else:
+                self.scheduler.update_region(r['name'], rect=tuple(r['rect']), priority=r['priority'])
+            self.scheduler.get_region(r['name']).enabled = r.get('enabled', True)
+
+    def read(self, stop_event: Optional[threading.Event] = None) -> Optional[List[RegionFrame]]:
+        """เล่นภาพถัดไปหนึ่งภาพ คืนรายการ RegionFrame ที่ผ่าน change gate หรือ None เมื่อหมด"""
+        from PIL import Image
+
+        record = next(self._records, None)
+        if record is None:
+            return None
+        _, header, payload = record
+
+        if self._virtual_base is None:
+            self._virtual_base = time.monotonic()
+            self._wall_start = time.monotonic() - header['t'] / (self.speed or 1.0)
+
+        if self.speed:
+            delay = self._wall_start + header['t'] / self.speed - time.monotonic()
+            if delay > 0:
+                if stop_event is not None:
+                    if stop_event.wait(delay):
+                        return []
+                else:
+                    time.sleep(delay)
+
+        if 'regions' in header:
+            self._apply_regions(header['regions'])
+
+        with Image.open(io.BytesIO(payload)) as image:
+            self._frame = image.convert('RGB')
+        self._frame_rect = tuple(header['rect'])
+        self.frames_replayed += 1
+
+        # ภาพที่บันทึกครอบเฉพาะพื้นที่ที่ครบกำหนดตอนบันทึก - พื้นที่นอกภาพรอภาพถัดไปที่ครอบถึง
+        frames = self.scheduler.tick(now=self._virtual_base + header['t'], bounds=self._frame_rect)
+        for frame in frames:
+            frame.captured_at = frame.captured_at - self._virtual_base
+        return frames
+
+    def stats(self) -> Dict:
+        """สถิติของ source"""
+        return dict(self.scheduler.stats(), frames_replayed=self.frames_replayed)
@@ -0,0 +1,290 @@
+"""
+Region Scheduler Module for Screen Translator
+จัดการพื้นที่ตรวจจับหลายพื้นที่ (named regions) ด้วยการจับภาพหน้าจอครั้งเดียวต่อรอบ
+แล้วตัดภาพแต่ละพื้นที่ส่งต่อไปยัง OCR/การแปลอย่างเป็นธรรมตามลำดับความสำคัญ
+
+พื้นที่ที่เปลี่ยนจะถูกจับภาพซ้ำถี่ขึ้นจนกว่าภาพจะนิ่ง (StabilityGate) แล้วจึงส่งภาพที่นิ่งแล้วไป OCR
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import SCHEDULER_CONFIG, STABILITY_CONFIG
+from .change_detection import ChangeGate, StabilityGate
+
+
+class CaptureRegion:
+    """พื้นที่ตรวจจับหนึ่งพื้นที่ พร้อมระยะเวลาจับภาพ ลำดับความสำคัญ และ change gate ของตัวเอง"""
+
+    def __init__(self, name: str, rect: Tuple[int, int, int, int], interval_ms: int = 5000,
+                 priority: int = 0, change_threshold: Optional[float] = None):
+        """
+        Args:
+            name (str): ชื่อพื้นที่ เช่น 'subtitle', 'chat'
+            rect (tuple): (x, y, width, height)
+            interval_ms (int): ระยะเวลาจับภาพของพื้นที่นี้ (milliseconds)
+            priority (int): ลำดับความสำคัญ (ยิ่งมากยิ่งได้ก่อน)
+            change_threshold (float): threshold ของ change gate (None = ใช้ค่าจาก config)
+        """
+        self.name = name
+        self.rect = tuple(int(v) for v in rect)
+        self.interval_ms = int(interval_ms)
+        self.priority = int(priority)
+        self.change_gate = ChangeGate(
+            threshold=SCHEDULER_CONFIG['change_threshold'] if change_threshold is None else change_threshold,
+            fingerprint_size=SCHEDULER_CONFIG['fingerprint_size']
+        )
+        self.stability = StabilityGate(
+            settle_ticks=STABILITY_CONFIG['settle_ticks'],
+            settle_ms=STABILITY_CONFIG['settle_ms'],
+            max_wait_ms=STABILITY_CONFIG['max_wait_ms'],
+            threshold=STABILITY_CONFIG['threshold'],
+            history=STABILITY_CONFIG['history']
+        ) if STABILITY_CONFIG['enabled'] else None
+        self.enabled = True
+
+        # สถานะการจัดคิว
+        self.next_due = 0.0
+        self.pending_image = None
+        self.pending_since = None
+        self.settling = False  # เปลี่ยนแล้ว กำลังรอให้ภาพนิ่ง
+
+        self.stats = {
+            'captures': 0,
+            'changes': 0,
+            'unchanged': 0,
+            'dispatched': 0,
+            'settling': 0,
+            'settle_forced': 0,
+        }
+
+    def set_rect(self, rect: Tuple[int, int, int, int]):
+        """เปลี่ยนตำแหน่ง/ขนาดพื้นที่ และบังคับให้จับภาพใหม่ทันที"""
+        rect = tuple(int(v) for v in rect)
+        if rect != self.rect:
+            self.rect = rect
+            self.change_gate.reset()
+            self.reset_stability()
+            self.pending_image = None
+            self.pending_since = None
+            self.next_due = 0.0
+
+    def reset_stability(self):
+        """เลิกรอภาพนิ่ง"""
+        self.settling = False
+        if self.stability is not None:
+            self.stability.reset()
+
+
+class RegionFrame:
+    """ภาพของพื้นที่หนึ่งที่พร้อมส่งต่อไปยัง OCR"""
+
+    def __init__(self, name: str, image, rect: Tuple[int, int, int, int], captured_at: float, priority: int = 0):
+        self.name = name
+        self.image = image
+        self.rect = rect
+        self.captured_at = captured_at
+        self.priority = priority
+
+
+def _contains(outer: Tuple[int, int, int, int], inner: Tuple[int, int, int, int]) -> bool:
+    """กรอบ inner อยู่ใน outer ทั้งหมดหรือไม่ (x, y, width, height)"""
+    return (outer[0] <= inner[0] and outer[1] <= inner[1]
+            and inner[0] + inner[2] <= outer[0] + outer[2] and inner[1] + inner[3] <= outer[1] + outer[3])
+
+
+class RegionScheduler:
+    """Scheduler กลางสำหรับทุกพื้นที่ - จับภาพครั้งเดียวต่อรอบ ไม่ว่าจะมีกี่พื้นที่"""
+
+    def __init__(self, capture_func: Callable, max_dispatch_per_tick: Optional[int] = None,
+                 aging_per_second: Optional[float] = None):
+        """
+        Args:
+            capture_func (callable): ฟังก์ชันจับภาพ รับ (x, y, width, height) คืน PIL.Image
+            max_dispatch_per_tick (int): จำนวนพื้นที่สูงสุดที่ส่งต่อได้ต่อรอบ (None = ใช้ค่าจาก config)
+            aging_per_second (float): คะแนนความสำคัญที่เพิ่มขึ้นต่อวินาทีที่รอ เพื่อไม่ให้พื้นที่ใดถูกทิ้ง
+        """
+        self.capture_func = capture_func
+        self.max_dispatch_per_tick = (SCHEDULER_CONFIG['max_dispatch_per_tick']
+                                      if max_dispatch_per_tick is None else max_dispatch_per_tick)
+        self.aging_per_second = (SCHEDULER_CONFIG['aging_per_second']
+                                 if aging_per_second is None else aging_per_second)
+        self.regions: Dict[str, CaptureRegion] = {}
+        # UI thread แก้ไขพื้นที่ขณะที่ pipeline thread เรียก tick()
+        self._lock = threading.RLock()
+        self.paused = False
+        self.stats_data = {
+            'ticks': 0,
+            'screen_captures': 0,
+            'capture_failures': 0,
+            'paused_ticks': 0,
+        }
+
+    def add_region(self, name: str, rect: Tuple[int, int, int, int], interval_ms: int = 5000,
+                   priority: int = 0, change_threshold: Optional[float] = None) -> CaptureRegion:
+        """เพิ่ม (หรือแทนที่) พื้นที่ตรวจจับ"""
+        region = CaptureRegion(name, rect, interval_ms, priority, change_threshold)
+        with self._lock:
+            self.regions[name] = region
+        return region
+
+    def remove_region(self, name: str):
+        """ลบพื้นที่ตรวจจับ"""
+        with self._lock:
+            self.regions.pop(name, None)
+
+    def get_region(self, name: str) -> Optional[CaptureRegion]:
+        """ได้พื้นที่ตามชื่อ"""
+        return self.regions.get(name)
+
+    def region_names(self) -> List[str]:
+        """รายชื่อพื้นที่ทั้งหมดตามลำดับที่เพิ่ม"""
+        with self._lock:
+            return list(self.regions.keys())
+
+    def update_region(self, name: str, rect: Optional[Tuple[int, int, int, int]] = None,
+                      interval_ms: Optional[int] = None, priority: Optional[int] = None):
+        """อัปเดตค่าของพื้นที่ที่มีอยู่"""
+        with self._lock:
+            region = self.regions.get(name)
+            if region is None:
+                return
+            if rect is not None:
+                region.set_rect(rect)
+            if interval_ms is not None:
+                region.interval_ms = int(interval_ms)
+                region.next_due = min(region.next_due, time.monotonic() + region.interval_ms / 1000.0)
+            if priority is not None:
+                region.priority = int(priority)
+
+    def pause(self):
+        """หยุดจับภาพชั่วคราว (เช่น ระหว่างผู้ใช้ลาก/ปรับขนาดพื้นที่ - ภาพระหว่างทางไม่มีประโยชน์)"""
+        with self._lock:
+            self.paused = True
+
+    def resume(self):
+        """กลับมาจับภาพ - พื้นที่ที่ถูกย้ายระหว่างหยุดจะถูกจับภาพใหม่ทันที"""
+        with self._lock:
+            self.paused = False
+
+    def invalidate(self, name: str):
+        """บังคับให้พื้นที่ผ่าน change gate ในรอบถัดไป (เช่น เมื่อ OCR ล้มเหลว)"""
+        with self._lock:
+            region = self.regions.get(name)
+            if region:
+                region.change_gate.reset()
+                region.reset_stability()
+                region.next_due = 0.0
+
+    def next_due_in_ms(self, now: Optional[float] = None) -> int:
+        """เวลาที่เหลือจนถึงรอบถัดไปที่มีพื้นที่ครบกำหนด (milliseconds)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self.paused:
+                return SCHEDULER_CONFIG['paused_tick_ms']
+            active = [r for r in self.regions.values() if r.enabled]
+        if not active:
+            return SCHEDULER_CONFIG['idle_tick_ms']
+        if any(r.pending_image is not None for r in active):
+            return 0
+        return max(0, int((min(r.next_due for r in active) - now) * 1000))
+
+    def tick(self, now: Optional[float] = None,
+             bounds: Optional[Tuple[int, int, int, int]] = None) -> List[RegionFrame]:
+        """
+        จับภาพหนึ่งรอบ - ถ่ายภาพครั้งเดียวครอบทุกพื้นที่ที่ครบกำหนด แล้วตัดแยกทีละพื้นที่
+
+        Args:
+            now (float): เวลาปัจจุบัน (None = time.monotonic())
+            bounds (tuple): จับเฉพาะพื้นที่ที่อยู่ในกรอบนี้ทั้งหมด - พื้นที่อื่นยังครบกำหนดอยู่ (None = ทั้งจอ)
+
+        Returns:
+            list: RegionFrame ที่ควรส่ง OCR เรียงตามลำดับที่ควรประมวลผล
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.stats_data['ticks'] += 1
+            if self.paused:
+                self.stats_data['paused_ticks'] += 1
+                return []
+
+            due = [r for r in self.regions.values()
+                   if r.enabled and now >= r.next_due and r.rect[2] > 0 and r.rect[3] > 0
+                   and (bounds is None or _contains(bounds, r.rect))]
+
+            if due:
+                self._capture_due_regions(due, now)
+
+            return self._dispatch(now)
+
+    def _capture_due_regions(self, due: List[CaptureRegion], now: float):
+        """จับภาพครั้งเดียวครอบพื้นที่ที่ครบกำหนด แล้วส่งแต่ละส่วนผ่าน change gate"""
+        left = min(r.rect[0] for r in due)
+        top = min(r.rect[1] for r in due)
+        right = max(r.rect[0] + r.rect[2] for r in due)
+        bottom = max(r.rect[1] + r.rect[3] for r in due)
+
+        screenshot = self.capture_func((left, top, right - left, bottom - top))
+        self.stats_data['screen_captures'] += 1
+
+        for region in due:
+            region.next_due = now + region.interval_ms / 1000.0
+
+        if screenshot is None:
+            self.stats_data['capture_failures'] += 1
+            return
+
+        for region in due:
+            x, y, width, height = region.rect
+            crop = screenshot.crop((x - left, y - top, x - left + width, y - top + height))
+            region.stats['captures'] += 1
+
+            changed = region.change_gate.check(crop)
+            if region.stability is not None and (changed or region.settling):
+                # รอภาพนิ่ง: จับซ้ำเร็วขึ้นจนกว่าจะนิ่ง (หรือรอครบ max_wait_ms) แล้วส่งภาพล่าสุด
+                region.settling = True
+                if not region.stability.observe(region.change_gate.current_fingerprint, now):
+                    region.stats['settling'] += 1
+                    region.next_due = min(region.next_due, now + STABILITY_CONFIG['settle_interval_ms'] / 1000.0)
+                    continue
+                if region.stability.forced:
+                    region.stats['settle_forced'] += 1
+                region.reset_stability()
+                changed = True
+
+            if changed:
+                region.stats['changes'] += 1
+                region.pending_image = crop
+                if region.pending_since is None:
+                    region.pending_since = now
+            else:
+                region.stats['unchanged'] += 1
+
+    def _dispatch(self, now: float) -> List[RegionFrame]:
+        """เลือกพื้นที่ที่รออยู่ตามคะแนน (priority + เวลาที่รอ) เพื่อความเป็นธรรม"""
+        pending = [r for r in self.regions.values() if r.enabled and r.pending_image is not None]
+        pending.sort(key=lambda r: r.priority + (now - r.pending_since) * self.aging_per_second,
+                     reverse=True)
+
+        if self.max_dispatch_per_tick:
+            pending = pending[:self.max_dispatch_per_tick]
+
+        frames = []
+        for region in pending:
+            frames.append(RegionFrame(region.name, region.pending_image, region.rect, now, region.priority))
+            region.pending_image = None
+            region.pending_since = None
+            region.stats['dispatched'] += 1
+        return frames
+
+    def stats(self) -> Dict:
+        """สถิติของ scheduler และแต่ละพื้นที่"""
+        with self._lock:
+            return {
+                **self.stats_data,
+                'regions': {name: dict(region.stats) for name, region in self.regions.items()},
+            }
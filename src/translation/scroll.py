@@ -0,0 +1,353 @@
+"""
+Scroll Detection Module for Screen Translator
+ตรวจการเลื่อน (scroll) แนวตั้งระหว่างเฟรมของพื้นที่เดียวกันด้วยการจับคู่ hash ของแต่ละแถว pixel
+เมื่อเนื้อหาแค่เลื่อน ใช้บรรทัดที่อ่าน/แปลไว้แล้วต่อ และส่ง OCR/แปลเฉพาะแถบที่เลื่อนเข้ามาใหม่
+
+ภาพหน้าจอไม่ถูกบีบอัด การเลื่อนจึงย้ายแถว pixel ไปทั้งแถวโดยไม่เปลี่ยนค่า - เก็บแค่ hash ต่อแถวของเฟรมอ้างอิง
+ข้อความของแต่ละพื้นที่เก็บเป็น segment ตามแนวตั้ง (ช่วง pixel ในพื้นที่ + บรรทัดต้นฉบับ + บรรทัดคำแปล)
+"""
+
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import SCROLL_CONFIG
+
+
+def _gray(image):
+    """PIL.Image -> numpy uint8 grayscale"""
+    import numpy as np
+    return np.asarray(image.convert('L'))
+
+
+def row_hashes(gray) -> List[Optional[int]]:
+    """hash ของแต่ละแถว (None = แถวว่าง คือค่าสว่างต่างกันไม่เกิน blank_row_range - แถวว่างเหมือนกันหมดจึงไม่ใช้จับคู่)"""
+    ink = (gray.max(axis=1) - gray.min(axis=1)) > SCROLL_CONFIG['blank_row_range']
+    return [hash(row.tobytes()) if has_ink else None for row, has_ink in zip(gray, ink)]
+
+
+def estimate_vertical_shift(previous: List[Optional[int]], current: List[Optional[int]]) -> Optional[int]:
+    """
+    หาระยะที่เนื้อหาเลื่อนแนวตั้งจาก previous ไป current
+
+    Args:
+        previous, current: row_hashes() ของสองเฟรมที่สูงเท่ากัน
+
+    Returns:
+        int: pixel ที่เนื้อหาเลื่อนขึ้น (+ = scroll ลง, - = scroll ขึ้น, 0 = ไม่เลื่อน)
+             หรือ None ถ้าไม่ใช่การเลื่อนแนวตั้งล้วน (เนื้อหาเปลี่ยน, เลื่อนแนวนอน ฯลฯ)
+    """
+    config = SCROLL_CONFIG
+    height = len(previous)
+    if height != len(current):
+        return None
+
+    positions: Dict[int, List[int]] = {}
+    for y, row in enumerate(previous):
+        if row is not None:
+            positions.setdefault(row, []).append(y)
+    # แต่ละแถวที่ตรงกันโหวตระยะเลื่อน - แถวที่ซ้ำกันมาก (เส้นคั่น, พื้นหลังลาย) ไม่ได้บอกตำแหน่ง
+    votes = Counter()
+    for y, row in enumerate(current):
+        matches = positions.get(row, ()) if row is not None else ()
+        if 0 < len(matches) <= 4:
+            votes.update(match - y for match in matches)
+    if not votes:
+        return None
+    shift, count = votes.most_common(1)[0]
+    if count < config['min_matched_rows']:
+        return None
+
+    # ยืนยันด้วยส่วนที่ซ้อนกันทั้งหมด - ข้อความใหม่แม้คำเดียวทำให้บางแถวไม่ตรง
+    compared = mismatched = 0
+    for y in range(max(0, -shift), min(height, height - shift)):
+        old, new = previous[y + shift], current[y]
+        if old is None and new is None:
+            continue
+        compared += 1
+        mismatched += old != new
+    if not compared or mismatched > compared * config['max_mismatch_ratio']:
+        return None
+    return shift
+
+
+def _cut(lines: Optional[List[str]], start: float, end: float) -> Optional[List[str]]:
+    """เก็บบรรทัดในช่วงสัดส่วน [start, end) ของ segment (บรรทัดที่หายไปเกินครึ่งถูกตัด)"""
+    if lines is None:
+        return None
+    count = len(lines)
+    return lines[int(round(count * start)):int(round(count * end))]
+
+
+def _lines(text: str) -> List[str]:
+    return [line for line in (text or '').splitlines() if line.strip()]
+
+
+def _text_rows(hashes: List[Optional[int]], top: int, bottom: int) -> List[Tuple[int, int]]:
+    """ช่วงแถวที่มีตัวอักษร (บรรทัด) ระหว่าง top ถึง bottom คั่นด้วยแถวว่าง"""
+    rows, start = [], None
+    for y in range(top, bottom):
+        if hashes[y] is not None and start is None:
+            start = y
+        elif hashes[y] is None and start is not None:
+            rows.append((start, y))
+            start = None
+    if start is not None:
+        rows.append((start, bottom))
+    return rows
+
+
+class _Segment:
+    """ข้อความที่อ่านได้จากช่วงแนวตั้งหนึ่งของพื้นที่
+
+    ถ้าจำนวนแถบบรรทัดในภาพเท่ากับจำนวนบรรทัดที่ OCR อ่านได้ จะรู้ตำแหน่งของแต่ละบรรทัด (rows)
+    และตัดได้ตรงบรรทัด - ไม่เท่ากันจะตัดตามสัดส่วนความสูงแทน
+    """
+
+    __slots__ = ('top', 'bottom', 'source', 'translation', 'rows')
+
+    def __init__(self, top, bottom, source, translation=None, rows=None):
+        self.top = top
+        self.bottom = bottom
+        self.source = source  # บรรทัดต้นฉบับ
+        self.translation = translation  # บรรทัดคำแปล (None = ยังไม่ได้แปล)
+        self.rows = rows if rows is not None and len(rows) == len(source) else None
+
+    def move(self, delta: int):
+        """เลื่อนตามเนื้อหา (delta < 0 = ขึ้น)"""
+        self.top += delta
+        self.bottom += delta
+        if self.rows is not None:
+            self.rows = [(start + delta, end + delta) for start, end in self.rows]
+
+    def trim(self, low: int, high: int) -> bool:
+        """ตัดส่วนที่อยู่นอกช่วง [low, high) - คืน False ถ้าไม่เหลือบรรทัด"""
+        height = self.bottom - self.top
+        if height <= 0 or self.bottom <= low or self.top >= high:
+            return False
+        if self.top >= low and self.bottom <= high:
+            return bool(self.source)
+
+        count = len(self.source)
+        if self.rows is not None:
+            # เก็บบรรทัดที่เห็นเกินครึ่ง (กึ่งกลางบรรทัดอยู่ในช่วง)
+            visible = [i for i, (start, end) in enumerate(self.rows) if low <= (start + end) / 2 < high]
+            first, last = (visible[0], visible[-1] + 1) if visible else (0, 0)
+            self.rows = self.rows[first:last]
+        else:
+            first = int(round(count * max(0, low - self.top) / height))
+            last = count - int(round(count * max(0, self.bottom - high) / height))
+        if self.translation is not None and len(self.translation) == count:
+            self.translation = self.translation[first:last]
+        elif count:
+            self.translation = _cut(self.translation, first / count, last / count)
+        self.source = self.source[first:last]
+        self.top, self.bottom = max(self.top, low), min(self.bottom, high)
+        return bool(self.source)
+
+    def drop_line(self, index: int):
+        """ลบบรรทัดที่ซ้ำกับ segment ข้างเคียง"""
+        count = len(self.source)
+        if self.translation is not None and len(self.translation) == count:
+            del self.translation[index]
+        if self.rows is not None:
+            del self.rows[index]
+        del self.source[index]
+
+
+class ScrollPlan:
+    """ผลการตรวจเฟรมที่เลื่อน: ระยะเลื่อนและแถบใหม่ที่ต้อง OCR (image=None = เลื่อนน้อยเกินไป ยังไม่ต้องอ่าน)"""
+
+    __slots__ = ('shift', 'top', 'bottom', 'image')
+
+    def __init__(self, shift, top=0, bottom=0, image=None):
+        self.shift = shift
+        self.top = top
+        self.bottom = bottom
+        self.image = image
+
+
+class _RegionState:
+    __slots__ = ('rect', 'reference', 'candidate', 'segments')
+
+    def __init__(self, rect):
+        self.rect = rect
+        self.reference = None  # row_hashes ของเฟรมที่ segments ปัจจุบันอ้างอิงตำแหน่ง
+        self.candidate = None  # row_hashes ของเฟรมที่กำลังรอผล OCR
+        self.segments: List[_Segment] = []
+
+
+class ScrollTracker:
+    """ติดตามการเลื่อนของแต่ละพื้นที่ และประกอบข้อความ/คำแปลจาก segment ที่ยังมองเห็น (thread-safe)"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        """
+        Args:
+            enabled (bool): เปิดใช้งานหรือไม่ (None = ค่าจาก config)
+        """
+        self.enabled = SCROLL_CONFIG['enabled'] if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._regions: Dict[str, _RegionState] = {}
+        self.stats = {'frames': 0, 'scrolls': 0, 'deferred': 0, 'rows_total': 0, 'rows_read': 0}
+
+    def observe(self, name: str, image, rect) -> Optional[ScrollPlan]:
+        """
+        ตรวจเฟรมใหม่ของพื้นที่เทียบกับเฟรมที่อ่านล่าสุด
+
+        Args:
+            name (str): ชื่อพื้นที่
+            image (PIL.Image): ภาพของพื้นที่
+            rect (tuple): ตำแหน่งของพื้นที่ (ย้าย/ปรับขนาดแล้ว = เริ่มใหม่)
+
+        Returns:
+            ScrollPlan: เมื่อเนื้อหาแค่เลื่อน หรือ None = ต้องอ่านทั้งพื้นที่
+        """
+        if not self.enabled or image is None:
+            return None
+        current = row_hashes(_gray(image))
+        height = len(current)
+        with self._lock:
+            state = self._regions.get(name)
+            if state is None or state.rect != tuple(rect):
+                state = self._regions[name] = _RegionState(tuple(rect))
+            state.candidate = current
+            reference = state.reference
+            self.stats['frames'] += 1
+            self.stats['rows_total'] += height
+
+        if reference is None:
+            self._count_rows(height)
+            return None
+        shift = estimate_vertical_shift(reference, current)
+        if not shift or abs(shift) > height * SCROLL_CONFIG['max_shift_ratio']:
+            self._count_rows(height)
+            return None
+
+        if abs(shift) < SCROLL_CONFIG['min_shift_px']:
+            with self._lock:
+                self.stats['deferred'] += 1
+            return ScrollPlan(shift)
+
+        if shift > 0:
+            top, bottom = self._blank_row(current, height - shift, -1), height
+        else:
+            top, bottom = 0, self._blank_row(current, -shift, 1)
+        with self._lock:
+            self.stats['scrolls'] += 1
+        self._count_rows(bottom - top)
+        return ScrollPlan(shift, top, bottom, image.crop((0, top, image.width, bottom)))
+
+    def _count_rows(self, rows: int):
+        with self._lock:
+            self.stats['rows_read'] += rows
+
+    @staticmethod
+    def _blank_row(hashes: List[Optional[int]], start: int, step: int) -> int:
+        """หาแถวว่างระหว่างบรรทัดที่ใกล้ขอบแถบใหม่ที่สุด (ขยายออกไม่เกิน strip_margin_px)"""
+        for offset in range(SCROLL_CONFIG['strip_margin_px'] + 1):
+            row = start + offset * step
+            if row < 0 or row >= len(hashes):
+                break
+            if hashes[row] is None:
+                return row
+        return start
+
+    def commit(self, name: str, text: str, plan: Optional[ScrollPlan] = None) -> str:
+        """
+        บันทึกผล OCR ของเฟรมที่ observe ล่าสุด
+
+        Args:
+            name (str): ชื่อพื้นที่
+            text (str): ข้อความของทั้งพื้นที่ (plan=None) หรือของแถบใหม่
+            plan (ScrollPlan): แผนจาก observe()
+
+        Returns:
+            str: ข้อความของทั้งพื้นที่ (segment ที่ยังเห็น + แถบใหม่)
+        """
+        with self._lock:
+            state = self._regions.get(name)
+            if state is None or state.candidate is None:
+                return text
+            current = state.candidate
+            height = len(current)
+            if plan is None or plan.image is None:
+                if plan is None:
+                    state.segments = [_Segment(0, height, _lines(text), rows=_text_rows(current, 0, height))]
+                    state.reference = current
+                return self._source_text(state)
+
+            # เลื่อน segment เดิมตามเนื้อหา แล้วตัดส่วนที่พ้นพื้นที่หรือทับแถบใหม่
+            low, high = (0, plan.top) if plan.shift > 0 else (plan.bottom, height)
+            kept = []
+            for segment in state.segments:
+                segment.move(-plan.shift)
+                if segment.trim(low, high):
+                    kept.append(segment)
+            strip = _Segment(plan.top, plan.bottom, _lines(text), rows=_text_rows(current, plan.top, plan.bottom))
+            # บรรทัดที่ขอบแถบใหม่ซึ่งอ่านไว้แล้ว (เห็นบางส่วนในเฟรมก่อน) - ใช้บรรทัดที่อ่านจากแถบใหม่
+            if strip.source and kept:
+                if plan.shift > 0 and kept[-1].source[-1] == strip.source[0]:
+                    kept[-1].drop_line(-1)
+                elif plan.shift < 0 and kept[0].source[0] == strip.source[-1]:
+                    kept[0].drop_line(0)
+            kept = [segment for segment in kept if segment.source]
+            kept.append(strip)
+            kept.sort(key=lambda segment: segment.top)
+            state.segments = kept
+            state.reference = current
+            return self._source_text(state)
+
+    @staticmethod
+    def _source_text(state: _RegionState) -> str:
+        return '\n'.join(line for segment in state.segments for line in segment.source)
+
+    def translate_strip(self, name: str, plan: ScrollPlan, translated: str) -> Optional[str]:
+        """
+        ใส่คำแปลของแถบใหม่ แล้วประกอบคำแปลของทั้งพื้นที่
+
+        Returns:
+            str: คำแปลของทั้งพื้นที่ หรือ None ถ้ายังมี segment ที่ไม่มีคำแปล (ต้องแปลทั้งพื้นที่)
+        """
+        with self._lock:
+            state = self._regions.get(name)
+            if state is None:
+                return None
+            for segment in state.segments:
+                if segment.top == plan.top and segment.bottom == plan.bottom:
+                    segment.translation = _lines(translated)
+            if any(segment.translation is None for segment in state.segments if segment.source):
+                return None
+            return '\n'.join(line for segment in state.segments for line in segment.translation)
+
+    def set_translation(self, name: str, translated: str):
+        """คำแปลของทั้งพื้นที่ - รวมทุก segment เป็นหนึ่งเดียว"""
+        with self._lock:
+            state = self._regions.get(name)
+            if state is None or not state.segments:
+                return
+            segments = state.segments
+            rows = [row for segment in segments for row in (segment.rows or [])]
+            state.segments = [_Segment(segments[0].top, segments[-1].bottom,
+                                       [line for segment in segments for line in segment.source],
+                                       _lines(translated), rows=rows)]
+
+    def reset(self, name: Optional[str] = None):
+        """ลืมเฟรมอ้างอิงของพื้นที่ (None = ทุกพื้นที่) - เฟรมถัดไปจะถูกอ่านทั้งพื้นที่"""
+        with self._lock:
+            if name is None:
+                self._regions.clear()
+            else:
+                self._regions.pop(name, None)
+
+    def snapshot(self) -> Dict:
+        """สถิติ: จำนวนเฟรม, ครั้งที่อ่านเฉพาะแถบใหม่ และสัดส่วนแถวที่ส่ง OCR จริง"""
+        with self._lock:
+            total = self.stats['rows_total']
+            return {
+                'enabled': self.enabled,
+                **self.stats,
+                'read_ratio': round(self.stats['rows_read'] / total, 3) if total else 1.0,
+            }
@@ -0,0 +1,103 @@
+"""
+Pipeline Sinks for Screen Translator
+ผู้รับ event จาก Pipeline สำหรับการรันแบบ headless (เช่น เขียนไฟล์ subtitle)
+"""
+
+import os
+import sys
+import threading
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import VIDEO_CONFIG
+
+
+def format_srt_time(seconds: float) -> str:
+    """แปลงวินาทีเป็นรูปแบบเวลา SRT (HH:MM:SS,mmm)"""
+    total_ms = max(0, int(round(seconds * 1000)))
+    hours, remainder = divmod(total_ms, 3600 * 1000)
+    minutes, remainder = divmod(remainder, 60 * 1000)
+    secs, ms = divmod(remainder, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{ms:03d}"
+
+
+class SrtSink:
+    """
+    เขียนไฟล์ subtitle (SRT) จาก event ของ Pipeline ที่ใช้ source แบบมีเวลา (วิดีโอ/ลำดับภาพ)
+
+    แต่ละช่วง (cue) เริ่มเมื่อ OCR ได้ข้อความใหม่ และจบเมื่อข้อความเปลี่ยนหรือหายไป
+    """
+
+    def __init__(self, path: str, include_source: bool = True, min_cue_ms: Optional[int] = None):
+        """
+        Args:
+            path (str): ไฟล์ .srt ที่จะเขียน
+            include_source (bool): ใส่ข้อความต้นฉบับไว้ใต้คำแปลด้วยหรือไม่
+            min_cue_ms (int): ความยาวขั้นต่ำของแต่ละช่วง
+        """
+        self.path = path
+        self.include_source = include_source
+        self.min_cue_ms = VIDEO_CONFIG['min_cue_ms'] if min_cue_ms is None else min_cue_ms
+        self.cues: List[Dict] = []
+        self._current: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Dict):
+        """รับ event จาก pipeline"""
+        with self._lock:
+            if event.get('type') == 'ocr':
+                self._on_ocr(event)
+            elif event.get('type') == 'translation':
+                self._on_translation(event)
+
+    def _on_ocr(self, event: Dict):
+        """ปิดช่วงเดิมเมื่อข้อความเปลี่ยน และเปิดช่วงใหม่ถ้ามีข้อความ"""
+        text = event['text'].strip()
+        timestamp = event.get('captured_at') or 0.0
+
+        if self._current is not None and text == self._current['source_text']:
+            return
+
+        self._close_current(timestamp)
+        if text:
+            self._current = {'start': timestamp, 'end': None, 'source_text': text, 'translated_text': ''}
+
+    def _on_translation(self, event: Dict):
+        """ใส่คำแปลให้ช่วงที่ตรงกับข้อความต้นฉบับ"""
+        source_text = event['source_text'].strip()
+        for cue in ([self._current] if self._current else []) + self.cues[::-1]:
+            if cue['source_text'] == source_text and not cue['translated_text']:
+                cue['translated_text'] = event['translated_text']
+                return
+
+    def _close_current(self, end: float):
+        """ปิดช่วงปัจจุบันที่เวลา end"""
+        if self._current is None:
+            return
+        self._current['end'] = max(end, self._current['start'] + self.min_cue_ms / 1000.0)
+        self.cues.append(self._current)
+        self._current = None
+
+    def close(self, end_time: Optional[float] = None) -> int:
+        """ปิดช่วงสุดท้ายและเขียนไฟล์ SRT
+
+        Args:
+            end_time (float): เวลาสิ้นสุดของสื่อ (วินาที) สำหรับช่วงสุดท้าย
+
+        Returns:
+            int: จำนวนช่วงที่เขียน
+        """
+        with self._lock:
+            if self._current is not None:
+                self._close_current(end_time if end_time is not None else self._current['start'])
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'w', encoding='utf-8') as f:
+                for index, cue in enumerate(self.cues, 1):
+                    lines = [cue['translated_text'] or cue['source_text']]
+                    if self.include_source and cue['translated_text']:
+                        lines.append(cue['source_text'])
+                    f.write(f"{index}\n")
+                    f.write(f"{format_srt_time(cue['start'])} --> {format_srt_time(cue['end'])}\n")
+                    f.write("\n".join(lines) + "\n\n")
+            return len(self.cues)
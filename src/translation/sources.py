@@ -0,0 +1,261 @@
+"""
+Frame Sources for the translation pipeline
+แหล่งภาพสำหรับ Pipeline - ทุก source มี method read() ที่คืนรายการ RegionFrame
+(รายการว่าง = ยังไม่มีภาพใหม่, None = source หมดแล้ว)
+"""
+
+import glob
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import SCHEDULER_CONFIG, VIDEO_CONFIG
+from .change_detection import ChangeGate
+from .regions import RegionFrame, RegionScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class ScreenSource:
+    """Source สำหรับจับภาพหน้าจอแบบ real-time ผ่าน RegionScheduler"""
+
+    def __init__(self, scheduler: RegionScheduler, min_wait_ms: int = 100):
+        """
+        Args:
+            scheduler (RegionScheduler): scheduler ที่ดูแลพื้นที่ตรวจจับทั้งหมด
+            min_wait_ms (int): เวลารอขั้นต่ำระหว่างรอบ เพื่อไม่ให้วนเร็วเกินไป
+        """
+        self.scheduler = scheduler
+        self.min_wait_ms = min_wait_ms
+
+    def read(self, stop_event: Optional[threading.Event] = None) -> Optional[List[RegionFrame]]:
+        """รอจนถึงรอบถัดไปที่ครบกำหนด แล้วจับภาพหนึ่งรอบ"""
+        wait_ms = max(self.min_wait_ms, self.scheduler.next_due_in_ms())
+        if stop_event is not None:
+            if stop_event.wait(wait_ms / 1000.0):
+                return []
+        else:
+            time.sleep(wait_ms / 1000.0)
+        return self.scheduler.tick()
+
+    def stats(self) -> Dict:
+        """สถิติของ source"""
+        return self.scheduler.stats()
+
+
+class ImageListSource:
+    """Source จากรายการภาพที่มีอยู่แล้ว - ใช้กับ benchmark หรือการรันแบบ headless"""
+
+    def __init__(self, images, region_name: str = 'main', batch_size: int = 1):
+        """
+        Args:
+            images (iterable): PIL.Image หรือ tuple (name, PIL.Image)
+            region_name (str): ชื่อพื้นที่สำหรับภาพที่ไม่ได้ระบุชื่อ
+            batch_size (int): จำนวนภาพที่ส่งต่อในแต่ละรอบ
+        """
+        self.images = iter(images)
+        self.region_name = region_name
+        self.batch_size = max(1, batch_size)
+        self.frames_read = 0
+
+    def read(self, stop_event: Optional[threading.Event] = None) -> Optional[List[RegionFrame]]:
+        """คืนภาพถัดไปตาม batch_size หรือ None เมื่อหมด"""
+        frames = []
+        for item in self.images:
+            name, image = item if isinstance(item, tuple) else (self.region_name, item)
+            frames.append(RegionFrame(name, image, (0, 0) + tuple(image.size), time.monotonic()))
+            if len(frames) >= self.batch_size:
+                break
+
+        if not frames:
+            return None
+        self.frames_read += len(frames)
+        return frames
+
+    def stats(self) -> Dict:
+        """สถิติของ source"""
+        return {'frames_read': self.frames_read}
+
+
+class _PrefetchSource(ABC):
+    """
+    Source ที่ decode เฟรมล่วงหน้าใน background thread และกรองด้วย change gate
+    เดียวกับการจับภาพสด - เฉพาะเฟรมที่ข้อความบนจอเปลี่ยนเท่านั้นที่ถูกส่งไป OCR
+
+    RegionFrame.captured_at ของ source นี้คือเวลาในสื่อ (วินาที) ไม่ใช่ time.monotonic()
+    """
+
+    _END = object()
+
+    def __init__(self, region: Optional[Tuple[int, int, int, int]] = None, region_name: str = 'main',
+                 change_threshold: Optional[float] = None, prefetch: Optional[int] = None):
+        """
+        Args:
+            region (tuple): ครอบตัดเฉพาะพื้นที่ (x, y, width, height) เช่น แถบ subtitle (None = ทั้งเฟรม)
+            region_name (str): ชื่อพื้นที่ใน RegionFrame
+            change_threshold (float): threshold ของ change gate (None = ใช้ค่าจาก config)
+            prefetch (int): จำนวนเฟรมที่ decode ล่วงหน้าได้สูงสุด
+        """
+        self.region = region
+        self.region_name = region_name
+        self.change_gate = ChangeGate(
+            threshold=SCHEDULER_CONFIG['change_threshold'] if change_threshold is None else change_threshold,
+            fingerprint_size=SCHEDULER_CONFIG['fingerprint_size']
+        )
+        self.duration = 0.0  # เวลาของเฟรมสุดท้ายที่อ่านได้ (วินาที)
+        self.counters = {'decoded': 0, 'sampled': 0, 'unchanged': 0, 'dispatched': 0}
+        self._queue = queue.Queue(maxsize=prefetch or VIDEO_CONFIG['prefetch_frames'])
+        self._thread = None
+        self._closed = threading.Event()
+
+    @abstractmethod
+    def _frames(self) -> Iterator[Tuple[float, object]]:
+        """generator ของ (timestamp วินาที, PIL.Image) ที่ผ่านการสุ่มแล้ว - ให้คลาสลูกกำหนด"""
+
+    def _decode_loop(self):
+        """decode และกรองเฟรมใน background thread"""
+        try:
+            for timestamp, image in self._frames():
+                if self._closed.is_set():
+                    return
+                self.counters['sampled'] += 1
+                self.duration = timestamp
+
+                if self.region is not None:
+                    x, y, width, height = self.region
+                    image = image.crop((x, y, x + width, y + height))
+
+                if not self.change_gate.check(image):
+                    self.counters['unchanged'] += 1
+                    continue
+
+                frame = RegionFrame(self.region_name, image, (0, 0) + tuple(image.size), timestamp)
+                while not self._closed.is_set():
+                    try:
+                        self._queue.put(frame, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            logger.error("❌ เกิดข้อผิดพลาดในการอ่านเฟรม: %s", e, extra={'stage': 'capture'})
+        finally:
+            self._put_end()
+
+    def _put_end(self):
+        """ส่งสัญญาณว่า source หมดแล้ว"""
+        while not self._closed.is_set():
+            try:
+                self._queue.put(self._END, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def read(self, stop_event: Optional[threading.Event] = None) -> Optional[List[RegionFrame]]:
+        """คืนเฟรมถัดไปที่ข้อความเปลี่ยน หรือ None เมื่อหมด"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._decode_loop, name="frame-decoder", daemon=True)
+            self._thread.start()
+
+        while stop_event is None or not stop_event.is_set():
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is self._END:
+                return None
+            self.counters['dispatched'] += 1
+            return [item]
+        return []
+
+    def close(self):
+        """หยุด decoder thread"""
+        self._closed.set()
+
+    def stats(self) -> Dict:
+        """สถิติของ source"""
+        return {**self.counters, 'duration': self.duration}
+
+
+class VideoSource(_PrefetchSource):
+    """Source จากไฟล์วิดีโอด้วย cv2.VideoCapture"""
+
+    def __init__(self, path: str, sample_interval_ms: Optional[int] = None, **kwargs):
+        """
+        Args:
+            path (str): ไฟล์วิดีโอ
+            sample_interval_ms (int): สุ่มเฟรมทุก ๆ กี่ milliseconds ของวิดีโอ
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self.sample_interval_ms = sample_interval_ms or VIDEO_CONFIG['sample_interval_ms']
+
+    def _frames(self):
+        import cv2
+        from PIL import Image
+
+        capture = cv2.VideoCapture(self.path)
+        if not capture.isOpened():
+            raise IOError(f"ไม่สามารถเปิดวิดีโอ: {self.path}")
+
+        try:
+            fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+            step = max(1, int(round(fps * self.sample_interval_ms / 1000.0)))
+            index = 0
+            # grab() ทุกเฟรมแต่ retrieve() (decode เต็ม) เฉพาะเฟรมที่สุ่ม
+            while not self._closed.is_set() and capture.grab():
+                if index % step == 0:
+                    ok, frame = capture.retrieve()
+                    if not ok:
+                        break
+                    self.counters['decoded'] += 1
+                    yield index / fps, Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                index += 1
+            self.duration = index / fps
+        finally:
+            capture.release()
+
+
+class ImageSequenceSource(_PrefetchSource):
+    """Source จากลำดับภาพที่มีหมายเลข เช่น frames/frame_00001.png"""
+
+    def __init__(self, pattern: str, fps: Optional[float] = None, **kwargs):
+        """
+        Args:
+            pattern (str): glob pattern หรือโฟลเดอร์ของภาพ (เรียงตามเลขในชื่อไฟล์)
+            fps (float): จำนวนภาพต่อวินาที สำหรับคำนวณเวลา
+        """
+        super().__init__(**kwargs)
+        self.pattern = os.path.join(pattern, '*') if os.path.isdir(pattern) else pattern
+        self.fps = fps or VIDEO_CONFIG['sequence_fps']
+
+    @staticmethod
+    def _natural_key(path):
+        """เรียงชื่อไฟล์ตามตัวเลข (frame_2 มาก่อน frame_10)"""
+        return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', os.path.basename(path))]
+
+    def _frames(self):
+        from PIL import Image
+
+        # เฉพาะไฟล์ภาพ - ไฟล์อื่นในโฟลเดอร์ (Thumbs.db, .DS_Store) ไม่ใช่เฟรม
+        extensions = Image.registered_extensions()
+        paths = sorted((p for p in glob.glob(self.pattern)
+                        if os.path.isfile(p) and os.path.splitext(p)[1].lower() in extensions),
+                       key=self._natural_key)
+        for index, path in enumerate(paths):
+            # ภาพที่เสียข้ามไปทีละไฟล์ - เวลาของเฟรมถัดไปยังนับตามลำดับเดิม
+            try:
+                with Image.open(path) as image:
+                    frame = image.convert('RGB')
+            except OSError as e:
+                logger.warning("⚠️ ข้ามภาพที่อ่านไม่ได้ %s: %s", path, e, extra={'stage': 'capture'})
+                continue
+            self.counters['decoded'] += 1
+            yield index / self.fps, frame
+        self.duration = len(paths) / self.fps
@@ -0,0 +1,337 @@
+"""
+Translation Memory for Screen Translator
+ใช้คำแปลเดิมซ้ำกับข้อความที่ต่างจากข้อความที่เคยแปลเพียงตัวเลข ชื่อ หรือตัวอักษรที่ OCR อ่านผิด
+
+- ข้อความต้นฉบับถูกแปลงเป็น template (ตัวเลข -> '#') แล้วทำ index ด้วย character trigram (inverted index)
+- ค้นหาข้อความเดิมที่คล้ายที่สุด (Dice similarity ของ trigram) ด้วย prefix filtering:
+  ใช้ posting list ของ trigram ที่พบน้อยที่สุดเท่านั้นในการหา candidate แล้วตรวจความคล้ายจริงทีละตัว
+- ใช้คำแปลเดิมได้เมื่อคำที่ต่างกันถูกคัดลอกตรง ๆ ในคำแปล (ตัวเลข/ชื่อ -> แทนที่) หรือต่างกันเฉพาะตัวอักษร
+  ที่ OCR สับสนบ่อย (l/I/1, O/0, rn/m ฯลฯ) - คำจริงสองคำที่ต่างกันเล็กน้อย (not/now, win/won) ต้องแปลใหม่
+"""
+
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import TRANSLATION_MEMORY_CONFIG
+from .vocabulary import ENGLISH_WORDS
+
+logger = logging.getLogger(__name__)
+
+_NUMBER_PATTERN = re.compile(r'\d+(?:[.,:]\d+)*')
+_SPACE_PATTERN = re.compile(r'\s+')
+_PUNCTUATION = '.,!?:;()"\''
+
+
+def make_template(text: str) -> str:
+    """รูปแบบของข้อความสำหรับเทียบ: ตัวพิมพ์เล็ก, ช่องว่างเดียว, ตัวเลขทุกชุดเป็น '#'"""
+    return _NUMBER_PATTERN.sub('#', _SPACE_PATTERN.sub(' ', text.strip().lower()))
+
+
+def trigrams(template: str) -> set:
+    """trigram ของ template (เติมช่องว่างหัวท้ายเพื่อให้คำสั้นมี trigram)"""
+    padded = f" {template} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _name_tokens(text: str) -> List[int]:
+    """ตำแหน่งของคำที่ขึ้นต้นด้วยตัวพิมพ์ใหญ่ (อาจเป็นชื่อที่คำแปลคัดลอกไปตรง ๆ)"""
+    positions = []
+    for i, token in enumerate(text.split()):
+        core = token.strip(_PUNCTUATION)
+        if len(core) >= 2 and core.isalpha() and core.isascii() and core[0].isupper():
+            positions.append(i)
+    return positions
+
+
+def _name_template(text: str, positions) -> str:
+    """template ที่คำในตำแหน่งที่กำหนดถูกแทนด้วย '@'"""
+    tokens = text.split()
+    for i in positions:
+        core = tokens[i].strip(_PUNCTUATION)
+        tokens[i] = tokens[i].replace(core, '@', 1)
+    return make_template(' '.join(tokens))
+
+
+# ตัวอักษรที่ OCR อ่านสลับกันบ่อย: ลำดับตัวอักษร -> ตัวแทน และตัวอักษรเดี่ยว -> ตัวแทนของกลุ่ม
+_OCR_SEQUENCES = (('rn', 'm'), ('vv', 'w'), ('cl', 'd'))
+_OCR_CHARACTERS = str.maketrans({'I': 'l', '1': 'l', '|': 'l', '0': 'o', 'O': 'o', '5': 'S', '8': 'B'})
+
+
+def _ocr_normalize(word: str, sequences: bool = True) -> str:
+    """แทนตัวอักษรที่ OCR สับสนด้วยตัวแทนของกลุ่ม (แล้วเป็นตัวพิมพ์เล็ก - 'I' สับสนกับ 'l' แต่ 'i' ไม่)"""
+    if sequences:
+        for sequence, replacement in _OCR_SEQUENCES:
+            word = word.replace(sequence, replacement)
+    return word.translate(_OCR_CHARACTERS).lower()
+
+
+def _ocr_confusable(a: str, b: str) -> bool:
+    """a กับ b ต่างกันเฉพาะตัวอักษรที่ OCR สับสน และไม่ใช่คำจริงทั้งคู่ ("Ievel"/"level" ใช่, "not"/"now" ไม่ใช่)
+
+    การสลับลำดับตัวอักษร (rn/m, cl/d, vv/w) ให้คำจริงอีกคำได้ง่าย (modern/modem, burn/bum) -
+    ยอมรับเฉพาะเมื่ออีกฝั่งเป็นคำที่รู้จัก ("rnenu"/"menu")
+    """
+    a_known, b_known = a.lower() in ENGLISH_WORDS, b.lower() in ENGLISH_WORDS
+    if a_known and b_known:
+        return False
+    if _ocr_normalize(a, sequences=False) == _ocr_normalize(b, sequences=False):
+        return True
+    return (a_known or b_known) and _ocr_normalize(a) == _ocr_normalize(b)
+
+
+def _token_pattern(token: str):
+    """pattern ของคำที่ไม่ติดกับตัวอักษร/ตัวเลข ASCII อื่น ('1' ไม่ตรงกับส่วนหนึ่งของ '12')"""
+    return re.compile(r'(?<![A-Za-z0-9])' + re.escape(token) + r'(?![A-Za-z0-9])')
+
+
+def adapt_translation(old_source: str, new_source: str, translation: str) -> Optional[str]:
+    """ปรับคำแปลของ old_source ให้เป็นคำแปลของ new_source
+
+    คำที่ต่างกันต้องอยู่ตำแหน่งเดียวกัน และแต่ละคู่ต้องเป็น:
+    - คำที่ปรากฏในคำแปลเดิมครั้งเดียวแบบตรงตัว (ตัวเลข/ชื่อ) -> แทนที่ด้วยคำใหม่
+    - คำที่ต่างกันเฉพาะตัวอักษรที่ OCR สับสน และไม่อยู่ในคำแปล (OCR อ่านผิด) -> ใช้คำแปลเดิม
+
+    Returns:
+        str: คำแปลที่ปรับแล้ว หรือ None ถ้าใช้ซ้ำไม่ได้
+    """
+    old_tokens = old_source.split()
+    new_tokens = new_source.split()
+    if len(old_tokens) != len(new_tokens):
+        return None
+    result = translation
+    substitutions = 0
+    for old, new in zip(old_tokens, new_tokens):
+        if old == new:
+            continue
+        # แยกเครื่องหมายวรรคตอนท้ายคำ ("12," -> "12")
+        old_core, new_core = old.strip(_PUNCTUATION), new.strip(_PUNCTUATION)
+        if old_core == new_core:
+            continue
+        pattern = _token_pattern(old_core) if old_core else None
+        if pattern is not None and len(pattern.findall(translation)) == 1:
+            result = pattern.sub(lambda _: new_core, result, count=1)
+            substitutions += 1
+        elif old_core not in translation and _ocr_confusable(old_core, new_core):
+            continue
+        else:
+            return None
+        if substitutions > TRANSLATION_MEMORY_CONFIG['max_substitutions']:
+            return None
+    return result
+
+
+class TranslationMemory:
+    """คลังคำแปลพร้อม trigram inverted index (thread-safe)"""
+
+    def __init__(self, path: Optional[str] = None, threshold: Optional[float] = None,
+                 max_entries: Optional[int] = None):
+        """
+        Args:
+            path (str): ไฟล์ JSONL สำหรับเก็บถาวร (None = ในหน่วยความจำอย่างเดียว)
+            threshold (float): Dice similarity ขั้นต่ำของ trigram (0-1)
+            max_entries (int): จำนวนรายการสูงสุด (เต็มแล้วไม่รับเพิ่ม)
+        """
+        config = TRANSLATION_MEMORY_CONFIG
+        self.path = path
+        self.threshold = config['threshold'] if threshold is None else threshold
+        self.max_entries = max_entries or config['max_entries']
+        self.max_candidates = config['max_candidates']
+        self.max_postings = config['max_postings']
+        self.max_name_variants = 4
+
+        self._lock = threading.Lock()
+        self._sources: List[str] = []
+        self._translations: List[str] = []
+        self._scopes: List[str] = []
+        self._sizes = array('H')  # จำนวน trigram ของแต่ละรายการ
+        self._postings: Dict[str, array] = {}
+        self._exact: Dict[Tuple[str, str], int] = {}  # (scope, template) -> รายการล่าสุด
+        self.stats = {'lookups': 0, 'exact': 0, 'fuzzy': 0, 'adapted': 0, 'misses': 0, 'rejected': 0}
+
+        if path:
+            self._load(path)
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    def _load(self, path: str):
+        """โหลดรายการจากไฟล์ JSONL (บรรทัดเสียถูกข้าม)"""
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self._add(record['source'], record['translation'], record.get('scope', ''))
+                except (ValueError, KeyError):
+                    continue
+        logger.info("💾 โหลด translation memory %s รายการ", len(self))
+
+    def add(self, source: str, translation: str, scope: str = '') -> bool:
+        """เพิ่มคำแปล
+
+        Args:
+            source (str): ข้อความต้นฉบับ
+            translation (str): คำแปล
+            scope (str): ขอบเขต (เช่น service/model/ภาษา) - ค้นหาเฉพาะรายการใน scope เดียวกัน
+
+        Returns:
+            bool: True หากเพิ่มแล้ว
+        """
+        if not source.strip() or not translation.strip():
+            return False
+        with self._lock:
+            added = self._add(source, translation, scope)
+        if added and self.path:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'source': source, 'translation': translation, 'scope': scope},
+                                       ensure_ascii=False) + '\n')
+            except OSError as e:
+                logger.error("❌ ไม่สามารถบันทึก translation memory: %s", e)
+        return added
+
+    def _add(self, source: str, translation: str, scope: str) -> bool:
+        """เพิ่มรายการลง index (ต้องถือ lock หรือเรียกตอนโหลด)"""
+        template = make_template(source)
+        existing = self._exact.get((scope, template))
+        if existing is not None and self._sources[existing] == source:
+            self._translations[existing] = translation
+            return False
+        if len(self._sources) >= self.max_entries:
+            return False
+        entry = len(self._sources)
+        grams = trigrams(template)
+        self._sources.append(source)
+        self._translations.append(translation)
+        self._scopes.append(scope)
+        self._sizes.append(min(len(grams), 0xFFFF))
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array('I')
+            postings.append(entry)
+        self._exact[(scope, template)] = entry
+        # ชื่อที่คำแปลคัดลอกไปตรง ๆ ("Welcome back, John!" -> "... John!") เป็น placeholder ได้
+        names = [i for i in _name_tokens(source)
+                 if len(_token_pattern(source.split()[i].strip(_PUNCTUATION)).findall(translation)) == 1]
+        if names:
+            self._exact[(scope, _name_template(source, names))] = entry
+        return True
+
+    def _candidates(self, grams: set, scope: str) -> List[Tuple[int, int]]:
+        """รายการที่อาจคล้ายพอ: ใช้ posting list ของ trigram ที่พบน้อยที่สุดเท่านั้น (prefix filtering)
+
+        Dice >= t ต้องมี trigram ร่วมอย่างน้อย t*q/(2-t) ตัว ดังนั้นรายการที่ผ่านต้องมี
+        trigram อย่างน้อยหนึ่งตัวใน q - ceil(t*q/(2-t)) + 1 ตัวที่พบน้อยที่สุด
+        อ่าน posting รวมไม่เกิน max_postings - trigram ที่พบบ่อยเกินไปถูกข้าม (ค้นหาแบบประมาณเพื่อจำกัดเวลา)
+        """
+        q = len(grams)
+        min_overlap = max(1, -int(-self.threshold * q // (2 - self.threshold)))
+        prefix_length = q - min_overlap + 1
+        ordered = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))
+        counts = Counter()
+        budget = self.max_postings
+        for gram in ordered[:prefix_length]:
+            postings = self._postings.get(gram)
+            if not postings:
+                continue
+            if len(postings) > budget:
+                break
+            budget -= len(postings)
+            counts.update(postings)
+        # ขนาดของรายการที่ Dice >= t เป็นไปได้
+        low, high = q * self.threshold / (2 - self.threshold), q * (2 - self.threshold) / self.threshold
+        return [(entry, hits) for entry, hits in counts.most_common(self.max_candidates)
+                if self._scopes[entry] == scope and low <= self._sizes[entry] <= high]
+
+    def lookup(self, text: str, scope: str = '') -> Optional[Dict]:
+        """หาคำแปลที่ใช้ซ้ำได้สำหรับข้อความนี้
+
+        Returns:
+            dict: {'translated_text', 'source', 'similarity', 'match': 'exact'|'template'|'fuzzy'} หรือ None
+        """
+        template = make_template(text)
+        with self._lock:
+            self.stats['lookups'] += 1
+            entry = self._exact.get((scope, template))
+            if entry is None:
+                entry = self._lookup_names(text, scope)
+            if entry is not None:
+                match, similarity = 'template', 1.0
+            else:
+                entry, similarity = self._best_fuzzy(template, scope)
+                match = 'fuzzy'
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            source, translation = self._sources[entry], self._translations[entry]
+
+        if source == text:
+            self._count('exact')
+            return {'translated_text': translation, 'source': source, 'similarity': 1.0, 'match': 'exact'}
+        adapted = adapt_translation(source, text, translation)
+        if adapted is None:
+            self._count('rejected')
+            return None
+        self._count('adapted' if match == 'template' else 'fuzzy')
+        return {'translated_text': adapted, 'source': source, 'similarity': round(similarity, 3), 'match': match}
+
+    def _lookup_names(self, text: str, scope: str) -> Optional[int]:
+        """ลองแทนคำที่ขึ้นต้นด้วยตัวพิมพ์ใหญ่ด้วย placeholder ทีละคำและทั้งหมด (ต้องถือ lock)"""
+        positions = _name_tokens(text)[:self.max_name_variants]
+        if not positions:
+            return None
+        variants = [positions] + ([[i] for i in positions] if len(positions) > 1 else [])
+        for variant in variants:
+            entry = self._exact.get((scope, _name_template(text, variant)))
+            if entry is not None:
+                return entry
+        return None
+
+    def _best_fuzzy(self, template: str, scope: str) -> Tuple[Optional[int], float]:
+        """รายการที่ Dice similarity สูงสุดและไม่ต่ำกว่า threshold (ต้องถือ lock)"""
+        grams = trigrams(template)
+        best, best_score = None, self.threshold
+        for entry, _ in self._candidates(grams, scope):
+            other = trigrams(make_template(self._sources[entry]))
+            score = 2 * len(grams & other) / (len(grams) + len(other))
+            if score >= best_score:
+                best, best_score = entry, score
+        return best, best_score
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def snapshot(self) -> Dict:
+        """สถิติการใช้งาน"""
+        with self._lock:
+            return dict(self.stats, entries=len(self._sources), trigrams=len(self._postings))
+
+
+_shared_memory: Optional[TranslationMemory] = None
+_shared_lock = threading.Lock()
+
+
+def get_translation_memory() -> Optional[TranslationMemory]:
+    """translation memory กลางของแอป (None ถ้าปิดใน TRANSLATION_MEMORY_CONFIG)"""
+    global _shared_memory
+    if not TRANSLATION_MEMORY_CONFIG['enabled']:
+        return None
+    with _shared_lock:
+        if _shared_memory is None:
+            path = None
+            if TRANSLATION_MEMORY_CONFIG['memory_file']:
+                from .cache import default_cache_path
+                path = default_cache_path(TRANSLATION_MEMORY_CONFIG['memory_file'])
+            _shared_memory = TranslationMemory(path=path)
+        return _shared_memory
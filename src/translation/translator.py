@@ -1,24 +1,34 @@
+import logging
 import os
 import sys
-from deep_translator import GoogleTranslator
 import requests
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 
 # เพิ่ม path สำหรับ import config
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
-from config import TRANSLATION_CONFIG
+from config import TRANSLATION_CONFIG, CACHE_CONFIG, BREAKER_CONFIG, HEDGE_CONFIG, CHUNK_CONFIG
+from .cache import get_shared_cache, make_key
+from .chunker import join_chunks, needs_chunking, split_chunks
+from .circuit_breaker import OPEN, CircuitBreaker
+from .language_detector import detect_language
+from .translation_memory import get_translation_memory
+from utils.tracing import LatencyHistogram, traced, span
+
+logger = logging.getLogger(__name__)
 
 # Import OllamaTranslator
 try:
     from .ollama_translator import OllamaTranslator
-    print("✅ Successfully imported OllamaTranslator from ollama_translator.py")
+    logger.debug("✅ Successfully imported OllamaTranslator from ollama_translator.py")
 except ImportError as e:
-    print(f"❌ Failed to import OllamaTranslator: {e}")
+    logger.error("❌ Failed to import OllamaTranslator: %s", e)
     # Fallback placeholder
     class OllamaTranslator:
         def __init__(self, *args, **kwargs):
             self.is_connected = False
-            print("⚠️ OllamaTranslator fallback placeholder")
+            logger.warning("⚠️ OllamaTranslator fallback placeholder")
         
         def translate(self, text, *args, **kwargs):
             return {
@@ -34,34 +44,52 @@ except ImportError as e:
 
 
 class Translator:
-    def __init__(self, service='ollama', ollama_model='gemma3:4b', custom_prompt=''):
+    def __init__(self, service='ollama', ollama_model='gemma3:4b', custom_prompt='', cache=None, health=None,
+                 memory=None):
         """เริ่มต้น Translator
         
         Args:
             service (str): บริการแปลที่จะใช้ ('google', 'ollama')
             ollama_model (str): Model ที่ใช้สำหรับ Ollama
             custom_prompt (str): Custom prompt สำหรับ Ollama
+            cache (Cache): Cache สำหรับผลการแปล (None = ใช้ cache กลางถ้าเปิดใน config)
+            health (OllamaHealthMonitor): monitor สถานะ Ollama - ถ้ามี จะไม่สลับไป Google ถาวรเมื่อ Ollama ยังไม่พร้อม
+            memory (TranslationMemory): คลังคำแปลสำหรับข้อความที่ต่างกันแค่ตัวเลข/ชื่อ (None = คลังกลางถ้าเปิดใน config)
         """
         self.service = service
+        if cache is None and TRANSLATION_CONFIG['enable_cache']:
+            cache = get_shared_cache(CACHE_CONFIG['translation_cache_file'])
+        self.cache = cache
+        self.memory = memory if memory is not None else get_translation_memory()
         self.google_translator = None
         self.ollama_translator = None
         self.api_key = None
         self.ollama_model = ollama_model
         self.custom_prompt = custom_prompt
+        self.health = health
+        
+        # Circuit breaker ต่อ backend - backend ที่ล้มเหลว/ช้าติดกันจะถูกข้ามไปใช้ service สำรอง
+        self.breakers = {}
+        self.failover_stats = {'failovers': 0, 'routes': {}}
+        
+        # Hedged requests - เวลาตอบล่าสุดของแต่ละ backend ใช้กำหนดว่าจะส่งคำขอซ้ำเมื่อไร
+        self.latency = {}
+        self._latency_lock = threading.Lock()
+        self.secondary_ollama = None  # OllamaTranslator ของ backend 'ollama_secondary'
+        self.hedge_counters = {'requests': 0, 'hedged': 0, 'cancelled': 0, 'wins': {}}
         
-        # เริ่มต้น service ที่เลือก
+        # ข้อความยาวถูกแบ่งเป็นส่วนและแปลพร้อมกันใน executor นี้ (สร้างเมื่อใช้ครั้งแรก)
+        self._chunk_executor = None
+        self._chunk_lock = threading.Lock()
+        
+        # เริ่มต้น service ที่เลือก - การเชื่อมต่อ Ollama ถูกตรวจสอบเมื่อใช้งานครั้งแรก (ดู _resolve_service)
+        self._ollama_checked = False
         if service == 'ollama':
             try:
-                self.ollama_translator = OllamaTranslator(model=ollama_model, custom_prompt=custom_prompt)
-                if self.ollama_translator.is_available():
-                    print("✅ เชื่อมต่อ Ollama สำเร็จ")
-                else:
-                    print("❌ ไม่สามารถเชื่อมต่อ Ollama ได้ กลับไปใช้ Google Translate")
-                    self.service = 'google'
-                    self._init_google_translator()
+                self.ollama_translator = OllamaTranslator(model=ollama_model, custom_prompt=custom_prompt, health=health)
             except Exception as e:
-                print(f"❌ ไม่สามารถเชื่อมต่อ Ollama: {e}")
-                print("🔄 กลับไปใช้ Google Translate")
+                logger.error("❌ ไม่สามารถเชื่อมต่อ Ollama: %s", e)
+                logger.warning("🔄 กลับไปใช้ Google Translate")
                 self.service = 'google'
                 self._init_google_translator()
         
@@ -98,14 +126,32 @@ class Translator:
                 'tl': 'ตากาล็อก'
             }
     
+    def _resolve_service(self):
+        """ตรวจสอบการเชื่อมต่อ Ollama ครั้งแรกที่ใช้งานจริง ถ้าไม่ได้จะกลับไปใช้ Google Translate"""
+        if self.service != 'ollama' or self._ollama_checked:
+            return
+        if self.health is not None:
+            # health monitor ติดตามการเชื่อมต่อใหม่เอง - Ollama ที่เปิดทีหลังจะใช้งานได้ทันที
+            return
+        self._ollama_checked = True
+        if self.ollama_translator is not None and self.ollama_translator.is_available():
+            logger.info("✅ เชื่อมต่อ Ollama สำเร็จ")
+            return
+        logger.warning("❌ ไม่สามารถเชื่อมต่อ Ollama ได้ กลับไปใช้ Google Translate")
+        self.service = 'google'
+        self._init_google_translator()
+        self._update_supported_languages()
+
     def _init_google_translator(self):
         """เริ่มต้น Google Translator"""
         try:
+            from deep_translator import GoogleTranslator
             self.google_translator = GoogleTranslator(source='auto', target='th')
-            print("✅ เชื่อมต่อ Google Translate สำเร็จ")
+            logger.info("✅ เชื่อมต่อ Google Translate สำเร็จ")
         except Exception as e:
-            print(f"❌ ไม่สามารถเชื่อมต่อ Google Translate: {e}")
+            logger.error("❌ ไม่สามารถเชื่อมต่อ Google Translate: %s", e)
 
+    @traced('translate')
     def translate(self, text, target_language='th', source_language='auto'):
         """แปลข้อความ
         
@@ -124,25 +170,338 @@ class Translator:
                 'confidence': 0.0
             }
         
+        if needs_chunking(text):
+            return self._translate_chunked(text, target_language, source_language)
+        return self._translate_text(text, target_language, source_language)
+
+    def _translate_text(self, text, target_language, source_language):
+        """แปลข้อความหนึ่งคำขอ (ผ่าน cache, translation memory, hedge และ failover)"""
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(text, target_language, source_language)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return dict(cached, cached=True)
+        
+        memory_scope = None
+        if self.memory is not None:
+            memory_scope = self._memory_scope(target_language, source_language)
+            remembered = self._lookup_memory(text, memory_scope)
+            if remembered is not None:
+                return remembered
+        
+        self._resolve_service()
         try:
-            if self.service == 'ollama' and self.ollama_translator:
-                return self.ollama_translator.translate(text, target_language, source_language)
-            elif self.service == 'google' and self.google_translator:
-                return self._translate_google(text, target_language, source_language)
+            if HEDGE_CONFIG['enabled']:
+                result = self._translate_hedged(text, target_language, source_language)
             else:
+                result = self._translate_with_failover(text, target_language, source_language)
+            # คำแปลจาก service สำรองไม่เก็บลง cache ของ service หลัก
+            if not result.get('failover') and result.get('hedge_winner', self.service) == self.service:
+                self._store_in_cache(cache_key, result)
+                self._store_in_memory(memory_scope, text, result)
+            return result
+                
+        except Exception as e:
+            logger.error("❌ เกิดข้อผิดพลาดในการแปล: %s", e, extra={'stage': 'translate'})
+            return {
+                'translated_text': text,
+                'detected_language': 'error',
+                'confidence': 0.0
+            }
+
+    @traced('translate.chunked')
+    def _translate_chunked(self, text, target_language, source_language):
+        """แปลข้อความยาวทีละส่วนพร้อมกัน (แต่ละส่วนผ่าน _translate_text จึงมี cache/memory/failover ของตัวเอง)
+        
+        ส่วนที่ล้มเหลวถูกแปลใหม่ได้ CHUNK_CONFIG['retries'] ครั้ง - ถ้ายังล้มเหลว ใช้ต้นฉบับของส่วนนั้นแทน
+        """
+        chunks = split_chunks(text)
+        with self._chunk_lock:
+            if self._chunk_executor is None:
+                self._chunk_executor = ThreadPoolExecutor(max_workers=max(1, CHUNK_CONFIG['parallelism']),
+                                                          thread_name_prefix='translate-chunk')
+            executor = self._chunk_executor
+        
+        def translate_chunk(chunk):
+            result = self._translate_text(chunk, target_language, source_language)
+            for _ in range(CHUNK_CONFIG['retries']):
+                if 'error' not in result and result.get('detected_language') != 'error':
+                    break
+                result = self._translate_text(chunk, target_language, source_language)
+            return result
+        
+        logger.debug("🔄 แบ่งข้อความเป็น %s ส่วน (แปลพร้อมกัน %s ส่วน)", len(chunks), CHUNK_CONFIG['parallelism'])
+        results = list(executor.map(translate_chunk, [chunk for chunk, _ in chunks]))
+        
+        failed = [i for i, result in enumerate(results) if 'error' in result or result.get('detected_language') == 'error']
+        translated = [chunk if i in failed else result.get('translated_text', chunk)
+                      for i, ((chunk, _), result) in enumerate(zip(chunks, results))]
+        languages = [r.get('detected_language') for r in results if r.get('detected_language') not in (None, 'error')]
+        combined = {
+            'translated_text': join_chunks(translated, chunks),
+            'detected_language': max(set(languages), key=languages.count) if languages else 'error',
+            'confidence': min((r.get('confidence', 0.0) for r in results), default=0.0),
+            'service': self.service,
+            'chunks': len(chunks),
+            'cached_chunks': sum(1 for r in results if r.get('cached'))
+        }
+        if failed:
+            combined['failed_chunks'] = failed
+            combined['error'] = results[failed[0]].get('error', 'chunk translation failed')
+        return combined
+
+    def _failover_service(self):
+        """service สำรองเมื่อ service หลักใช้งานไม่ได้ (None = ไม่มี)"""
+        failover = BREAKER_CONFIG['failover_service']
+        if not BREAKER_CONFIG['enabled'] or not failover or failover == self.service:
+            return None
+        return failover
+    
+    def _get_breaker(self, name):
+        """circuit breaker ของ backend name (สร้างเมื่อใช้ครั้งแรก)"""
+        breaker = self.breakers.get(name)
+        if breaker is None:
+            breaker = self.breakers.setdefault(name, CircuitBreaker(
+                name, failure_threshold=BREAKER_CONFIG['failure_threshold'],
+                slow_call_ms=BREAKER_CONFIG['slow_call_ms'],
+                reset_timeout_s=BREAKER_CONFIG['reset_timeout_s']))
+        return breaker
+    
+    def _call_backend(self, name, text, target_language, source_language, cancel_event=None):
+        """เรียก backend ตามชื่อ (ollama / ollama_secondary / google)"""
+        if name == 'ollama':
+            if not self.ollama_translator:
                 return {
                     'translated_text': text,
                     'detected_language': 'unknown',
                     'confidence': 0.0
                 }
-                
+            return self.ollama_translator.translate(text, target_language, source_language, cancel_event=cancel_event)
+        if name == 'ollama_secondary':
+            if self.secondary_ollama is None:
+                secondary = HEDGE_CONFIG['secondary_ollama']
+                self.secondary_ollama = OllamaTranslator(host=secondary['host'], port=secondary['port'],
+                                                         model=secondary['model'] or self.ollama_model,
+                                                         custom_prompt=self.custom_prompt)
+            result = self.secondary_ollama.translate(text, target_language, source_language, cancel_event=cancel_event)
+            result['service'] = name
+            return result
+        if name == 'google':
+            if not self.google_translator:
+                self._init_google_translator()
+                if not self.google_translator:
+                    raise RuntimeError('Google Translate not available')
+            result = self._translate_google(text, target_language, source_language)
+            result.setdefault('service', 'google')
+            return result
+        raise ValueError(f"Unknown translation service: {name}")
+    
+    def _call_with_breaker(self, name, text, target_language, source_language, cancel_event=None):
+        """เรียก backend พร้อมบันทึกผลลง circuit breaker และเวลาตอบล่าสุด
+        
+        Returns:
+            tuple: (สำเร็จหรือไม่, ผลลัพธ์)
+        """
+        breaker = self._get_breaker(name)
+        started = time.perf_counter()
+        try:
+            with span(f'translate.{name}'):
+                result = self._call_backend(name, text, target_language, source_language, cancel_event)
         except Exception as e:
-            print(f"❌ เกิดข้อผิดพลาดในการแปล: {e}")
-            return {
+            breaker.record_failure(str(e))
+            return False, {
                 'translated_text': text,
                 'detected_language': 'error',
-                'confidence': 0.0
+                'confidence': 0.0,
+                'service': name,
+                'error': str(e)
             }
+        if result.get('cancelled'):
+            breaker.record_cancelled()
+            return False, result
+        if result.get('detected_language') == 'error':
+            breaker.record_failure(result.get('error', ''))
+            return False, result
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        breaker.record_success(elapsed_ms)
+        with self._latency_lock:
+            histogram = self.latency.get(name)
+            if histogram is None:
+                histogram = self.latency[name] = LatencyHistogram(HEDGE_CONFIG['window_size'])
+            histogram.add(elapsed_ms)
+        return True, result
+    
+    def _translate_with_failover(self, text, target_language, source_language):
+        """แปลด้วย service หลัก ถ้าวงจรของ service หลักเปิดอยู่หรือแปลไม่สำเร็จ ใช้ service สำรองทันที"""
+        primary = self.service
+        fallback = self._failover_service()
+        if fallback is None:
+            # ไม่มี service สำรอง - ทำงานแบบเดิม (ข้อผิดพลาดของ Google ถูกส่งต่อให้ translate)
+            return self._call_backend(primary, text, target_language, source_language)
+        
+        result = None
+        if self._get_breaker(primary).allow_request():
+            ok, result = self._call_with_breaker(primary, text, target_language, source_language)
+            if ok:
+                return result
+        return self._failover(primary, result, text, target_language, source_language)
+    
+    def _failover(self, primary, result, text, target_language, source_language):
+        """ใช้ service สำรองหลังจาก service หลักล้มเหลวหรือถูกตัดวงจร"""
+        fallback = self._failover_service()
+        if fallback is not None and self._get_breaker(fallback).allow_request():
+            ok, fallback_result = self._call_with_breaker(fallback, text, target_language, source_language)
+            if ok:
+                route = f"{primary}->{fallback}"
+                self.failover_stats['failovers'] += 1
+                self.failover_stats['routes'][route] = self.failover_stats['routes'].get(route, 0) + 1
+                return dict(fallback_result, failover=True, failover_from=primary)
+            result = result or fallback_result
+        
+        return result or {
+            'translated_text': text,
+            'detected_language': 'error',
+            'confidence': 0.0,
+            'service': primary,
+            'error': 'All translation backends unavailable'
+        }
+    
+    def _hedge_service(self):
+        """backend ที่รับคำขอซ้ำ (None = ไม่มี)"""
+        secondary = HEDGE_CONFIG['secondary']
+        if not secondary or secondary == self.service:
+            return None
+        return secondary
+    
+    def _hedge_delay_ms(self, name):
+        """เวลาที่รอ backend หลักก่อนส่งคำขอซ้ำ = percentile ของเวลาตอบล่าสุด"""
+        with self._latency_lock:
+            histogram = self.latency.get(name)
+            if histogram is None or len(histogram.samples) < HEDGE_CONFIG['min_samples']:
+                return HEDGE_CONFIG['initial_delay_ms']
+            delay_ms = histogram.percentile(HEDGE_CONFIG['percentile'])
+        return max(HEDGE_CONFIG['min_delay_ms'], delay_ms)
+    
+    def _translate_hedged(self, text, target_language, source_language):
+        """ส่งคำขอไป backend หลัก ถ้ายังไม่ตอบภายใน percentile ของเวลาตอบล่าสุด ส่งคำขอซ้ำไป backend รอง
+        ใช้คำตอบแรกที่สำเร็จ และยกเลิกคำขอที่แพ้ (Ollama หยุดสร้างคำตอบเมื่อ connection ถูกปิด)"""
+        primary = self.service
+        secondary = self._hedge_service()
+        if secondary is None:
+            return self._translate_with_failover(text, target_language, source_language)
+        if not self._get_breaker(primary).allow_request():
+            return self._failover(primary, None, text, target_language, source_language)
+        
+        self.hedge_counters['requests'] += 1
+        legs = {}  # future -> (backend, cancel_event)
+        
+        def submit(name):
+            # thread ต่อคำขอ (ไม่ใช้ pool) - คำขอที่แพ้แต่ยังรอ server อยู่จะไม่กันคำขอใหม่
+            cancel_event = threading.Event()
+            future = Future()
+            
+            def run():
+                try:
+                    future.set_result(self._call_with_breaker(name, text, target_language,
+                                                              source_language, cancel_event))
+                except Exception as e:
+                    future.set_exception(e)
+            
+            threading.Thread(target=run, name=f"hedge-{name}", daemon=True).start()
+            legs[future] = (name, cancel_event)
+            return future
+        
+        pending = {submit(primary)}
+        done, pending = wait(pending, timeout=self._hedge_delay_ms(primary) / 1000.0)
+        if not done and self._get_breaker(secondary).allow_request():
+            self.hedge_counters['hedged'] += 1
+            pending.add(submit(secondary))
+        
+        failed_result = None
+        while done or pending:
+            for future in done:
+                ok, result = future.result()
+                if not ok:
+                    failed_result = failed_result or result
+                    continue
+                name = legs[future][0]
+                for loser in pending:
+                    legs[loser][1].set()
+                    self.hedge_counters['cancelled'] += 1
+                self.hedge_counters['wins'][name] = self.hedge_counters['wins'].get(name, 0) + 1
+                if len(legs) > 1:
+                    result = dict(result, hedged=True, hedge_winner=name)
+                return result
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        
+        # ทุก backend ที่ส่งไปล้มเหลว - ใช้ service สำรองของ circuit breaker (ถ้ายังไม่ได้ลอง)
+        tried = {name for name, _ in legs.values()}
+        if self._failover_service() not in tried:
+            return self._failover(primary, failed_result, text, target_language, source_language)
+        return failed_result
+    
+    def hedge_stats(self):
+        """สถิติ hedged requests: อัตราการส่งซ้ำ, จำนวนครั้งที่แต่ละ backend ชนะ และเวลาที่รอก่อนส่งซ้ำ"""
+        counters = self.hedge_counters
+        return {
+            'enabled': HEDGE_CONFIG['enabled'],
+            'requests': counters['requests'],
+            'hedged': counters['hedged'],
+            'hedge_rate': round(counters['hedged'] / counters['requests'], 4) if counters['requests'] else 0.0,
+            'cancelled': counters['cancelled'],
+            'wins': dict(counters['wins']),
+            'hedge_delay_ms': round(self._hedge_delay_ms(self.service), 1)
+        }
+    
+    def breaker_stats(self):
+        """สถิติ circuit breaker และการสลับไปใช้ service สำรอง"""
+        return {
+            'failovers': self.failover_stats['failovers'],
+            'routes': dict(self.failover_stats['routes']),
+            'backends': {name: breaker.stats() for name, breaker in self.breakers.items()}
+        }
+    
+    def _cache_key(self, text, target_language, source_language):
+        """สร้าง cache key จาก service/model/ภาษา/ข้อความ"""
+        model, custom_prompt = '', ''
+        if self.service == 'ollama' and self.ollama_translator:
+            model = getattr(self.ollama_translator, 'model', '')
+            custom_prompt = getattr(self.ollama_translator, 'custom_prompt', '')
+        return make_key('translation', self.service, model, custom_prompt, source_language, target_language, text)
+    
+    def _memory_scope(self, target_language, source_language):
+        """ขอบเขตของ translation memory - คำแปลจาก service/model/prompt/ภาษาอื่นไม่ถูกใช้ปนกัน"""
+        return self._cache_key('', target_language, source_language)
+    
+    def _lookup_memory(self, text, scope):
+        """คำแปลจาก translation memory (None = ไม่มีข้อความที่ใช้คำแปลซ้ำได้)"""
+        match = self.memory.lookup(text, scope)
+        if match is None:
+            return None
+        return {
+            'translated_text': match['translated_text'],
+            'detected_language': detect_language(text)['language'],
+            'confidence': 0.9 * match['similarity'],
+            'service': self.service,
+            'memory_match': match['match'],
+            'memory_source': match['source']
+        }
+    
+    def _store_in_memory(self, scope, text, result):
+        """เพิ่มคำแปลที่สำเร็จลง translation memory"""
+        if scope is None or 'error' in result or result.get('truncated') or result.get('detected_language') == 'error':
+            return
+        if result.get('translated_text') and result['translated_text'] != text:
+            self.memory.add(text, result['translated_text'], scope)
+    
+    def _store_in_cache(self, cache_key, result):
+        """บันทึกผลการแปลลง cache เฉพาะเมื่อแปลสำเร็จ"""
+        if cache_key is None or 'error' in result or result.get('detected_language') == 'error':
+            return
+        self.cache.set(cache_key, result)
 
     def _translate_google(self, text, target_language, source_language):
         """แปลด้วย Google Translate
@@ -156,11 +515,11 @@ class Translator:
             dict: ผลลัพธ์การแปล
         """
         try:
-            # ตรวจจับภาษาอัตโนมัติด้วย deep-translator
+            # ตรวจจับภาษาในเครื่อง (remote เฉพาะข้อความละตินที่ไม่ชัดเจน)
             if source_language == 'auto':
-                from deep_translator import single_detection
-                detected_lang = single_detection(text, api_key=None)
-                confidence = 0.9  # default confidence
+                detection = detect_language(text, remote=self._remote_detector())
+                detected_lang = detection['language']
+                confidence = detection['confidence']
             else:
                 detected_lang = source_language
                 confidence = 1.0
@@ -170,7 +529,9 @@ class Translator:
                 # ไม่ต้องแปลถ้าเป็นภาษาเดียวกัน
                 translated_text = text
             else:
-                translator = GoogleTranslator(source=detected_lang, target=target_language)
+                from deep_translator import GoogleTranslator
+                # ผลตรวจจับในเครื่องใช้รหัสภาษากลาง (เช่น 'zh') - ให้ Google ระบุภาษาต้นฉบับเองในคำขอเดียวกัน
+                translator = GoogleTranslator(source=source_language, target=target_language)
                 translated_text = translator.translate(text)
             
             return {
@@ -180,7 +541,7 @@ class Translator:
             }
             
         except Exception as e:
-            print(f"❌ Google Translate error: {e}")
+            logger.error("❌ Google Translate error: %s", e, extra={'stage': 'translate'})
             raise e
 
     def get_supported_languages(self):
@@ -201,52 +562,38 @@ class Translator:
             dict: ข้อมูลภาษา {'language': str, 'confidence': float, 'language_name': str}
         """
         try:
-            if self.service == 'ollama' and self.ollama_translator:
-                # ใช้การตรวจจับภาษาง่าย ๆ สำหรับ Ollama
-                import re
-                thai_pattern = re.compile(r'[\u0E00-\u0E7F]')
-                english_pattern = re.compile(r'[a-zA-Z]')
-                
-                if thai_pattern.search(text):
-                    detected_lang = 'th'
-                elif english_pattern.search(text):
-                    detected_lang = 'en'
-                else:
-                    detected_lang = 'unknown'
-                
-                language_name = self.supported_languages.get(detected_lang, detected_lang)
-                
-                return {
-                    'language': detected_lang,
-                    'confidence': 0.9,
-                    'language_name': language_name
-                }
-                
-            elif self.service == 'google' and self.google_translator:
-                from deep_translator import single_detection
-                detected_lang = single_detection(text, api_key=None)
-                language_name = self.supported_languages.get(detected_lang, detected_lang)
-                
-                return {
-                    'language': detected_lang,
-                    'confidence': 0.9,  # default confidence for deep-translator
-                    'language_name': language_name
-                }
-            else:
+            if not (self.service == 'ollama' and self.ollama_translator) and not (
+                    self.service == 'google' and self.google_translator):
                 return {
                     'language': 'unknown',
                     'confidence': 0.0,
                     'language_name': 'ไม่ทราบ'
                 }
+            
+            # ตรวจจับจากระบบตัวเขียนในเครื่อง - remote เฉพาะข้อความละตินที่ไม่ชัดเจน
+            detection = detect_language(text, remote=self._remote_detector())
+            detected_lang = detection['language']
+            return {
+                'language': detected_lang,
+                'confidence': detection['confidence'],
+                'language_name': self.supported_languages.get(detected_lang, detected_lang)
+            }
                 
         except Exception as e:
-            print(f"❌ เกิดข้อผิดพลาดในการตรวจจับภาษา: {e}")
+            logger.error("❌ เกิดข้อผิดพลาดในการตรวจจับภาษา: %s", e)
             return {
                 'language': 'error',
                 'confidence': 0.0,
                 'language_name': 'ข้อผิดพลาด'
             }
 
+    def _remote_detector(self):
+        """ฟังก์ชันตรวจจับภาษาระยะไกลของ service ปัจจุบัน (None = ใช้การตรวจจับในเครื่องอย่างเดียว)"""
+        if self.service != 'google' or not self.google_translator:
+            return None
+        from deep_translator import single_detection
+        return lambda text: single_detection(text, api_key=None)
+
     def batch_translate(self, texts, target_language='th', source_language='auto'):
         """แปลข้อความหลายๆ ข้อความ
         
@@ -269,7 +616,7 @@ class Translator:
                 time.sleep(0.1)
                 
             except Exception as e:
-                print(f"❌ เกิดข้อผิดพลาดในการแปลข้อความ: {text[:50]}... - {e}")
+                logger.error("❌ เกิดข้อผิดพลาดในการแปลข้อความ: %s... - %s", text[:50], e)
                 results.append({
                     'translated_text': text,
                     'detected_language': 'error',
@@ -309,13 +656,20 @@ class Translator:
         """ตรวจสอบว่า translator พร้อมใช้งานหรือไม่
         
         Returns:
-            bool: True หากพร้อมใช้งาน
+            bool: True หากพร้อมใช้งาน (service หลัก หรือ service สำรองที่วงจรยังไม่เปิด)
         """
+        self._resolve_service()
         if self.service == 'ollama':
-            return self.ollama_translator is not None and self.ollama_translator.is_available()
+            available = self.ollama_translator is not None and self.ollama_translator.is_available()
         elif self.service == 'google':
-            return self.google_translator is not None
-        return False
+            available = self.google_translator is not None
+        else:
+            available = False
+        if not available:
+            # service หลักใช้ไม่ได้ - translate() ยังสลับไปใช้ service สำรองได้
+            fallback = self._failover_service()
+            available = fallback is not None and self._get_breaker(fallback).state != OPEN
+        return available
     
     def get_service_info(self):
         """ข้อมูลเกี่ยวกับ service ที่ใช้อยู่"""
@@ -343,10 +697,10 @@ class Translator:
             new_service (str): Service ใหม่ ('ollama', 'google')
         """
         if new_service == self.service:
-            print(f"🔄 กำลังใช้ {new_service} อยู่แล้ว")
+            logger.info("🔄 กำลังใช้ %s อยู่แล้ว", new_service)
             return
         
-        print(f"🔄 เปลี่ยนจาก {self.service} เป็น {new_service}")
+        logger.info("🔄 เปลี่ยนจาก %s เป็น %s", self.service, new_service)
         
         old_service = self.service
         self.service = new_service
@@ -354,16 +708,16 @@ class Translator:
         if new_service == 'ollama':
             try:
                 if not self.ollama_translator:
-                    self.ollama_translator = OllamaTranslator()
+                    self.ollama_translator = OllamaTranslator(health=self.health)
                 
                 if self.ollama_translator.is_available():
-                    print("✅ เปลี่ยนเป็น Ollama สำเร็จ")
+                    logger.info("✅ เปลี่ยนเป็น Ollama สำเร็จ")
                     self._update_supported_languages()
                 else:
-                    print("❌ ไม่สามารถใช้ Ollama ได้ กลับไปใช้ service เดิม")
+                    logger.error("❌ ไม่สามารถใช้ Ollama ได้ กลับไปใช้ service เดิม")
                     self.service = old_service
             except Exception as e:
-                print(f"❌ ข้อผิดพลาดในการเปลี่ยนเป็น Ollama: {e}")
+                logger.error("❌ ข้อผิดพลาดในการเปลี่ยนเป็น Ollama: %s", e)
                 self.service = old_service
                 
         elif new_service == 'google':
@@ -372,13 +726,13 @@ class Translator:
                     self._init_google_translator()
                 
                 if self.google_translator:
-                    print("✅ เปลี่ยนเป็น Google Translate สำเร็จ")
+                    logger.info("✅ เปลี่ยนเป็น Google Translate สำเร็จ")
                     self._update_supported_languages()
                 else:
-                    print("❌ ไม่สามารถใช้ Google Translate ได้ กลับไปใช้ service เดิม")
+                    logger.error("❌ ไม่สามารถใช้ Google Translate ได้ กลับไปใช้ service เดิม")
                     self.service = old_service
             except Exception as e:
-                print(f"❌ ข้อผิดพลาดในการเปลี่ยนเป็น Google Translate: {e}")
+                logger.error("❌ ข้อผิดพลาดในการเปลี่ยนเป็น Google Translate: %s", e)
                 self.service = old_service
     
     def _update_supported_languages(self):
@@ -0,0 +1,30 @@
+"""
+English vocabulary for Screen Translator
+คำอังกฤษที่พบบ่อยบนหน้าจอ (UI, เกม, เว็บ) - ใช้ร่วมกันทุก module:
+
+- quality: วัดสัดส่วนคำที่มีความหมายในข้อความ OCR
+- translation_memory: แยกคำจริงออกจากคำที่ OCR อ่านผิด
+- language_detector: ใช้เฉพาะคำไวยากรณ์ (ENGLISH_FUNCTION_WORDS) แยกภาษาอังกฤษออกจากภาษาละตินอื่น
+  คำบนหน้าจอ (menu, message ฯลฯ) ใช้กันในหลายภาษาจึงบอกภาษาไม่ได้
+"""
+
+# คำไวยากรณ์ (article, คำบุพบท, สรรพนาม, กริยาช่วย) ที่พบในข้อความอังกฤษแทบทุกประโยค
+ENGLISH_FUNCTION_WORDS = frozenset(
+    'the a an and or of to in on at for with from by is are was were be been it this that you your we our '
+    'i my he she they their not no yes can will do does did have has had all more new'.split()
+)
+
+ENGLISH_WORDS = ENGLISH_FUNCTION_WORDS | frozenset("""
+about after again also am any as back because before being but
+could day done down each even every first get go good got
+her here him his how if into its just know last like little look make many may me
+most much must next now off ok old one only other out over own people
+please press quit right said same save see should so some start still such take than
+them then there these thing think those through time too two up us use very want
+way well what when where which while who why would
+account add attack back buy cancel chat click close continue copy delete done edit enter error exit
+file find friend game gold health help home inventory item items level load loading log login map
+menu message mission next open option options password pause play player points quest ready
+recent reward score search select send server settings shop show skill skills sign start status
+stop team text update user view wait win
+""".split())
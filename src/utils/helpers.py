@@ -5,10 +5,14 @@ Utils module - Organized helper functions for screen translator application
 import os
 import sys
 import json
+import time
+import queue
+import atexit
 import logging
+import threading
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from PIL import Image, ImageDraw, ImageFont
-import pyautogui
 
 
 # =============================================================================
@@ -131,6 +135,7 @@ def extract_text_from_image(image, engine='tesseract'):
 
 def get_screen_size():
     """ได้ขนาดหน้าจอ"""
+    import pyautogui
     return pyautogui.size()
 
 
@@ -244,18 +249,127 @@ def load_settings(file_path, default_settings=None):
 # LOGGING FUNCTIONS
 # =============================================================================
 
-def setup_logging(log_file='screen_translator.log', level=logging.INFO):
-    """ตั้งค่า logging"""
-    log_path = os.path.join(get_app_data_dir(), log_file)
+# field มาตรฐานของ LogRecord - field อื่นมาจาก extra (เช่น stage, duration_ms) และถูกใส่ลง JSON
+_LOG_RECORD_FIELDS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_log_listener = None
+_log_lock = threading.Lock()
+
+
+class JsonLineFormatter(logging.Formatter):
+    """แปลง log record เป็น JSON หนึ่งบรรทัด (JSONL) พร้อม field จาก extra เช่น stage และ duration_ms"""
+
+    def format(self, record):
+        event = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _LOG_RECORD_FIELDS:
+                event[key] = value
+        if record.exc_info:
+            event['exception'] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """จำกัดข้อความที่ซ้ำ: แต่ละ template (logger + ข้อความก่อนใส่ args) ผ่านได้ burst ครั้งต่อ interval_s วินาที
+
+    ข้อความแรกที่ผ่านในช่วงถัดไปมี field 'suppressed' = จำนวนที่ถูกทิ้งไปในช่วงก่อน
+    ข้อผิดพลาดที่ระดับสูงกว่า WARNING และ logger ใน exempt (เช่น event เวลาของ tracing) ไม่ถูกจำกัด
+    """
+
+    def __init__(self, burst=5, interval_s=10.0, exempt=()):
+        super().__init__()
+        self.burst = burst
+        self.interval_s = interval_s
+        self.exempt = frozenset(exempt)
+        self._windows = {}  # (logger, template) -> [เริ่มช่วง, จำนวนที่ผ่าน, จำนวนที่ทิ้ง]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.WARNING or record.name in self.exempt:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval_s:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+                if len(self._windows) > 4096:
+                    self._windows = {k: w for k, w in self._windows.items() if now - w[0] < self.interval_s}
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+def setup_logging(log_file=None, level=None, module_levels=None, console=None):
+    """ตั้งค่า logging แบบ asynchronous
     
-    logging.basicConfig(
-        level=level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_path, encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
+    ทุก thread แค่ใส่ record ลง queue (QueueHandler) - การเขียนไฟล์ JSONL และ console
+    ทำใน thread ของ QueueListener จึงไม่หน่วง worker ของ capture/OCR/การแปล
+    เรียกซ้ำได้ (ตั้งค่าครั้งแรกครั้งเดียว)
+    
+    Args:
+        log_file (str): ไฟล์ JSONL ในโฟลเดอร์ข้อมูลของแอป (None = ค่าจาก config)
+        level (int|str): ระดับของ root logger (None = ค่าจาก config)
+        module_levels (dict): ระดับแยกตาม logger เช่น {'translation.ocr': 'DEBUG'} (รวมกับค่าจาก config)
+        console (bool): แสดงข้อความบน console ด้วยหรือไม่ (None = ค่าจาก config)
+    
+    Returns:
+        QueueListener: listener ที่เขียน log (หยุดด้วย shutdown_logging)
+    """
+    global _log_listener
+    from config import LOGGING_CONFIG
+    
+    with _log_lock:
+        if _log_listener is not None:
+            return _log_listener
+        
+        config = LOGGING_CONFIG
+        log_path = os.path.join(get_app_data_dir(), log_file or config['log_file'])
+        file_handler = logging.FileHandler(log_path, encoding='utf-8')
+        file_handler.setFormatter(JsonLineFormatter())
+        handlers = [file_handler]
+        if config['console'] if console is None else console:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(logging.Formatter('%(message)s'))
+            handlers.append(console_handler)
+        
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.addFilter(RateLimitFilter(config['rate_limit_burst'], config['rate_limit_interval_s'],
+                                                config['rate_limit_exempt']))
+        root = logging.getLogger()
+        root.setLevel(level or config['level'])
+        root.addHandler(queue_handler)
+        for name, module_level in {**config['levels'], **(module_levels or {})}.items():
+            logging.getLogger(name).setLevel(module_level)
+        
+        _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _log_listener.start()
+        atexit.register(shutdown_logging)
+        return _log_listener
+
+
+def shutdown_logging():
+    """เขียน log ที่ค้างใน queue ให้หมดแล้วหยุด listener"""
+    global _log_listener
+    with _log_lock:
+        listener, _log_listener = _log_listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
 
 
 def create_timestamp():
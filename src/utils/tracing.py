@@ -0,0 +1,212 @@
+"""
+Latency tracing for Screen Translator
+วัดเวลาของแต่ละขั้นตอน (capture, encode, vision request, translate, UI update)
+และเก็บเป็น histogram แบบ rolling เพื่อดู p50/p95/p99
+
+ใช้งาน:
+    from utils.tracing import span, traced
+
+    with span('capture'):
+        ...
+
+    @traced('translate')
+    def translate(...):
+        ...
+
+เมื่อปิดการ trace, span() คืน context manager เปล่าตัวเดียวกันทุกครั้ง - ไม่มีการจับเวลาหรือ lock
+"""
+
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from config import TRACING_CONFIG
+
+# เปิด DEBUG ของ logger นี้ (LOGGING_CONFIG['levels']) = บันทึกทุก span เป็น event ที่มี stage และ duration_ms
+logger = logging.getLogger(__name__)
+
+
+class _NullSpan:
+    """span เปล่าสำหรับตอนปิดการ trace"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """จับเวลาหนึ่งช่วงและบันทึกลง tracer เมื่อจบ"""
+
+    __slots__ = ('tracer', 'name', 'start')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.name, (time.perf_counter() - self.start) * 1000.0, error=exc_type is not None)
+        return False
+
+
+def _percentile(ordered, p: float) -> float:
+    """percentile p จากรายการที่เรียงแล้ว"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+
+class LatencyHistogram:
+    """เก็บเวลาล่าสุด N ค่าของขั้นตอนหนึ่ง สำหรับคำนวณ percentile"""
+
+    def __init__(self, window_size: int):
+        self.samples = deque(maxlen=window_size)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, duration_ms: float, error: bool = False):
+        """เพิ่มเวลาหนึ่งค่า"""
+        self.samples.append(duration_ms)
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        if error:
+            self.errors += 1
+
+    def percentile(self, p: float) -> float:
+        """percentile p ของหน้าต่างปัจจุบัน (หน่วย ms)"""
+        return _percentile(sorted(self.samples), p)
+
+    def snapshot(self) -> Dict:
+        """สรุป percentile ของหน้าต่างปัจจุบัน (หน่วย ms)"""
+        ordered = sorted(self.samples)
+
+        def percentile(p):
+            return _percentile(ordered, p)
+
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'mean_ms': round(self.total_ms / self.count, 2) if self.count else 0.0,
+            'p50_ms': round(percentile(50), 2),
+            'p95_ms': round(percentile(95), 2),
+            'p99_ms': round(percentile(99), 2),
+            'max_ms': round(self.max_ms, 2)
+        }
+
+
+class Tracer:
+    """รวม histogram ของทุกขั้นตอน (thread-safe)"""
+
+    def __init__(self, enabled: bool = True, window_size: int = 512):
+        """
+        Args:
+            enabled (bool): เปิดการจับเวลาหรือไม่
+            window_size (int): จำนวนค่าล่าสุดที่เก็บต่อขั้นตอน
+        """
+        self.enabled = enabled
+        self.window_size = window_size
+        self.started_at = time.time()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str):
+        """context manager สำหรับจับเวลาขั้นตอน name"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, duration_ms: float, error: bool = False):
+        """บันทึกเวลาที่วัดเองจากภายนอก"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram(self.window_size)
+            histogram.add(duration_ms, error)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s %.1fms", name, duration_ms,
+                         extra={'stage': name, 'duration_ms': round(duration_ms, 2), 'error': error})
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """สรุปของทุกขั้นตอน เรียงตามชื่อ"""
+        with self._lock:
+            return {name: self._histograms[name].snapshot() for name in sorted(self._histograms)}
+
+    def reset(self):
+        """ล้างข้อมูลทั้งหมด"""
+        with self._lock:
+            self._histograms.clear()
+            self.started_at = time.time()
+
+    def set_enabled(self, enabled: bool):
+        """เปิด/ปิดการจับเวลา"""
+        self.enabled = enabled
+
+    def export_json(self, path: Optional[str] = None) -> str:
+        """บันทึกสรุปเป็นไฟล์ JSON
+
+        Args:
+            path (str): ไฟล์ปลายทาง (None = ใช้ค่าจาก config ในโฟลเดอร์ข้อมูลของแอป)
+
+        Returns:
+            str: path ของไฟล์ที่บันทึก
+        """
+        if path is None:
+            from utils.helpers import get_app_data_dir
+            path = os.path.join(get_app_data_dir(), TRACING_CONFIG['export_file'])
+
+        data = {
+            'exported_at': time.time(),
+            'window_seconds': round(time.time() - self.started_at, 1),
+            'stages': self.snapshot()
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        return path
+
+
+_tracer = Tracer(enabled=TRACING_CONFIG['enabled'], window_size=TRACING_CONFIG['window_size'])
+
+
+def get_tracer() -> Tracer:
+    """tracer กลางของแอป"""
+    return _tracer
+
+
+def span(name: str):
+    """จับเวลาขั้นตอน name ด้วย tracer กลาง"""
+    return _tracer.span(name)
+
+
+def traced(name: str) -> Callable:
+    """decorator สำหรับจับเวลาทั้งฟังก์ชันด้วย tracer กลาง"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with _Span(_tracer, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
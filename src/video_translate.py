@@ -0,0 +1,115 @@
+"""
+Video CLI for Screen Translator
+แปลข้อความในไฟล์วิดีโอหรือลำดับภาพแบบออฟไลน์ แล้วเขียนเป็นไฟล์ subtitle (SRT)
+
+- decode เฟรมล่วงหน้าใน background thread
+- ใช้ change gate เดียวกับการจับภาพสด - OCR เฉพาะเฟรมที่ข้อความบนจอเปลี่ยน
+- SRT แต่ละช่วงมีคำแปลและข้อความต้นฉบับ
+
+ตัวอย่าง:
+    python video_translate.py gameplay.mp4 -o gameplay.th.srt --region 0,900,1920,180
+    python video_translate.py "frames/frame_*.png" --fps 5 -o tutorial.srt
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import OLLAMA_CONFIG, TRANSLATION_CONFIG, VIDEO_CONFIG
+
+
+def parse_region(value):
+    """แปลง 'x,y,width,height' เป็น tuple"""
+    try:
+        parts = tuple(int(v) for v in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError("region ต้องอยู่ในรูปแบบ x,y,width,height")
+    if len(parts) != 4 or parts[2] <= 0 or parts[3] <= 0:
+        raise argparse.ArgumentTypeError("region ต้องอยู่ในรูปแบบ x,y,width,height")
+    return parts
+
+
+def is_image_sequence(path):
+    """ตรวจว่า input เป็นลำดับภาพ (โฟลเดอร์หรือ glob pattern) หรือไม่"""
+    return os.path.isdir(path) or any(ch in path for ch in '*?[')
+
+
+def build_parser():
+    """สร้าง argument parser"""
+    parser = argparse.ArgumentParser(description="แปลข้อความในวิดีโอ/ลำดับภาพเป็นไฟล์ SRT")
+    parser.add_argument('input', help="ไฟล์วิดีโอ โฟลเดอร์ภาพ หรือ glob pattern ของลำดับภาพ")
+    parser.add_argument('-o', '--output', default=None, help="ไฟล์ SRT (ค่าเริ่มต้น = ชื่อ input + .srt)")
+    parser.add_argument('--region', type=parse_region, default=None,
+                        help="ครอบตัดเฉพาะพื้นที่ x,y,width,height เช่น แถบ subtitle")
+    parser.add_argument('--interval', type=int, default=VIDEO_CONFIG['sample_interval_ms'],
+                        help="สุ่มเฟรมวิดีโอทุก ๆ กี่ milliseconds")
+    parser.add_argument('--fps', type=float, default=VIDEO_CONFIG['sequence_fps'],
+                        help="fps ของลำดับภาพ")
+    parser.add_argument('--vision-model', default=OLLAMA_CONFIG['vision_model'])
+    parser.add_argument('--translation-model', default=OLLAMA_CONFIG['translation_model'])
+    parser.add_argument('--service', default='ollama', choices=['ollama', 'google'])
+    parser.add_argument('--target', default=TRANSLATION_CONFIG['target_language'], help="ภาษาเป้าหมาย")
+    parser.add_argument('--no-translate', action='store_true', help="OCR อย่างเดียว")
+    parser.add_argument('--no-source', action='store_true', help="ไม่ใส่ข้อความต้นฉบับใน SRT")
+    return parser
+
+
+def main(argv=None):
+    """Entry point ของ video CLI"""
+    args = build_parser().parse_args(argv)
+    from utils.helpers import setup_logging
+    setup_logging()
+
+    from translation.ocr import OCR
+    from translation.pipeline import Pipeline
+    from translation.sinks import SrtSink
+    from translation.sources import ImageSequenceSource, VideoSource
+    from translation.translator import Translator
+
+    output = args.output or os.path.splitext(args.input.rstrip('/\\*'))[0] + '.srt'
+
+    if is_image_sequence(args.input):
+        source = ImageSequenceSource(args.input, fps=args.fps, region=args.region)
+    elif os.path.isfile(args.input):
+        source = VideoSource(args.input, sample_interval_ms=args.interval, region=args.region)
+    else:
+        print(f"❌ ไม่พบไฟล์: {args.input}")
+        return 1
+
+    ocr = OCR(vision_model=args.vision_model)
+    translator = None
+    if not args.no_translate:
+        translator = Translator(service=args.service, ollama_model=args.translation_model)
+
+    srt = SrtSink(output, include_source=not args.no_source)
+    pipeline = Pipeline(source, ocr, translator, sinks=[srt], target_language=args.target,
+                        auto_translate=not args.no_translate)
+
+    print(f"🎬 เริ่มแปล: {args.input} -> {output}")
+    started = time.perf_counter()
+    pipeline.start()
+    try:
+        while pipeline.is_running():
+            pipeline.wait(0.5)
+    except KeyboardInterrupt:
+        print("\n🛑 ถูกขัดจังหวะ - เขียน subtitle เท่าที่แปลได้")
+        pipeline.stop()
+        source.close()
+
+    cues = srt.close(source.duration)
+    elapsed = time.perf_counter() - started
+    stats = pipeline.stats()
+    source_stats = stats['source']
+    print("=" * 60)
+    print(f"📊 เขียน {cues} ช่วงลง {output}")
+    print(f"   ความยาวสื่อ: {source_stats['duration']:.1f}s | ใช้เวลา: {elapsed:.1f}s")
+    print(f"   เฟรมที่สุ่ม: {source_stats['sampled']} | ไม่เปลี่ยน: {source_stats['unchanged']} "
+          f"| ส่ง OCR: {source_stats['dispatched']} | แปล: {stats['translations']}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for Screen Translator
+วัด throughput, latency percentile และหน่วยความจำของ OCR, OllamaTranslator, Translator
+และ capture pipeline กับ stub Ollama server (ออฟไลน์ทั้งหมด)
+
+ผลลัพธ์ถูกเทียบกับ baselines.json - ถ้าช้าลงหรือใช้หน่วยความจำมากขึ้นเกิน tolerance จะจบด้วย exit code 1
+
+ใช้งาน:
+    python tests/benchmarks/run_benchmarks.py
+    python tests/benchmarks/run_benchmarks.py --only ocr_single translator
+    python tests/benchmarks/run_benchmarks.py --images recorded_screens/
+    python tests/benchmarks/run_benchmarks.py --update-baselines   # บันทึก baseline ใหม่บนเครื่องนี้
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(os.path.dirname(os.path.dirname(HERE)), 'src')
+sys.path.insert(0, SRC)
+sys.path.insert(0, HERE)
+
+from PIL import Image, ImageDraw
+
+from config import CACHE_CONFIG, OLLAMA_CONFIG, TRANSLATION_CONFIG, TRANSLATION_MEMORY_CONFIG
+from stub_ollama import StubOllamaServer
+
+BASELINE_FILE = os.path.join(HERE, 'baselines.json')
+SAMPLE_TEXTS = [
+    'Press START to continue',
+    'Your inventory is full. Drop an item to pick this up.',
+    'Quest complete! Return to the village elder for your reward.',
+    'Connection lost. Retrying in 5 seconds...',
+    'Settings have been saved.',
+]
+
+
+# =============================================================================
+# INPUT DATA
+# =============================================================================
+
+def synthetic_images(count, size=(480, 120)):
+    """สร้างภาพข้อความแบบกำหนดได้ (ใช้แทนภาพที่บันทึกไว้เมื่อไม่ได้ระบุ --images)"""
+    images = []
+    for i in range(count):
+        image = Image.new('RGB', size, color=(20 + i % 5 * 10, 20, 30))
+        draw = ImageDraw.Draw(image)
+        draw.text((10, 10), SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)], fill=(255, 255, 255))
+        draw.text((10, 60), f"#{i:04d}", fill=(200, 200, 0))
+        images.append(image)
+    return images
+
+
+def recorded_images(directory, count):
+    """โหลดภาพที่บันทึกไว้ วนซ้ำจนครบ count"""
+    paths = sorted(p for p in glob.glob(os.path.join(directory, '*'))
+                   if p.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.webp')))
+    if not paths:
+        raise SystemExit(f"❌ ไม่พบภาพใน {directory}")
+    loaded = []
+    for path in paths[:count]:
+        with Image.open(path) as image:
+            loaded.append(image.convert('RGB'))
+    return [loaded[i % len(loaded)] for i in range(count)]
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def percentile(values, p):
+    """percentile แบบ nearest-rank"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+
+def measure(make_op, iterations, warmup=2, alloc_iterations=10, quiet=True):
+    """รัน benchmark หนึ่งตัว
+
+    Args:
+        make_op (callable): factory ที่คืนฟังก์ชัน op(i) - ถูกเรียกใหม่สำหรับรอบวัดเวลาและรอบวัดหน่วยความจำ
+        iterations (int): จำนวนครั้งในรอบวัดเวลา
+        warmup (int): จำนวนครั้งที่ไม่นับก่อนเริ่มวัด
+        alloc_iterations (int): จำนวนครั้งในรอบวัดหน่วยความจำ (tracemalloc ช้า จึงแยกรอบ)
+
+    Returns:
+        dict: ops, seconds, ops_per_sec, p50_ms, p95_ms, p99_ms, alloc_peak_kb
+    """
+    output = io.StringIO() if quiet else sys.stdout
+    with contextlib.redirect_stdout(output):
+        op = make_op()
+        for i in range(warmup):
+            op(i)
+
+        latencies = []
+        started = time.perf_counter()
+        for i in range(iterations):
+            op_started = time.perf_counter()
+            op(warmup + i)
+            latencies.append((time.perf_counter() - op_started) * 1000.0)
+        elapsed = time.perf_counter() - started
+
+        op = make_op()
+        op(0)
+        tracemalloc.start()
+        try:
+            for i in range(min(iterations, alloc_iterations)):
+                op(1 + i)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return {
+        'ops': iterations,
+        'seconds': round(elapsed, 3),
+        'ops_per_sec': round(iterations / elapsed, 2) if elapsed > 0 else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'alloc_peak_kb': round(peak / 1024.0, 1),
+    }
+
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+
+def build_benchmarks(images, vision_model, translation_model, servers=(), usage=None):
+    """คืน dict ชื่อ -> factory ของ op แต่ละตัว (servers = stub ทุกตัวสำหรับ node pool)
+
+    usage: dict ที่ benchmark ของ OllamaTranslator ใส่ฟังก์ชัน usage_stats ไว้ (ชื่อ -> callable)
+    """
+    usage = {} if usage is None else usage
+    from concurrent.futures import ThreadPoolExecutor
+    from translation.change_detection import ChangeGate
+    from translation.node_pool import ROLE_TRANSLATION, NodePool, OllamaNode
+    from translation.ocr import OCR
+    from translation.ollama_translator import OllamaTranslator
+    from translation.pipeline import Pipeline
+    from translation.regions import RegionScheduler
+    from translation.sources import ImageListSource
+    from translation.translation_memory import TranslationMemory
+    from translation.translator import Translator
+
+    screen = Image.new('RGB', (1920, 1080), color=(0, 0, 0))
+    for i, image in enumerate(images[:6]):
+        screen.paste(image, (40 + (i % 3) * 600, 100 + (i // 3) * 400))
+
+    def change_gate():
+        gate = ChangeGate(threshold=4.0, fingerprint_size=(32, 32))
+        return lambda i: gate.check(images[i % len(images)])
+
+    def scheduler_tick():
+        frames = [screen, screen.transpose(Image.FLIP_LEFT_RIGHT)]
+        state = {'tick': 0}
+
+        def capture(region):
+            x, y, width, height = region
+            return frames[state['tick'] % 2].crop((x, y, x + width, y + height))
+
+        scheduler = RegionScheduler(capture)
+        scheduler.add_region('a', (40, 100, 480, 120), interval_ms=0)
+        scheduler.add_region('b', (640, 100, 480, 120), interval_ms=0)
+        scheduler.add_region('c', (1240, 500, 480, 120), interval_ms=0)
+
+        def op(i):
+            state['tick'] = i
+            scheduler.tick(now=time.monotonic() + i)
+        return op
+
+    def ocr_encode():
+        ocr = OCR(vision_model=vision_model, cache=None)
+        return lambda i: ocr._encode_image(images[i % len(images)])
+
+    def ocr_single():
+        ocr = OCR(vision_model=vision_model, cache=None)
+        return lambda i: ocr.extract_text(images[i % len(images)])
+
+    def ocr_batch4():
+        ocr = OCR(vision_model=vision_model, cache=None)
+        return lambda i: ocr.extract_text_batch([images[(i * 4 + k) % len(images)] for k in range(4)])
+
+    def ollama_translator():
+        translator = OllamaTranslator(model=translation_model, api_mode='generate')
+        usage['ollama_translator'] = translator.usage_stats
+        return lambda i: translator.translate(f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} ({i})")
+
+    def ollama_chat():
+        # คำสั่งแปลเป็น system message คงที่ - เทียบ prompt_eval_count กับ ollama_translator
+        translator = OllamaTranslator(model=translation_model, api_mode='chat')
+        usage['ollama_chat'] = translator.usage_stats
+        return lambda i: translator.translate(f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} ({i})")
+
+    def translator():
+        translator = Translator(service='ollama', ollama_model=translation_model, cache=None)
+        return lambda i: translator.translate(f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} ({i})")
+
+    def node_pool():
+        # แปล 4 ข้อความพร้อมกัน กระจายไป stub หลายตัวที่ port ต่างกัน
+        pool = NodePool([OllamaNode(server.host, server.port, roles=[ROLE_TRANSLATION]) for server in servers])
+        translator = OllamaTranslator(model=translation_model, pool=pool)
+        executor = ThreadPoolExecutor(max_workers=4)
+
+        def op(i):
+            texts = [f"{SAMPLE_TEXTS[(i * 4 + k) % len(SAMPLE_TEXTS)]} ({i}.{k})" for k in range(4)]
+            list(executor.map(translator.translate, texts))
+        return op
+
+    def translation_memory():
+        # คลัง 50,000 ข้อความ ค้นหาข้อความที่ตัวเลขเปลี่ยนและมีตัวอักษรที่ OCR อ่านผิดหนึ่งตัว
+        import random
+        rnd = random.Random(0)
+        letters = 'abcdefghijklmnopqrstuvwxyz'
+        vocab = [''.join(rnd.choice(letters) for _ in range(rnd.randint(3, 9))) for _ in range(5000)]
+        memory = TranslationMemory(max_entries=10 ** 6)
+        sources = []
+        for n in range(50000):
+            source = ' '.join(rnd.choice(vocab) for _ in range(rnd.randint(3, 10))) + f" {n % 100}"
+            sources.append(source)
+            memory.add(source, f"คำแปล {n % 100}")
+
+        def op(i):
+            words = sources[(i * 7919) % len(sources)].split()
+            words[0] = words[0][:-1] + '1'
+            words[-1] = str(i % 1000)
+            memory.lookup(' '.join(words))
+        return op
+
+    def pipeline():
+        ocr = OCR(vision_model=vision_model, cache=None)
+        translator = Translator(service='ollama', ollama_model=translation_model, cache=None)
+        source = ImageListSource(images[i % len(images)] for i in range(10 ** 6))
+        pipe = Pipeline(source, ocr, translator)
+        return lambda i: pipe.run_once()
+
+    return {
+        'change_gate': change_gate,
+        'scheduler_tick': scheduler_tick,
+        'ocr_encode': ocr_encode,
+        'ocr_single': ocr_single,
+        'ocr_batch4': ocr_batch4,
+        'ollama_translator': ollama_translator,
+        'ollama_chat': ollama_chat,
+        'translator': translator,
+        'node_pool': node_pool,
+        'translation_memory': translation_memory,
+        'pipeline': pipeline,
+    }
+
+
+# =============================================================================
+# BASELINES
+# =============================================================================
+
+def load_baselines(path):
+    """โหลด baseline (ไม่มีไฟล์ = ไม่มีการเทียบ)"""
+    if not os.path.exists(path):
+        return {'tolerance': 0.3, 'benchmarks': {}}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def find_regressions(name, result, baseline, tolerance):
+    """เทียบผลกับ baseline - คืนรายการข้อความของค่าที่แย่ลงเกิน tolerance
+
+    latency มี slack ขั้นต่ำ 1ms และหน่วยความจำ 64KB เพื่อไม่ให้ benchmark ที่เร็วมากสะดุดเพราะ noise
+    """
+    problems = []
+    if baseline.get('ops_per_sec') and result['ops_per_sec'] < baseline['ops_per_sec'] * (1 - tolerance):
+        problems.append(f"{name}: throughput {result['ops_per_sec']}/s < baseline {baseline['ops_per_sec']}/s")
+    if 'p95_ms' in baseline and result['p95_ms'] > max(baseline['p95_ms'] * (1 + tolerance), baseline['p95_ms'] + 1.0):
+        problems.append(f"{name}: p95 {result['p95_ms']}ms > baseline {baseline['p95_ms']}ms")
+    if 'alloc_peak_kb' in baseline and \
+            result['alloc_peak_kb'] > max(baseline['alloc_peak_kb'] * (1 + tolerance), baseline['alloc_peak_kb'] + 64):
+        problems.append(f"{name}: peak alloc {result['alloc_peak_kb']}KB > baseline {baseline['alloc_peak_kb']}KB")
+    return problems
+
+
+def print_table(results):
+    """แสดงผลเป็นตาราง"""
+    print(f"{'benchmark':<20}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KB':>10}")
+    print("-" * 70)
+    for name, r in results.items():
+        print(f"{name:<20}{r['ops_per_sec']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['alloc_peak_kb']:>10.1f}")
+
+
+def print_usage(usage):
+    """แสดงจำนวน token ที่ Ollama ต้องประมวลผลใน prompt ต่อคำขอ (prompt_eval_count/duration)"""
+    rows = [(name, endpoint, stats) for name, usage_stats in usage.items()
+            for endpoint, stats in usage_stats().items()]
+    if not rows:
+        return
+    print()
+    print(f"{'prompt eval':<20}{'endpoint':>14}{'tokens/req':>12}{'ms/req':>10}{'eval/req':>10}")
+    print("-" * 66)
+    for name, endpoint, stats in rows:
+        print(f"{name:<20}{endpoint:>14}{stats['avg_prompt_eval_count']:>12.1f}"
+              f"{stats['avg_prompt_eval_ms']:>10.2f}{stats['avg_eval_count']:>10.1f}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark Screen Translator กับ stub Ollama")
+    parser.add_argument('--only', nargs='+', help="รันเฉพาะ benchmark ที่ระบุ")
+    parser.add_argument('--iterations', type=int, default=40, help="จำนวนครั้งต่อ benchmark")
+    parser.add_argument('--images', help="โฟลเดอร์ภาพที่บันทึกไว้ (ค่าเริ่มต้น = ภาพสังเคราะห์)")
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="latency ของ stub server")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="latency สุ่มเพิ่มของ stub server")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="สัดส่วนคำขอที่ stub ตอบ HTTP 500")
+    parser.add_argument('--baselines', default=BASELINE_FILE, help="ไฟล์ baseline")
+    parser.add_argument('--tolerance', type=float, default=None, help="ยอมให้แย่ลงได้กี่เท่า (เช่น 0.3 = 30%%)")
+    parser.add_argument('--update-baselines', action='store_true', help="บันทึกผลรอบนี้เป็น baseline")
+    parser.add_argument('--json', help="บันทึกผลเป็นไฟล์ JSON")
+    parser.add_argument('--verbose', action='store_true', help="แสดง output ของโค้ดที่ถูกวัด")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # ปิด cache เพื่อวัดเส้นทางจริง และไม่แตะไฟล์ cache ของผู้ใช้
+    CACHE_CONFIG['enable_ocr_cache'] = False
+    TRANSLATION_CONFIG['enable_cache'] = False
+    TRANSLATION_MEMORY_CONFIG['enabled'] = False  # benchmark translation_memory สร้างคลังของตัวเอง
+
+    server = StubOllamaServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                              error_rate=args.error_rate).start()
+    OLLAMA_CONFIG['host'], OLLAMA_CONFIG['port'] = server.host, server.port
+    vision_model = translation_model = server.models[0]
+    # stub เพิ่มอีกสองตัวสำหรับ benchmark node_pool
+    extra_servers = [StubOllamaServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                                      error_rate=args.error_rate).start() for _ in range(2)]
+
+    try:
+        count = max(args.iterations, 8)
+        images = recorded_images(args.images, count) if args.images else synthetic_images(count)
+        usage = {}
+        benchmarks = build_benchmarks(images, vision_model, translation_model, [server] + extra_servers, usage)
+        names = args.only or list(benchmarks)
+        unknown = [name for name in names if name not in benchmarks]
+        if unknown:
+            print(f"❌ ไม่รู้จัก benchmark: {', '.join(unknown)} (มี: {', '.join(benchmarks)})")
+            return 2
+
+        print(f"🧪 Stub Ollama: {server.base_url} (latency {args.latency_ms}ms)")
+        results = {}
+        for name in names:
+            print(f"🔄 {name}...")
+            results[name] = measure(benchmarks[name], args.iterations, quiet=not args.verbose)
+    finally:
+        server.stop()
+        for extra in extra_servers:
+            extra.stop()
+
+    print()
+    print_table(results)
+    print_usage(usage)
+
+    baselines = load_baselines(args.baselines)
+    tolerance = args.tolerance if args.tolerance is not None else baselines.get('tolerance', 0.3)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'results': results, 'stub_latency_ms': args.latency_ms}, f, indent=2)
+
+    if args.update_baselines:
+        baselines.setdefault('benchmarks', {}).update(
+            {name: {k: r[k] for k in ('ops_per_sec', 'p95_ms', 'alloc_peak_kb')} for name, r in results.items()})
+        baselines['tolerance'] = tolerance
+        baselines['stub_latency_ms'] = args.latency_ms
+        with open(args.baselines, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2)
+            f.write('\n')
+        print(f"\n💾 บันทึก baseline ไปที่ {args.baselines}")
+        return 0
+
+    if baselines.get('stub_latency_ms') not in (None, args.latency_ms):
+        print(f"\n⚠️ baseline วัดที่ stub latency {baselines['stub_latency_ms']}ms - ข้ามการเทียบ")
+        return 0
+
+    problems = []
+    for name, result in results.items():
+        if name in baselines.get('benchmarks', {}):
+            problems.extend(find_regressions(name, result, baselines['benchmarks'][name], tolerance))
+
+    if problems:
+        print(f"\n❌ พบ regression (tolerance {tolerance:.0%}):")
+        for problem in problems:
+            print(f"   - {problem}")
+        return 1
+
+    print(f"\n✅ ไม่พบ regression (tolerance {tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
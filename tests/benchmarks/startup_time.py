@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for Screen Translator
+วัดเวลาตั้งแต่เริ่ม import จนหน้าต่างหลักแสดง (time-to-window-shown) ใน process ใหม่ทุกครั้ง
+
+stub Ollama ตอบช้าโดยตั้งใจ (--latency-ms) - ถ้าหน้าต่างยังรอ network ตอนเปิด เวลาจะเกิน budget ทันที
+และตรวจว่า module หนัก (cv2, numpy, deep_translator, pyautogui) ไม่ถูก import ตอนเปิดแอป
+
+ใช้งาน:
+    python tests/benchmarks/startup_time.py
+    python tests/benchmarks/startup_time.py --runs 10 --budget-ms 1200
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(os.path.dirname(os.path.dirname(HERE)), 'src')
+sys.path.insert(0, HERE)
+
+from stub_ollama import StubOllamaServer
+
+BASELINE_FILE = os.path.join(HERE, 'baselines.json')
+HEAVY_MODULES = ('cv2', 'numpy', 'deep_translator', 'pyautogui')
+
+# โค้ดที่รันใน process ลูก - จับเวลาตั้งแต่บรรทัดแรกจนหน้าต่างแสดงและ event loop ทำงานหนึ่งรอบ
+CHILD_SCRIPT = r'''
+import time
+started = time.perf_counter()
+import json, os, sys
+sys.path.insert(0, {src!r})
+from config import OLLAMA_CONFIG
+OLLAMA_CONFIG['host'], OLLAMA_CONFIG['port'] = {host!r}, {port!r}
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+imported = time.perf_counter()
+from gui.window import Window
+window = Window()
+window.show()
+app.processEvents()
+shown = time.perf_counter()
+print(json.dumps({{
+    'window_shown_ms': (shown - started) * 1000.0,
+    'import_ms': (imported - started) * 1000.0,
+    'heavy_modules': [m for m in {heavy!r} if m in sys.modules],
+}}))
+sys.stdout.flush()
+os._exit(0)
+'''
+
+
+def run_once(server, platform):
+    """เปิดแอปใน process ใหม่หนึ่งครั้ง คืนผลการวัด"""
+    env = dict(os.environ)
+    if platform:
+        env['QT_QPA_PLATFORM'] = platform
+    script = CHILD_SCRIPT.format(src=SRC, host=server.host, port=server.port, heavy=HEAVY_MODULES)
+
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                               env=env, timeout=120)
+    wall_ms = (time.perf_counter() - started) * 1000.0
+    if completed.returncode != 0:
+        raise SystemExit(f"❌ เปิดแอปไม่สำเร็จ:\n{completed.stderr}")
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['process_ms'] = wall_ms
+    return result
+
+
+def load_budget(path):
+    """อ่าน budget จาก baselines.json"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('startup', {}).get('budget_ms')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="วัดเวลาเปิดแอปจนหน้าต่างแสดง")
+    parser.add_argument('--runs', type=int, default=5, help="จำนวนครั้งที่เปิดแอป (ใช้ค่ากลาง)")
+    parser.add_argument('--latency-ms', type=float, default=3000.0, help="latency ของ stub Ollama")
+    parser.add_argument('--budget-ms', type=float, default=None, help="budget ของ time-to-window-shown")
+    parser.add_argument('--baselines', default=BASELINE_FILE, help="ไฟล์ baseline ที่เก็บ budget")
+    parser.add_argument('--platform', default=None if os.environ.get('DISPLAY') or os.name == 'nt' else 'offscreen',
+                        help="QT_QPA_PLATFORM ของ process ลูก")
+    args = parser.parse_args(argv)
+
+    budget = args.budget_ms if args.budget_ms is not None else load_budget(args.baselines)
+
+    # stub ตอบช้าทุก endpoint - รวมถึง /api/tags ที่ใช้ค้นหา models
+    with StubOllamaServer(latency_ms=args.latency_ms, get_latency_ms=args.latency_ms) as server:
+        results = []
+        for i in range(args.runs):
+            result = run_once(server, args.platform)
+            results.append(result)
+            print(f"🔄 รอบที่ {i + 1}: หน้าต่างแสดงใน {result['window_shown_ms']:.0f}ms "
+                  f"(import Qt {result['import_ms']:.0f}ms, ทั้ง process {result['process_ms']:.0f}ms)")
+
+    shown = sorted(r['window_shown_ms'] for r in results)
+    median = shown[len(shown) // 2]
+    heavy = sorted({m for r in results for m in r['heavy_modules']})
+
+    print("=" * 60)
+    print(f"📊 time-to-window-shown (ค่ากลาง): {median:.0f}ms | ต่ำสุด {shown[0]:.0f}ms | สูงสุด {shown[-1]:.0f}ms")
+    failed = False
+    if heavy:
+        print(f"❌ module หนักถูก import ตอนเปิดแอป: {', '.join(heavy)}")
+        failed = True
+    if budget is not None:
+        if median > budget:
+            print(f"❌ เกิน budget {budget:.0f}ms")
+            failed = True
+        else:
+            print(f"✅ อยู่ใน budget {budget:.0f}ms")
+    print("=" * 60)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Stub Ollama server for benchmarks
+HTTP server ปลอมที่ตอบเหมือน Ollama (/api/tags, /api/show, /api/generate, /api/chat, /api/ps) ทำงานแบบออฟไลน์ทั้งหมด
+กำหนด latency, streaming และการจำลองข้อผิดพลาดได้
+จำลอง prompt cache ของ Ollama ด้วย: prompt_eval_count นับเฉพาะส่วนที่ไม่ซ้ำกับ prefix ของคำขอก่อนหน้า (ต่อ model)
+
+ใช้งานใน benchmark:
+    server = StubOllamaServer(latency_ms=20).start()
+    ... server.port ...
+    server.stop()
+
+หรือรันแยกเพื่อทดสอบแอปโดยไม่มี Ollama จริง:
+    python tests/benchmarks/stub_ollama.py --port 11434 --latency-ms 200
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_MODELS = ['gemma3:4b', 'llava:7b', 'llama3.2:3b']
+DEFAULT_VISION_MODELS = ['gemma3:4b', 'llava:7b']
+DEFAULT_OCR_TEXTS = [
+    'Hello world',
+    'Press START to continue',
+    'Your inventory is full.',
+    'Quest complete! Return to the village elder.',
+]
+DEFAULT_TRANSLATION = 'สวัสดีชาวโลก'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """จัดการคำขอแต่ละครั้ง - สถานะทั้งหมดอยู่ที่ self.server.stub"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        # header และ body ถูกเขียนแยกกัน - ปิด Nagle เพื่อไม่ให้ติด delayed ACK (~40ms) บน keep-alive
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def stub(self):
+        return self.server.stub
+
+    def _send_json(self, obj, status=200):
+        body = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        self.stub.count('GET ' + self.path)
+        if self.stub.get_latency_ms:
+            time.sleep(self.stub.get_latency_ms / 1000.0)
+        if self.path == '/api/tags':
+            self._send_json({'models': [self.stub.model_info(name) for name in self.stub.models]})
+        elif self.path == '/api/ps':
+            self._send_json({'models': self.stub.loaded_models()})
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+    def do_POST(self):
+        self.stub.count('POST ' + self.path)
+        body = self._read_json()
+        if self.path == '/api/show':
+            name = body.get('model') or body.get('name', '')
+            if name not in self.stub.models:
+                self._send_json({'error': f"model '{name}' not found"}, status=404)
+            else:
+                self._send_json(self.stub.show_info(name))
+            return
+        if self.path not in ('/api/generate', '/api/chat'):
+            self._send_json({'error': 'not found'}, status=404)
+            return
+
+        model = body.get('model', '')
+        if model not in self.stub.models:
+            self._send_json({'error': f"model '{model}' not found"}, status=404)
+            return
+
+        chat = self.path == '/api/chat'
+        if chat:
+            messages = body.get('messages') or []
+            images = [img for message in messages for img in message.get('images') or []]
+            # ข้อความที่ model เห็นจริงหลังใส่ chat template
+            prompt = "".join(f"<|{m.get('role', 'user')}|>{m.get('content', '')}" for m in messages)
+        else:
+            images = body.get('images') or []
+            prompt = body.get('prompt', '')
+
+        self.stub.wait(len(images))
+        if self.stub.should_fail():
+            self._send_json({'error': 'injected failure'}, status=500)
+            return
+
+        self.stub.mark_loaded(model)
+        text = self.stub.respond(prompt, images)
+        text, done_reason = self.stub.apply_options(text, body.get('options') or {})
+        final = self.stub.final_fields(model, prompt, text, done_reason)
+
+        def content(piece):
+            return {'message': {'role': 'assistant', 'content': piece}} if chat else {'response': piece}
+
+        # Ollama ใช้ stream=True เป็นค่าเริ่มต้น
+        if body.get('stream', True):
+            self._stream(model, text, final, content)
+        else:
+            self._send_json(dict(final, **content(text)))
+
+    def _stream(self, model, text, final, content):
+        """ส่งผลลัพธ์เป็น NDJSON ทีละคำ แบบเดียวกับ Ollama"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        def write_chunk(obj):
+            data = (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        try:
+            words = text.split(' ')
+            for i, word in enumerate(words):
+                if self.stub.stream_chunk_ms:
+                    time.sleep(self.stub.stream_chunk_ms / 1000.0)
+                piece = word if i == len(words) - 1 else word + ' '
+                write_chunk(dict({'model': model, 'created_at': _now(), 'done': False}, **content(piece)))
+            write_chunk(dict(final, **content('')))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # client ยกเลิกคำขอกลางคัน
+            self.stub.count('cancelled')
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class StubOllamaServer:
+    """Ollama ปลอมสำหรับ benchmark และการทดสอบแบบออฟไลน์"""
+
+    def __init__(self, host='127.0.0.1', port=0, models=None, vision_models=None, latency_ms=20.0, jitter_ms=0.0,
+                 per_image_ms=0.0, stream_chunk_ms=0.0, error_rate=0.0, ocr_texts=None,
+                 translation=DEFAULT_TRANSLATION, get_latency_ms=0.0, seed=0):
+        """
+        Args:
+            host (str): host ที่ bind
+            port (int): port (0 = สุ่ม port ว่าง)
+            models (list): ชื่อ models ที่ /api/tags แสดง
+            vision_models (list): models ที่ /api/show บอกว่าอ่านภาพได้
+            latency_ms (float): เวลาตอบพื้นฐานของ /api/generate
+            jitter_ms (float): latency สุ่มเพิ่ม 0..jitter_ms
+            per_image_ms (float): latency เพิ่มต่อภาพ (จำลอง vision model)
+            stream_chunk_ms (float): หน่วงเวลาต่อ chunk เมื่อ stream
+            error_rate (float): สัดส่วนคำขอที่ตอบ HTTP 500
+            ocr_texts (list): ข้อความที่ตอบสำหรับภาพ (เลือกตาม hash ของภาพ)
+            translation (str): ข้อความที่ตอบสำหรับคำขอแปล
+            get_latency_ms (float): เวลาตอบของ GET endpoints (/api/tags, /api/ps)
+            seed (int): seed ของการสุ่ม
+        """
+        self.host = host
+        self.port = port
+        self.models = list(models or DEFAULT_MODELS)
+        self.vision_models = set(DEFAULT_VISION_MODELS if vision_models is None else vision_models)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.per_image_ms = per_image_ms
+        self.stream_chunk_ms = stream_chunk_ms
+        self.error_rate = error_rate
+        self.ocr_texts = list(ocr_texts or DEFAULT_OCR_TEXTS)
+        self.translation = translation
+        self.get_latency_ms = get_latency_ms
+        self.counters = {}
+        self._loaded = {}
+        self._last_prompt = {}  # model -> prompt ล่าสุด (จำลอง KV cache ของ prefix)
+        self._fail_next = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        """เริ่ม server ใน background thread"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stub-ollama', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """หยุด server"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ----- การจำลองพฤติกรรม -----
+
+    def fail_next(self, count=1):
+        """ให้คำขอ /api/generate ถัดไป count ครั้งตอบ HTTP 500"""
+        with self._lock:
+            self._fail_next += count
+
+    def should_fail(self):
+        with self._lock:
+            if self._fail_next > 0:
+                self._fail_next -= 1
+                return True
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def wait(self, image_count=0):
+        """หน่วงเวลาตามการตั้งค่า latency"""
+        with self._lock:
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+        delay = self.latency_ms + jitter + self.per_image_ms * image_count
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def count(self, key):
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def respond(self, prompt, images):
+        """สร้างข้อความตอบ - OCR สำหรับคำขอที่มีภาพ, คำแปลสำหรับคำขอข้อความ"""
+        if not images:
+            return self.translation
+        texts = [self.ocr_texts[int(hashlib.sha1(img.encode()).hexdigest(), 16) % len(self.ocr_texts)]
+                 for img in images]
+        if len(texts) == 1:
+            return texts[0]
+        return "\n".join(f"=== IMAGE {i} ===\n{text}" for i, text in enumerate(texts, 1))
+
+    def apply_options(self, text, options):
+        """ใช้ stop และ num_predict กับคำตอบแบบเดียวกับ Ollama (1 token ~ 4 ตัวอักษร)
+
+        Returns:
+            tuple: (ข้อความ, done_reason) - 'length' ถ้าถูกตัดเพราะครบ num_predict
+        """
+        for stop in options.get('stop') or []:
+            if stop and stop in text:
+                text = text[:text.index(stop)]
+        num_predict = options.get('num_predict')
+        if num_predict is not None and 0 <= num_predict < len(text) / 4:
+            self.count('truncated')
+            return text[:num_predict * 4], 'length'
+        return text, 'stop'
+
+    def final_fields(self, model, prompt, text, done_reason='stop'):
+        """ฟิลด์สถิติท้ายคำตอบแบบเดียวกับ Ollama (ค่าประมาณ)
+
+        prompt_eval_count นับเฉพาะ token ที่ไม่ซ้ำกับ prefix ของ prompt ก่อนหน้าของ model เดียวกัน
+        เหมือน Ollama ที่ใช้ KV cache ของส่วนต้นที่ตรงกันซ้ำ
+        """
+        with self._lock:
+            previous = self._last_prompt.get(model, '')
+            self._last_prompt[model] = prompt
+        shared = 0
+        for a, b in zip(previous, prompt):
+            if a != b:
+                break
+            shared += 1
+        prompt_tokens = max(1, (len(prompt) - shared) // 4)
+        eval_tokens = max(1, -(-len(text) // 4))
+        return {
+            'model': model,
+            'created_at': _now(),
+            'done': True,
+            'done_reason': done_reason,
+            'total_duration': int(self.latency_ms * 1e6),
+            'load_duration': 0,
+            'prompt_eval_count': prompt_tokens,
+            'prompt_eval_duration': prompt_tokens * 100_000,  # ~0.1ms ต่อ token
+            'eval_count': eval_tokens,
+            'eval_duration': int(self.latency_ms * 0.7 * 1e6),
+        }
+
+    def model_info(self, name):
+        return {
+            'name': name,
+            'model': name,
+            'modified_at': '2024-01-01T00:00:00Z',
+            'size': 3_300_000_000,
+            'digest': hashlib.sha256(name.encode()).hexdigest(),
+            'details': {'family': name.split(':')[0], 'parameter_size': name.split(':')[-1].upper()},
+        }
+
+    def show_info(self, name):
+        """ข้อมูลแบบ /api/show"""
+        family = name.split(':')[0]
+        capabilities = ['completion'] + (['vision'] if name in self.vision_models else [])
+        return {
+            'modelfile': f'FROM {name}',
+            'details': {'family': family, 'families': [family], 'format': 'gguf',
+                        'parameter_size': name.split(':')[-1].upper(), 'quantization_level': 'Q4_K_M'},
+            'model_info': {'general.architecture': family, f'{family}.context_length': 8192},
+            'capabilities': capabilities,
+        }
+
+    def mark_loaded(self, model):
+        with self._lock:
+            self._loaded[model] = time.time()
+
+    def loaded_models(self):
+        with self._lock:
+            loaded = dict(self._loaded)
+        return [
+            dict(self.model_info(name), size_vram=3_300_000_000,
+                 expires_at=(datetime.fromtimestamp(at, timezone.utc) + timedelta(minutes=5)).isoformat())
+            for name, at in loaded.items()
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ollama ปลอมสำหรับทดสอบแบบออฟไลน์")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--latency-ms', type=float, default=20.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--per-image-ms', type=float, default=0.0)
+    parser.add_argument('--stream-chunk-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubOllamaServer(host=args.host, port=args.port, latency_ms=args.latency_ms,
+                              jitter_ms=args.jitter_ms, per_image_ms=args.per_image_ms,
+                              stream_chunk_ms=args.stream_chunk_ms, error_rate=args.error_rate).start()
+    print(f"🧪 Stub Ollama ทำงานที่ {server.base_url} (Ctrl+C เพื่อหยุด)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""ให้ test import โมดูลใน src ได้แบบเดียวกับตอนรันแอป (config, translation.*)"""
+
+import os
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+sys.path.insert(0, SRC)
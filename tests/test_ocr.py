@@ -0,0 +1,53 @@
+"""OCR batch: ภาพที่อ่านแล้วใช้ผลจาก cache - ส่งไปอ่านเฉพาะภาพที่ยังไม่มี"""
+
+from PIL import Image
+
+from translation.cache import Cache
+from translation.ocr import BATCH_DELIMITER, OCR
+
+
+def _ocr_with_fake_vision():
+    ocr = OCR(vision_model='test-vision', cache=Cache())
+    requests = []
+
+    def request_vision(prompt, images_b64, read_timeout=15, num_predict=None):
+        requests.append(images_b64)
+        if len(images_b64) == 1:
+            return f"text {len(requests)}"
+        return "\n".join(f"{BATCH_DELIMITER.format(index=i)}\ntext {len(requests)}.{i}"
+                         for i in range(1, len(images_b64) + 1))
+
+    ocr._request_vision = request_vision
+    return ocr, requests
+
+
+def _images(*colors):
+    return [Image.new('RGB', (40, 20), color) for color in colors]
+
+
+def test_batch_reads_only_uncached_images_and_keeps_order():
+    ocr, requests = _ocr_with_fake_vision()
+    first = ocr.extract_text_batch(_images('red', 'green'))
+
+    result = ocr.extract_text_batch(_images('blue', 'red', 'white', 'green'))
+
+    assert [len(images) for images in requests] == [2, 2]
+    assert result == ['text 2.1', first[0], 'text 2.2', first[1]]
+
+
+def test_batch_results_are_shared_with_single_image_reads():
+    ocr, requests = _ocr_with_fake_vision()
+    batch = ocr.extract_text_batch(_images('red', 'green'))
+
+    assert ocr.extract_text(_images('green')[0]) == batch[1]
+    assert ocr.extract_text_batch(_images('red', 'green')) == batch
+    assert len(requests) == 1
+
+
+def test_single_uncached_image_is_read_on_its_own():
+    ocr, requests = _ocr_with_fake_vision()
+    ocr.extract_text(_images('red')[0])
+
+    ocr.extract_text_batch(_images('red', 'green'))
+
+    assert [len(images) for images in requests] == [1, 1]
@@ -0,0 +1,55 @@
+"""Pipeline + SrtSink: subtitle ที่หายไปแล้วกลับมาต้องได้คำแปลในช่วงใหม่ด้วย"""
+
+from translation.pipeline import Pipeline
+from translation.regions import RegionFrame
+from translation.sinks import SrtSink
+
+
+class _ScriptedOCR:
+    """คืนข้อความตามลำดับที่กำหนด ทีละภาพ"""
+
+    def __init__(self, texts):
+        self.texts = list(texts)
+
+    def extract_text(self, image):
+        return self.texts.pop(0)
+
+
+class _UpperTranslator:
+    def __init__(self):
+        self.calls = []
+
+    def translate(self, text, target_language):
+        self.calls.append(text)
+        return {'translated_text': text.upper(), 'confidence': 0.9}
+
+
+def _run(texts, tmp_path):
+    sink = SrtSink(str(tmp_path / 'out.srt'))
+    translator = _UpperTranslator()
+    pipeline = Pipeline(None, _ScriptedOCR(texts), translator, sinks=[sink])
+    for second in range(len(texts)):
+        pipeline.process_frames([RegionFrame('main', None, (0, 0, 10, 10), float(second))])
+    sink.close(float(len(texts)))
+    return sink, translator
+
+
+def test_reappearing_subtitle_is_translated_again(tmp_path):
+    sink, translator = _run(['Hello there', '', 'Hello there'], tmp_path)
+
+    assert translator.calls == ['Hello there', 'Hello there']
+    assert [cue['translated_text'] for cue in sink.cues] == ['HELLO THERE', 'HELLO THERE']
+
+
+def test_rejected_text_also_ends_the_subtitle(tmp_path):
+    sink, translator = _run(['Hello there', '!!!!!!!!', 'Hello there'], tmp_path)
+
+    assert len(translator.calls) == 2
+    assert all(cue['translated_text'] for cue in sink.cues)
+
+
+def test_unchanged_subtitle_is_translated_once(tmp_path):
+    sink, translator = _run(['Hello there', 'Hello there'], tmp_path)
+
+    assert translator.calls == ['Hello there']
+    assert len(sink.cues) == 1
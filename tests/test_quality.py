@@ -0,0 +1,35 @@
+"""OCR quality gate: คัดเฉพาะคำตอบปฏิเสธของ model ไม่ใช่บทพูดที่ขึ้นต้นคล้ายกัน"""
+
+import pytest
+
+from translation.quality import REASON_REFUSAL, score_text
+
+
+@pytest.mark.parametrize('text', [
+    "I am sorry for your loss",
+    "I'm sorry, but the gate is closed until dawn.",
+    "Sorry, I can't help you now",
+    "Sorry! I couldn't find your sword anywhere.",
+    "There is no text here",
+    "No text found in the menu",
+    "The image is loading...",
+])
+def test_dialogue_is_not_a_refusal(text):
+    result = score_text(text)
+    assert result['reason'] != REASON_REFUSAL
+    assert result['accepted']
+
+
+@pytest.mark.parametrize('text', [
+    "I cannot read the text in this image.",
+    "Sorry, I can't read this image.",
+    "There is no visible text in the image.",
+    "The image does not contain any text.",
+    "I'm sorry, I am unable to extract text from the image. Please provide a clearer one.",
+    "The image appears to be blank.",
+    "ไม่พบข้อความในภาพ",
+])
+def test_model_refusals_are_rejected(text):
+    result = score_text(text)
+    assert not result['accepted']
+    assert result['reason'] == REASON_REFUSAL
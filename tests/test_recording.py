@@ -0,0 +1,60 @@
+"""ReplaySource: interval ที่ต่างจากตอนบันทึกต้องไม่ตัดพื้นที่นอกภาพที่บันทึกไว้ (ได้ภาพดำ)"""
+
+import time
+import types
+
+from PIL import Image, ImageStat
+
+from translation import recording
+from translation.recording import ReplaySource, SessionRecorder
+from translation.regions import RegionScheduler
+
+
+def _record(path, monkeypatch):
+    """บันทึก 2 พื้นที่: a ทุก 100ms, b ทุก 1000ms เป็นเวลา 3 วินาที (เวลาเสมือน)"""
+    clock = [1000.0]
+    monkeypatch.setattr(recording, 'time', types.SimpleNamespace(
+        monotonic=lambda: clock[0], time=time.time, strftime=time.strftime, sleep=time.sleep))
+
+    screen = Image.new('RGB', (400, 200), (128, 128, 128))
+    scheduler = RegionScheduler(lambda rect: screen.crop((rect[0], rect[1], rect[0] + rect[2], rect[1] + rect[3])))
+    scheduler.add_region('a', (0, 0, 100, 50), interval_ms=100)
+    scheduler.add_region('b', (200, 100, 100, 50), interval_ms=1000)
+
+    recorder = SessionRecorder(str(path))
+    recorder.attach(scheduler)
+    for step in range(30):
+        clock[0] = 1000.0 + step * 0.1
+        scheduler.tick(now=clock[0])
+    recorder.close()
+    monkeypatch.undo()
+
+
+def test_replay_only_captures_regions_inside_the_recorded_frame(tmp_path, monkeypatch):
+    path = tmp_path / 'session.stsession'
+    _record(path, monkeypatch)
+
+    source = ReplaySource(str(path), speed=None, interval_ms=100, change_threshold=0)
+    outside = []
+    capture = source._capture
+
+    def checked_capture(rect):
+        fx, fy, fw, fh = source._frame_rect
+        if rect[0] < fx or rect[1] < fy or rect[0] + rect[2] > fx + fw or rect[1] + rect[3] > fy + fh:
+            outside.append(rect)
+        return capture(rect)
+
+    source.scheduler.capture_func = checked_capture
+
+    dispatched = {'a': [], 'b': []}
+    while True:
+        frames = source.read()
+        if frames is None:
+            break
+        for frame in frames:
+            dispatched[frame.name].append(ImageStat.Stat(frame.image).mean[0])
+
+    # b ถูกตัดเฉพาะจากภาพที่บันทึก b ไว้ - ไม่มีภาพดำจากส่วนที่อยู่นอกภาพ
+    assert outside == []
+    assert dispatched['b'] and all(mean == 128 for mean in dispatched['b'])
+    assert all(mean == 128 for mean in dispatched['a'])
@@ -0,0 +1,32 @@
+"""ImageSequenceSource: ไฟล์ที่ไม่ใช่ภาพหรือภาพเสียต้องไม่ทำให้ลำดับภาพจบก่อนเวลา"""
+
+from PIL import Image
+
+from translation.sources import ImageSequenceSource
+
+
+def _read_all(source):
+    frames = []
+    while True:
+        batch = source.read()
+        if batch is None:
+            return frames
+        frames.extend(batch)
+
+
+def test_non_image_and_broken_files_are_skipped(tmp_path):
+    for index, color in enumerate(['black', 'white', 'red']):
+        Image.new('RGB', (32, 16), color).save(tmp_path / f'frame_{index * 2:02d}.png')
+    (tmp_path / 'frame_01.png').write_bytes(b'not a png')
+    (tmp_path / 'Thumbs.db').write_bytes(b'\x00' * 64)
+    (tmp_path / '.DS_Store').write_bytes(b'\x00' * 64)
+
+    source = ImageSequenceSource(str(tmp_path), fps=1, change_threshold=0)
+    try:
+        frames = _read_all(source)
+    finally:
+        source.close()
+
+    # ภาพเสีย (frame_01) ยังนับเวลา - เฟรมถัดไปอยู่ที่วินาทีเดิมของมัน
+    assert [frame.captured_at for frame in frames] == [0.0, 2.0, 3.0]
+    assert source.counters['decoded'] == 3
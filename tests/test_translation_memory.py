@@ -0,0 +1,33 @@
+"""Translation memory: ใช้คำแปลซ้ำเฉพาะเมื่อความหมายไม่เปลี่ยน"""
+
+import pytest
+
+from translation.translation_memory import TranslationMemory, adapt_translation
+
+
+@pytest.mark.parametrize('stored, text', [
+    ("Door is now open", "Door is not open"),  # ปฏิเสธ
+    ("You win the match", "You won the match"),  # กาล
+    ("Quest is done", "Quest is gone"),
+    ("Your modern sword", "Your modem sword"),  # rn -> m แต่เป็นคำจริงทั้งคู่
+    ("Burn the bridge", "Bum the bridge"),
+])
+def test_real_word_changes_are_not_reused(stored, text):
+    memory = TranslationMemory()
+    memory.add(stored, "คำแปลเดิม")
+    assert memory.lookup(text) is None
+    assert adapt_translation(stored, text, "คำแปลเดิม") is None
+
+
+@pytest.mark.parametrize('stored, text', [
+    ("Level up complete", "Ievel up complete"),  # l -> I
+    ("Welcome to the town", "WeIcome to the town"),
+    ("Open the menu", "Open the rnenu"),  # m -> rn
+])
+def test_ocr_confusions_reuse_translation(stored, text):
+    assert adapt_translation(stored, text, "คำแปลเดิม") == "คำแปลเดิม"
+
+
+def test_numbers_and_names_are_substituted():
+    assert adapt_translation("HP 100 left", "HP 90 left", "เหลือ HP 100") == "เหลือ HP 90"
+    assert adapt_translation("Hello Alice", "Hello Bob", "สวัสดี Alice") == "สวัสดี Bob"
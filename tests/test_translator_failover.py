@@ -0,0 +1,48 @@
+"""Translator + Pipeline: เมื่อ Ollama ล่ม pipeline ต้องได้คำแปลจาก service สำรอง ไม่ใช่ error"""
+
+from translation.cache import Cache
+from translation.pipeline import Pipeline
+from translation.translator import Translator
+
+
+class _DownHealth:
+    """health monitor ที่รายงานว่า Ollama เชื่อมต่อไม่ได้"""
+
+    is_connected = False
+
+    def is_available(self):
+        return False
+
+
+class _DownOllama:
+    is_connected = False
+
+    def is_available(self):
+        return False
+
+    def translate(self, text, target_language, source_language='auto', cancel_event=None):
+        return {'translated_text': text, 'detected_language': 'error', 'confidence': 0.0,
+                'service': 'ollama', 'error': 'connection refused'}
+
+
+def _translator_with_ollama_down():
+    translator = Translator(service='ollama', cache=Cache(), health=_DownHealth())
+    translator.ollama_translator = _DownOllama()
+    translator.google_translator = object()
+    translator._translate_google = lambda text, target, source: {
+        'translated_text': 'สวัสดี', 'detected_language': 'en', 'confidence': 0.9, 'service': 'google'}
+    return translator
+
+
+def test_translator_with_failover_is_available():
+    assert _translator_with_ollama_down().is_available()
+
+
+def test_pipeline_fails_over_when_primary_is_down():
+    events = []
+    pipeline = Pipeline(None, None, _translator_with_ollama_down(), sinks=[events.append])
+
+    result = pipeline.translate_text('Hello there', 'main')
+
+    assert result is not None and result['translated_text'] == 'สวัสดี'
+    assert not [event for event in events if event['type'] == 'error']